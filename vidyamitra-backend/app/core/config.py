@@ -1,5 +1,5 @@
 import json
-from typing import Any, List
+from typing import Any, List, Literal
 
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -18,6 +18,96 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = Field(default="Vidyamitra API")
     VERSION: str = Field(default="0.1.0")
 
+    # Number of uvicorn worker processes (uvicorn reads the same variable for --workers).
+    # With more than one worker the session cache switches from write-behind to
+    # version-checked write-through, since workers share the SQLite session store.
+    WEB_CONCURRENCY: int = Field(default=1)
+
+    # Write-behind session cache (interview pipeline): seconds between background flushes.
+    SESSION_CACHE_FLUSH_SECONDS: float = Field(default=2.0)
+
+    # Local session store eviction (applied per store by the background compactor).
+    SESSION_TTL_HOURS: float = Field(default=72.0)        # evict sessions idle for longer
+    SESSION_STORE_MAX_MB: float = Field(default=64.0)     # payload budget per store
+    SESSION_COMPACTION_INTERVAL_SECONDS: float = Field(default=300.0)
+
+    # Supabase (app/services/db.py): one shared client, created in the app lifespan. Calls run
+    # on their own thread pool so the sync client never blocks the event loop; each call,
+    # queueing included, is bounded by the timeout. The HTTP pool is sized to the thread pool.
+    SUPABASE_URL: str = Field(default="")
+    SUPABASE_SERVICE_ROLE_KEY: str = Field(default="")
+    SUPABASE_MAX_WORKERS: int = Field(default=8)
+    SUPABASE_TIMEOUT_SECONDS: float = Field(default=10.0)
+
+    # LLM gateway (app/services/llm.py): one pooled client for all chat completions.
+    LLM_BASE_URL: str = Field(default="https://api.groq.com/openai/v1")
+    LLM_TIMEOUT_SECONDS: float = Field(default=60.0)
+    LLM_CONNECT_TIMEOUT_SECONDS: float = Field(default=10.0)
+    LLM_MAX_RETRIES: int = Field(default=3)               # retries on 429 / 5xx / connection errors
+    LLM_BACKOFF_BASE_SECONDS: float = Field(default=0.5)
+    LLM_BACKOFF_MAX_SECONDS: float = Field(default=20.0)
+    LLM_MAX_CONNECTIONS: int = Field(default=20)          # pooled keep-alive connections
+    LLM_KEEPALIVE_SECONDS: float = Field(default=60.0)
+    LLM_MAX_CONCURRENCY: int = Field(default=16)          # in-flight completions, all tasks
+    LLM_MIN_CONCURRENCY: int = Field(default=2)           # floor for the adaptive limit after 429s
+    LLM_TASK_CONCURRENCY: int = Field(default=8)          # in-flight completions per task
+    # Model routing: each task runs on the model its route names ("fast", "default" or a
+    # model id); unrouted tasks use LLM_DEFAULT_MODEL. LLM_MODEL_ROUTES overrides the
+    # built-in table, e.g. "quiz.generate=fast,resume.parse=llama-3.3-70b-versatile".
+    LLM_DEFAULT_MODEL: str = Field(default="llama-3.3-70b-versatile")
+    LLM_FAST_MODEL: str = Field(default="llama-3.1-8b-instant")
+    LLM_MODEL_ROUTES: str = Field(default="")
+    # Retry a task on LLM_DEFAULT_MODEL when its routed model's output fails parsing/schema.
+    LLM_QUALITY_FALLBACK: bool = Field(default=True)
+    # Add an X-LLM-Calls header (task, model, outcome, ms, TTFB, tokens per call) to responses.
+    LLM_DEBUG_HEADERS: bool = Field(default=False)
+
+    # Interview report evaluation: one completion per answer ("per_question") or one
+    # structured completion for all answers ("batched"), falling back to per-question
+    # calls for any answer whose batched evaluation fails validation.
+    INTERVIEW_EVAL_MODE: Literal["per_question", "batched"] = Field(default="per_question")
+
+    # Resume digest (app/services/resume_digest.py): estimated token budget for the
+    # resume context sent with interview, quiz and evaluation prompts.
+    RESUME_DIGEST_TOKEN_BUDGET: int = Field(default=600)
+
+    # Interview question bank (app/services/question_bank.py): sessions are assembled from
+    # banked questions when possible; pools smaller than QUESTION_BANK_POOL_SIZE are refilled
+    # in the background, QUESTION_BANK_BATCH questions per completion. Off by default: when on,
+    # resume-based sessions (/interview/questions) get generic per-skill questions instead of
+    # questions written for the resume. At most QUESTION_BANK_MAX_POOLS pools are ever opened
+    # and at most QUESTION_BANK_MAX_REFILLS refills run at once per worker.
+    QUESTION_BANK_ENABLED: bool = Field(default=False)
+    QUESTION_BANK_POOL_SIZE: int = Field(default=30)
+    QUESTION_BANK_BATCH: int = Field(default=12)
+    QUESTION_BANK_MAX_POOLS: int = Field(default=200)
+    QUESTION_BANK_MAX_REFILLS: int = Field(default=2)
+
+    # Speculative generation (app/services/speculative.py): after /resume/parse, interview
+    # questions and a resume quiz are generated in the background, keyed by resume hash, and
+    # handed to the follow-up request. Off by default: unclaimed results still cost tokens.
+    SPECULATIVE_GENERATION_ENABLED: bool = Field(default=False)
+    SPECULATIVE_TTL_SECONDS: int = Field(default=900)
+    SPECULATIVE_MAX_ENTRIES: int = Field(default=200)
+
+    # Background jobs (app/services/job_queue.py) for /interview/analyze and /interview/report
+    # when the client opts in. JOB_WORKERS per process; a job whose worker stops renewing its
+    # lease is retried, up to JOB_MAX_ATTEMPTS runs. Finished jobs are kept for JOB_RETENTION_SECONDS.
+    JOB_WORKERS: int = Field(default=2)
+    JOB_LEASE_SECONDS: float = Field(default=60.0)
+    JOB_MAX_ATTEMPTS: int = Field(default=3)
+    JOB_RETENTION_SECONDS: int = Field(default=86400)
+    JOB_POLL_SECONDS: float = Field(default=1.0)
+
+    # Progress rollups (app/services/progress_rollup.py): per-user dashboard counts and sums,
+    # updated as results are saved; a user's rollup older than this is rebuilt from Supabase
+    # on the next dashboard load (0 = rebuild on every load).
+    PROGRESS_ROLLUP_MAX_AGE_SECONDS: int = Field(default=86400)
+
+    # LLM response cache (opt-in per call site via `cache_ttl`).
+    LLM_CACHE_ENABLED: bool = Field(default=True)
+    LLM_CACHE_MEMORY_ENTRIES: int = Field(default=256)
+
     @field_validator("CORS_ORIGINS", mode="before")
     @classmethod
     def parse_cors_origins(cls, v: Any) -> Any:
@@ -1,14 +1,42 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .core.config import settings
 from fastapi.staticfiles import StaticFiles
 
+from .services import db, llm
+from .services.job_queue import queue as job_queue
+from .services.speculative import registry as speculative_registry
+from .services.llm_metrics import DEBUG_HEADER as LLM_DEBUG_HEADER, LLMDebugHeaderMiddleware
+from .services.session_cache import close_all as close_session_caches
+from .services.session_store import start_compactor, stop_compactor
 from .utils.storage import get_writable_temp_path
 
-from .routers import resume, evaluate, quiz, interview, jobs, progress, auth, roadmap, audio_analysis, timeline, cv_analysis
+from .routers import resume, evaluate, quiz, interview, jobs, progress, auth, roadmap, audio_analysis, timeline, cv_analysis, metrics
 from .routers.interview_pipeline import router as interview_pipeline_router
+from .routers.interview_jobs import router as interview_jobs_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup: one Supabase client for every router, then the background workers.
+    db.connect()
+    start_compactor(settings.SESSION_COMPACTION_INTERVAL_SECONDS)
+    job_queue.start(settings.JOB_WORKERS)
+    yield
+    # Shutdown: running jobs go back to the queue first (they resume after the
+    # restart), then session caches are flushed, and the LLM and Supabase
+    # clients close last.
+    await job_queue.stop()
+    stop_compactor()
+    close_session_caches()
+    speculative_registry.close()
+    await llm.aclose()
+    db.close()
+
 
-app: FastAPI = FastAPI(title=settings.PROJECT_NAME, version=settings.VERSION)
+app: FastAPI = FastAPI(title=settings.PROJECT_NAME, version=settings.VERSION, lifespan=lifespan)
 origins = [
     "http://localhost:5173",
     "https://vidhyamitraai.vercel.app"
@@ -20,7 +48,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[LLM_DEBUG_HEADER],
 )
+if settings.LLM_DEBUG_HEADERS:
+    app.add_middleware(LLMDebugHeaderMiddleware)
 app.include_router(resume.router, prefix="/resume", tags=["resume"])
 app.include_router(evaluate.router, prefix="/evaluate", tags=["evaluate"])
 app.include_router(quiz.router, prefix="/quiz", tags=["quiz"])
@@ -32,6 +63,7 @@ app.include_router(roadmap.router, prefix="/roadmap", tags=["roadmap"])
 app.include_router(audio_analysis.router, prefix="/audio", tags=["audio-analysis"])
 app.include_router(timeline.router, prefix="/timeline", tags=["timeline"])
 app.include_router(cv_analysis.router, prefix="/cv", tags=["cv-analysis"])
+app.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
 
 # Serve uploaded interview media for review playback (defaults to OS temp, not the repo).
 _media_dir = get_writable_temp_path("INTERVIEW_MEDIA_PATH", "vidyamitra_interview_media")
@@ -39,6 +71,7 @@ _media_dir.mkdir(parents=True, exist_ok=True)
 app.mount("/interview-media", StaticFiles(directory=str(_media_dir)), name="interview-media")
 
 app.include_router(interview_pipeline_router, prefix="/interview", tags=["interview-pipeline"])
+app.include_router(interview_jobs_router, prefix="/interview/jobs", tags=["interview-jobs"])
 
 @app.get(path="/")
 def root() -> dict[str, str]:
@@ -1,31 +1,18 @@
-import os
 from typing import Optional
 
 from fastapi import APIRouter, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi import Depends
 from pydantic import BaseModel, EmailStr
-from supabase import create_client, Client
 from dotenv import load_dotenv
 
+from ..services import db
+from ..services.db import SyncGoTrueClient
+
 # Load environment variables from .env file
 load_dotenv()
 security = HTTPBearer()
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-
-supabase: Optional[Client] = (
-    create_client(SUPABASE_URL, SUPABASE_KEY) if SUPABASE_URL and SUPABASE_KEY else None
-)
-
-
-def _require_supabase() -> Client:
-    if not supabase:
-        raise HTTPException(status_code=503, detail="Supabase is not configured on this server.")
-    return supabase
-
-
 # Initialize Router
 router = APIRouter()
 
@@ -45,11 +32,10 @@ class UserLogin(BaseModel):
 # --- Endpoints ---
 
 @router.post("/register")
-async def register_user(user: UserCreate):
+async def register_user(user: UserCreate, auth: SyncGoTrueClient = Depends(db.get_auth)):
     try:
-        client = _require_supabase()
         # Supabase handles hashing and secure storage automatically
-        response = client.auth.sign_up({
+        response = await db.run(auth.sign_up, {
             "email": user.email,
             "password": user.password,
             "options": {
@@ -71,10 +57,9 @@ async def register_user(user: UserCreate):
 
 
 @router.post("/login")
-async def login_user(user: UserLogin):
+async def login_user(user: UserLogin, auth: SyncGoTrueClient = Depends(db.get_auth)):
     try:
-        client = _require_supabase()
-        response = client.auth.sign_in_with_password({
+        response = await db.run(auth.sign_in_with_password, {
             "email": user.email,
             "password": user.password
         })
@@ -102,12 +87,11 @@ class RefreshTokenRequest(BaseModel):
     refresh_token: str
 
 @router.post("/refresh")
-async def refresh_user_token(request: RefreshTokenRequest):
+async def refresh_user_token(request: RefreshTokenRequest, auth: SyncGoTrueClient = Depends(db.get_auth)):
     """Generates a new access token when the old one expires."""
     try:
-        client = _require_supabase()
         # Ask Supabase to refresh the session using the refresh token
-        response = client.auth.refresh_session(request.refresh_token)
+        response = await db.run(auth.refresh_session, request.refresh_token)
         
         return {
             "access_token": response.session.access_token,
@@ -120,16 +104,18 @@ async def refresh_user_token(request: RefreshTokenRequest):
             detail="Session expired. Please log in again."
         )
 @router.get("/me")
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    auth: SyncGoTrueClient = Depends(db.get_auth),
+):
     """
     The frontend calls this on page load if it finds a token in localStorage.
     It verifies the token and returns the user's details.
     """
     token = credentials.credentials
     try:
-        client = _require_supabase()
         # Supabase securely validates the token and fetches the user's current data
-        user_response = client.auth.get_user(token)
+        user_response = await db.run(auth.get_user, token)
         user = user_response.user
         
         # If the token is fake or expired, Supabase throws an error and it jumps to the except block.
@@ -1,36 +1,14 @@
-import os
 import json
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
 import asyncio
+from typing import Dict, List, Optional
 
-load_dotenv()
-
-# Initialize Clients (Supabase optional, Groq required for this endpoint)
-try:
-    from supabase import create_client, Client
-except Exception:  # pragma: no cover
-    create_client = None
-    Client = None
-
-_supabase_url = os.getenv("SUPABASE_URL")
-_supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+from ..services import db, llm, progress_rollup
+from ..services.db import Client, get_supabase
 
-supabase = None
-if create_client and _supabase_url and _supabase_key:
-    try:
-        supabase = create_client(_supabase_url, _supabase_key)
-    except Exception:
-        supabase = None
-
-_groq_key = os.getenv("GROQ_API_KEY")
-openai_client = AsyncOpenAI(
-    api_key=_groq_key,
-    base_url="https://api.groq.com/openai/v1",  # OpenAI-compatible shim for Groq
-    timeout=60.0,
-)
+load_dotenv()
 
 router = APIRouter()
 
@@ -39,10 +17,21 @@ class EvaluateSessionRequest(BaseModel):
     session_id: str
     user_id: str
 
+class AnswerEvaluationOutput(llm.LLMOutput):
+    question_id: str = ""
+    scores: Dict[str, float] = {}
+    feedback: str = ""
+
+class DashboardSummaryOutput(llm.LLMOutput):
+    overall_score_out_of_10: float = 0
+    key_strengths: List[str] = []
+    areas_for_improvement: List[str] = []
+    final_verdict: str = ""
+
 # --- Endpoints ---
 
 @router.post("/interview-summary")
-async def evaluate_interview_session(request: EvaluateSessionRequest):
+async def evaluate_interview_session(request: EvaluateSessionRequest, supabase: Optional[Client] = Depends(get_supabase)):
     """
     Fetches the completed answers from the database, evaluates the entire 
     interview session using GPT-4, and generates a dashboard summary.
@@ -53,14 +42,14 @@ async def evaluate_interview_session(request: EvaluateSessionRequest):
                 status_code=503,
                 detail="Supabase is not configured on this server.",
             )
-        if not _groq_key:
+        if not llm.is_configured():
             raise HTTPException(
                 status_code=503,
                 detail="GROQ_API_KEY is not configured on this server.",
             )
 
         # 1. Fetch the session data from Supabase
-        db_query = supabase.table("interview_sessions").select("*").eq("id", request.session_id).eq("user_id", request.user_id).execute()
+        db_query = await db.execute(supabase.table("interview_sessions").select("*").eq("id", request.session_id).eq("user_id", request.user_id))
         
         if not db_query.data:
             raise HTTPException(status_code=404, detail="Interview session not found.")
@@ -95,14 +84,10 @@ async def evaluate_interview_session(request: EvaluateSessionRequest):
             }}
             """
             try:
-                response = await openai_client.chat.completions.create(
-                    model="llama-3.3-70b-versatile",
-                    messages=[
-                        {"role": "system", "content": "You are a precise, JSON-outputting career coach AI. You MUST output ONLY raw JSON. No markdown, no formatting, no conversational text."},
-                        {"role": "user", "content": single_prompt}
-                    ]
-                )
-                return json.loads(response.choices[0].message.content or "{}")
+                return await llm.complete_json("evaluate.answer", [
+                    {"role": "system", "content": "You are a precise, JSON-outputting career coach AI. You MUST output ONLY raw JSON. No markdown, no formatting, no conversational text."},
+                    {"role": "user", "content": single_prompt}
+                ], schema=AnswerEvaluationOutput, coalesce=True)
             except Exception:
                 # Fallback in case a single evaluation fails so the whole session doesn't crash
                 return {
@@ -140,17 +125,12 @@ async def evaluate_interview_session(request: EvaluateSessionRequest):
         }}
         """
         
-        summary_completion = await openai_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
+        try:
+            dashboard_summary = await llm.complete_json("evaluate.summary", [
                 {"role": "system", "content": "You are a precise, JSON-outputting career coach AI. You MUST output ONLY raw JSON. No markdown, no formatting, no conversational text."},
                 {"role": "user", "content": summary_prompt}
-            ]
-        )
-        
-        try:
-            dashboard_summary = json.loads(summary_completion.choices[0].message.content or "{}")
-        except json.JSONDecodeError:
+            ], schema=DashboardSummaryOutput, coalesce=True)
+        except llm.LLMInvalidJSON:
             raise HTTPException(status_code=500, detail="AI failed to return valid JSON for the summary.")
 
         # Combine them into the final payload structure your database and frontend expect
@@ -160,10 +140,14 @@ async def evaluate_interview_session(request: EvaluateSessionRequest):
         }
 
         # 6. Update the Supabase session record
-        db_response = supabase.table("interview_sessions").update({
+        db_response = await db.execute(supabase.table("interview_sessions").update({
             "evaluation_data": ai_evaluation,
             "status": "completed"
-        }).eq("id", request.session_id).execute()
+        }).eq("id", request.session_id))
+        if db_response.data:
+            progress_rollup.rollups.record(
+                request.user_id, "interview", request.session_id, progress_rollup.interview_score(ai_evaluation)
+            )
 
         # 7. Return the massive payload to the frontend for the Dashboard
         return {
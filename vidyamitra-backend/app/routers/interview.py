@@ -1,59 +1,41 @@
 import os
-import json
 import uuid
 from pathlib import Path
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
-from typing import List, Dict, Optional
+from typing import List, Optional
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
+
+from ..services import db, llm, question_bank
+from ..services.db import Client, get_supabase
+from ..services.session_store import default_policy, get_store
 
 load_dotenv()
 
-# --- Supabase (Optional Fallback) ---
-try:
-    from supabase import create_client, Client
-    _supabase_url = os.getenv("SUPABASE_URL")
-    _supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-    supabase: Optional[Client] = create_client(_supabase_url, _supabase_key) if _supabase_url and _supabase_key else None
-except Exception:
-    supabase = None
-
-# File-backed session store — survives server restarts with --reload.
-# For deployment, override with INTERVIEW_STORE_PATH to point at a writable volume.
+# Local session store (SQLite) — survives server restarts with --reload.
+# INTERVIEW_STORE_PATH points at the pre-SQLite JSON store, imported on first start.
 import tempfile
 _DEFAULT_STORE_PATH = Path(tempfile.gettempdir()) / "_interview_store.json"
-_STORE_PATH = Path(os.getenv("INTERVIEW_STORE_PATH", str(_DEFAULT_STORE_PATH)))
-
-def _load_store() -> Dict[str, dict]:
-    try:
-        if _STORE_PATH.exists():
-            return json.loads(_STORE_PATH.read_text(encoding="utf-8"))
-    except Exception:
-        pass
-    return {}
-
-def _save_store(store: Dict[str, dict]) -> None:
-    """Persist store to disk, auto-purging evaluated sessions."""
-    try:
-        active = {k: v for k, v in store.items() if v.get("status") not in ("evaluated", "completed")}
-        _STORE_PATH.write_text(json.dumps(active, ensure_ascii=False), encoding="utf-8")
-    except Exception:
-        pass
-_groq_key = os.getenv("GROQ_API_KEY")
-openai_client = AsyncOpenAI(
-    api_key=_groq_key,
-    base_url="https://api.groq.com/openai/v1",  # OpenAI-compatible shim for Groq
-    timeout=45.0,
+_LEGACY_STORE_PATH = Path(os.getenv("INTERVIEW_STORE_PATH", str(_DEFAULT_STORE_PATH)))
+_store = get_store(
+    "interview",
+    legacy_json=_LEGACY_STORE_PATH,
+    keep=lambda session: session.get("status") not in ("evaluated", "completed"),
+    policy=default_policy(),
 )
 
 router = APIRouter()
 
+_NUM_QUESTIONS = 5
+
 # --- Pydantic Models ---
 class StartInterviewRequest(BaseModel):
     user_id: str
     target_role: str
 
+class InterviewQuestionsOutput(llm.LLMOutput):
+    questions: List[str] = []
+
 class AnswerItem(BaseModel):
     question_id: str
     answer_text: str
@@ -66,13 +48,14 @@ class SubmitAllAnswersRequest(BaseModel):
 # --- Endpoints ---
 
 @router.post("/start")
-async def start_interview_session(request: StartInterviewRequest):
+async def start_interview_session(request: StartInterviewRequest, supabase: Optional[Client] = Depends(get_supabase)):
     """
-    Starts a new interview session by generating 5 role-specific questions.
-    Assigns a unique ID to each question for reliable tracking.
+    Starts a new interview session with 5 role-specific questions, taken from
+    the question bank when it holds enough the user has not seen, otherwise
+    generated. Assigns a unique ID to each question for reliable tracking.
     """
     try:
-        if not _groq_key:
+        if not llm.is_configured():
             raise HTTPException(
                 status_code=503,
                 detail="GROQ_API_KEY is not configured on this server.",
@@ -83,7 +66,7 @@ async def start_interview_session(request: StartInterviewRequest):
             if supabase:
                 try:
                     # Fetch the user's latest resume evaluation
-                    db_query = supabase.table("resume_evaluations").select("analysis_result").eq("user_id", request.user_id).order("created_at", desc=True).limit(1).execute()
+                    db_query = await db.execute(supabase.table("resume_evaluations").select("analysis_result").eq("user_id", request.user_id).order("created_at", desc=True).limit(1))
                     
                     if db_query.data:
                         analysis = db_query.data[0].get("analysis_result", {})
@@ -97,75 +80,74 @@ async def start_interview_session(request: StartInterviewRequest):
 
 
 
-        # 2. Ask GPT-4 to generate the questions
-        prompt = f"""
-        You are conducting a professional job interview for a '{request.target_role}' position. 
-        Generate exactly 5 interview questions. Include a mix of technical, behavioral, and situational questions.
-        
-        You MUST respond in strictly valid JSON format matching this schema:
-        {{
-            "questions": [
-                "Question 1 text...",
-                "Question 2 text...",
-                "Question 3 text...",
-                "Question 4 text...",
-                "Question 5 text..."
-            ]
-        }}
-        """
-
-        completion = await openai_client.chat.completions.create(
-            model="llama-3.3-70b-versatile", 
-            messages=[
-                {"role": "system", "content": "You are a precise, JSON-outputting hiring manager AI. You MUST output ONLY raw JSON. No markdown, no formatting, no conversational text."},
-                {"role": "user", "content": prompt}
-            ]
+        # 2. Assemble the questions from the question bank; generate only on a miss.
+        banked = question_bank.bank.assemble(
+            request.user_id, question_bank.role_plan(request.target_role, _NUM_QUESTIONS)
         )
+        if banked is not None:
+            formatted_questions = [
+                {"id": str(uuid.uuid4()), "text": q["text"], "category": q["category"]} for q in banked
+            ]
+        else:
+            # Miss: ask the model directly (the bank refills in the background).
+            prompt = f"""
+            You are conducting a professional job interview for a '{request.target_role}' position. 
+            Generate exactly 5 interview questions. Include a mix of technical, behavioral, and situational questions.
         
-        # 3. Parse the AI Data
-        try:
-            ai_data = json.loads(completion.choices[0].message.content or "{}")
-            raw_questions = ai_data.get("questions", [])
-        except json.JSONDecodeError:
-            raise HTTPException(status_code=500, detail="AI failed to return valid JSON.")
-
-        # 4. Format questions with unique IDs
-        formatted_questions = [
-            {"id": str(uuid.uuid4()), "text": q_text} for q_text in raw_questions
-        ]
+            You MUST respond in strictly valid JSON format matching this schema:
+            {{
+                "questions": [
+                    "Question 1 text...",
+                    "Question 2 text...",
+                    "Question 3 text...",
+                    "Question 4 text...",
+                    "Question 5 text..."
+                ]
+            }}
+            """
 
-        # 5. Save to file-backed store
+            # 3. Call the AI and parse its JSON
+            try:
+                ai_data = await llm.complete_json("interview.start", [
+                    {"role": "system", "content": "You are a precise, JSON-outputting hiring manager AI. You MUST output ONLY raw JSON. No markdown, no formatting, no conversational text."},
+                    {"role": "user", "content": prompt}
+                ], schema=InterviewQuestionsOutput)
+                raw_questions = ai_data.get("questions", [])
+            except llm.LLMInvalidJSON:
+                raise HTTPException(status_code=500, detail="AI failed to return valid JSON.")
+
+            # 4. Format questions with unique IDs
+            formatted_questions = [
+                {"id": str(uuid.uuid4()), "text": q_text} for q_text in raw_questions
+            ]
+
+        # 5. Save to local store
         session_id = str(uuid.uuid4())
-        store = _load_store()
-        store[session_id] = {
+        _store.put(session_id, {
             "id": session_id,
             "user_id": request.user_id,
             "target_role": request.target_role,
             "questions": formatted_questions,
             "status": "in_progress",
             "user_answers": []
-        }
-        _save_store(store)
+        }, expected_version=0)
 
         # 6. Best-effort write to Supabase
         if supabase:
             try:
-                db_response = supabase.table("interview_sessions").insert({
+                db_response = await db.execute(supabase.table("interview_sessions").insert({
                     "id": session_id,
                     "user_id": request.user_id,
                     "target_role": request.target_role,
                     "questions": formatted_questions,
                     "status": "in_progress"
-                }).execute()
+                }))
                 
                 if db_response.data:
                     db_id = db_response.data[0]["id"]
                     if db_id != session_id:
-                        store = _load_store()
-                        store[db_id] = store.pop(session_id, store.get(db_id, {}))
-                        store[db_id]["id"] = db_id
+                        _store.rename(session_id, db_id)
                         session_id = db_id
-                        _save_store(store)
             except Exception:
                 pass # Fail silently to memory fallback
 
@@ -182,7 +164,7 @@ async def start_interview_session(request: StartInterviewRequest):
 
 
 @router.post("/submit-answers")
-async def submit_all_answers(submission: SubmitAllAnswersRequest):
+async def submit_all_answers(submission: SubmitAllAnswersRequest, supabase: Optional[Client] = Depends(get_supabase)):
     """
     Accepts all answers mapped to their question_ids at once.
     Saves them to the database session and marks it ready for evaluation.
@@ -194,30 +176,28 @@ async def submit_all_answers(submission: SubmitAllAnswersRequest):
             for ans in submission.answers
         ]
 
-        # 2. Update the file-backed store
-        store = _load_store()
-        is_in_store = submission.session_id in store
-        if is_in_store:
-            if store[submission.session_id]["user_id"] != submission.user_id:
+        # 2. Update the local store
+        def _record_answers(session: dict) -> None:
+            if session["user_id"] != submission.user_id:
                 raise HTTPException(status_code=403, detail="Unauthorized session access.")
-            
-            store[submission.session_id]["user_answers"] = answers_data
-            store[submission.session_id]["status"] = "pending_evaluation"
-            _save_store(store)
+            session["user_answers"] = answers_data
+            session["status"] = "pending_evaluation"
+
+        is_in_store = _store.update(submission.session_id, _record_answers) is not None
             
         # 3. Best-effort write to Supabase
         if supabase:
             try:
                 # Validate the session exists and belongs to the user
-                db_query = supabase.table("interview_sessions").select("id").eq("id", submission.session_id).eq("user_id", submission.user_id).execute()
+                db_query = await db.execute(supabase.table("interview_sessions").select("id").eq("id", submission.session_id).eq("user_id", submission.user_id))
                 if not db_query.data and not is_in_store:
                     raise HTTPException(status_code=404, detail="Interview session not found or unauthorized.")
 
                 if db_query.data:
-                    db_response = supabase.table("interview_sessions").update({
+                    db_response = await db.execute(supabase.table("interview_sessions").update({
                         "user_answers": answers_data,
                         "status": "pending_evaluation"
-                    }).eq("id", submission.session_id).execute()
+                    }).eq("id", submission.session_id))
             except Exception as supabase_err:
                 if not is_in_store:
                     raise HTTPException(status_code=500, detail="Database unreachable and session not found locally.")
@@ -243,31 +223,61 @@ async def submit_all_answers(submission: SubmitAllAnswersRequest):
         raise HTTPException(status_code=500, detail=f"Error submitting answers: {str(e)}")
 
 
+# Columns of interview_sessions that history requests may select (`fields`).
+_HISTORY_SUMMARY = ("id", "target_role", "status", "created_at")
+_HISTORY_FIELDS = _HISTORY_SUMMARY + (
+    "questions", "user_answers", "video_start_time", "answer_windows", "video_url", "audio_url",
+    "analysis_data", "evaluation_data",
+)
+
+
 @router.get("/history/{user_id}")
-async def get_interview_history(user_id: str):
-    """Fetches a user's past interview sessions."""
+async def get_interview_history(
+    user_id: str,
+    limit: int = Query(db.DEFAULT_PAGE_SIZE, ge=1, le=db.MAX_PAGE_SIZE),
+    before: Optional[str] = Query(None, description="`next_before` from the previous page."),
+    fields: Optional[str] = Query(None, description="Comma-separated columns; default is a summary."),
+    supabase: Optional[Client] = Depends(get_supabase),
+):
+    """A page of the user's interview sessions, newest first (summary rows unless `fields` asks for more)."""
+    columns = db.projection(fields, _HISTORY_SUMMARY, _HISTORY_FIELDS)
+    cursor = db.decode_cursor(before)
     try:
-        db_history = []
+        db_history, next_before = [], None
         if supabase:
             try:
-                response = supabase.table("interview_sessions").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
-                db_history = response.data if response.data else []
+                db_history, next_before = await db.history_page(
+                    supabase, "interview_sessions", user_id, columns, limit, cursor
+                )
             except Exception:
                 pass # Fail silently
-                
-        # Also grab any local sessions that haven't synced
-        local_store = _load_store()
-        local_history = [
-            session for session in local_store.values() 
-            if session.get("user_id") == user_id
-        ]
-        
-        # Merge, preferring DB ones if there's an ID collision
-        db_ids = {s.get("id") for s in db_history}
-        merged_history = db_history + [s for s in local_history if s.get("id") not in db_ids]
 
-        return {"status": "success", "history": merged_history}
+        # Also grab any local sessions that haven't synced (first page only: they have no created_at)
+        local_history = []
+        if not before:
+            local = [{column: s.get(column) for column in columns} for s in _store.for_user(user_id)]
+            local_history = await db.local_only(supabase, "interview_sessions", db_history, local)
+
+        return {"status": "success", "history": db_history + local_history, "next_before": next_before}
     except Exception as e:
         import traceback
         traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Error fetching history: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error fetching history: {str(e)}")
+
+
+@router.get("/history/{user_id}/{session_id}")
+async def get_interview_session(user_id: str, session_id: str, supabase: Optional[Client] = Depends(get_supabase)):
+    """One interview session in full (from Supabase, else the local store)."""
+    session = None
+    if supabase:
+        try:
+            session = await db.history_item(supabase, "interview_sessions", user_id, session_id)
+        except Exception:
+            pass  # Fall back to the local store
+    if session is None:
+        local = _store.get(session_id)
+        if local is not None and str(local.get("user_id")) == str(user_id):
+            session = local
+    if session is None:
+        raise HTTPException(status_code=404, detail="Interview session not found.")
+    return {"status": "success", "session": session}
@@ -0,0 +1,97 @@
+"""
+Interview Jobs Router
+=====================
+Status of background jobs queued by `/interview/analyze` and
+`/interview/report` (`background=true` or `Prefer: respond-async`).
+
+GET /interview/jobs/{job_id}         — Current state, stage, and the result
+                                       (or error) once finished.
+GET /interview/jobs/{job_id}/events  — Server-Sent Events: `stage` on every
+                                       state/stage change, then `result` or
+                                       `error`.
+
+Both require `user_id` (the owner of the interview session); a job can only
+be read by its owner.
+"""
+
+import json
+from typing import Any
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from ..core.config import settings
+from ..services import job_queue
+
+router = APIRouter()
+
+# SSE comment sent while nothing changes, so proxies keep the stream open.
+_KEEPALIVE_SECONDS = 15.0
+
+
+def _load_job(job_id: str, user_id: str) -> dict:
+    job = job_queue.queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    if job.get("owner") is None or str(job["owner"]) != str(user_id):
+        raise HTTPException(status_code=403, detail="Unauthorized job access.")
+    return job
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _progress(job: dict) -> dict:
+    return {key: job[key] for key in ("id", "kind", "state", "stage", "stages", "attempts")}
+
+
+@router.get("/{job_id}")
+def get_job(job_id: str, user_id: str):
+    """Job state; `result` (the endpoint's usual response body) or `error` once finished."""
+    job = _load_job(job_id, user_id)
+    job.pop("owner", None)
+    return {"status": "success", "job": job}
+
+
+@router.get("/{job_id}/events")
+async def stream_job(job_id: str, user_id: str):
+    """
+    Server-Sent Events for one job: a `stage` event with the current state
+    right away and on every change, then `result` (the endpoint's usual
+    response body) or `error` ({status_code, detail}), after which the
+    stream ends.
+    """
+    _load_job(job_id, user_id)
+
+    async def events():
+        last = None
+        idle = 0.0
+        while True:
+            job = job_queue.queue.get(job_id)
+            if job is None:
+                yield _sse("error", {"status_code": 404, "detail": "Job not found."})
+                return
+            current = (job["state"], job["stage"], job["attempts"])
+            if current != last:
+                last, idle = current, 0.0
+                yield _sse("stage", _progress(job))
+            if job["state"] == job_queue.SUCCEEDED:
+                yield _sse("result", job.get("result"))
+                return
+            if job["state"] == job_queue.FAILED:
+                yield _sse("error", job.get("error") or {"status_code": 500, "detail": "Job failed."})
+                return
+            # Woken early by updates from this process; jobs run by other
+            # workers are picked up by polling.
+            await job_queue.queue.wait_for_change(job_id, settings.JOB_POLL_SECONDS)
+            idle += settings.JOB_POLL_SECONDS
+            if idle >= _KEEPALIVE_SECONDS:
+                idle = 0.0
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
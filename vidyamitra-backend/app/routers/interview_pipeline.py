@@ -5,51 +5,99 @@ import re
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
 
-from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
 
+from ..core.config import settings
 from ..services.audio_analysis import (
     analyze_audio,
 )
+from ..services import db, job_queue, llm
+from ..services.db import Client, get_supabase
+from ..services import progress_rollup, question_bank, resume_digest, speculative
+from ..services import session_artifacts as artifacts
 from ..services.cv_analysis import process_video_eye_contact
+from ..services.session_cache import get_cached_store
+from ..services.session_store import VersionConflict, default_policy, get_store
 from ..services.timeline_sync import sync_timeline
-from ..utils.storage import get_writable_temp_path
+from ..utils.storage import atomic_write_bytes, get_writable_temp_path
 
 load_dotenv()
 
 router = APIRouter()
 
 # -----------------------------------------------------------------------------
-# Persistence (file-backed, Supabase best-effort)
+# Persistence (SQLite session store, Supabase best-effort)
 # -----------------------------------------------------------------------------
 
 import tempfile
+# INTERVIEW_PIPELINE_STORE_PATH points at the pre-SQLite JSON store, imported on first start.
 _DEFAULT_STORE_PATH = Path(tempfile.gettempdir()) / "_interview_pipeline_store.json"
-_STORE_PATH = Path(os.getenv("INTERVIEW_PIPELINE_STORE_PATH", str(_DEFAULT_STORE_PATH)))
+_LEGACY_STORE_PATH = Path(os.getenv("INTERVIEW_PIPELINE_STORE_PATH", str(_DEFAULT_STORE_PATH)))
+# Sessions are served from a write-behind cache; dirty entries are flushed in the background.
+# With several workers the cache becomes a version-checked write-through cache instead.
+
+
+def _on_sessions_evicted(session_ids: List[str]) -> None:
+    # Evicted sessions must not be served (or re-flushed) from the cache, and
+    # their uploaded media and analysis artifacts are unreachable once the
+    # record is gone.
+    _store.discard(session_ids)
+    for session_id in session_ids:
+        artifacts.delete_session_files(session_id)
+
+
+_store = get_cached_store(
+    get_store(
+        "interview_pipeline",
+        legacy_json=_LEGACY_STORE_PATH,
+        policy=default_policy(on_evict=_on_sessions_evicted),
+    ),
+    flush_interval=settings.SESSION_CACHE_FLUSH_SECONDS,
+    write_behind=settings.WEB_CONCURRENCY <= 1,
+)
 
 _MEDIA_DIR = get_writable_temp_path("INTERVIEW_MEDIA_PATH", "vidyamitra_interview_media")
 _MEDIA_DIR.mkdir(parents=True, exist_ok=True)
 
+# Progress stages reported by /analyze and /report background jobs.
+ANALYSIS_STAGES = ("transcribing", "eye-contact", "timeline", "segmenting", "saving")
+REPORT_STAGES = ("evaluating", "summarizing", "saving")
 
-def _load_store() -> Dict[str, dict]:
-    try:
-        if _STORE_PATH.exists():
-            return json.loads(_STORE_PATH.read_text(encoding="utf-8"))
-    except Exception:
-        pass
-    return {}
+# Resume skills (in digest order) whose question-bank pools a session draws from.
+_BANK_SKILLS = 4
 
 
-def _save_store(store: Dict[str, dict]) -> None:
+def _load_session(session_id: str) -> Tuple[dict, int]:
+    """Return (session, version) or raise 404."""
+    found = _store.get_versioned(session_id)
+    if not found:
+        raise HTTPException(status_code=404, detail="Interview session not found.")
+    return found
+
+
+def _save_session(session_id: str, session: dict, version: int) -> int:
+    """Persist `session` if nobody else changed it since `version` was read."""
     try:
-        _STORE_PATH.write_text(json.dumps(store, ensure_ascii=False), encoding="utf-8")
-    except Exception:
-        # Best-effort only — pipeline can still work without persistence.
-        pass
+        return _store.put(session_id, session, expected_version=version)
+    except VersionConflict:
+        raise HTTPException(
+            status_code=409,
+            detail="Interview session was modified by another request. Please retry.",
+        )
+
+
+def _analysis_timeline(analysis: dict) -> List[dict]:
+    """Unified timeline events of an analysis (inline or via its timeline_sync artifact)."""
+    inline = analysis.get("timeline")
+    if isinstance(inline, list):
+        return inline
+    return (artifacts.resolve(analysis, "timeline_sync") or {}).get("timeline", [])
 
 
 def _as_safe_words_text(tokens: List[str]) -> str:
@@ -111,49 +159,6 @@ def _compute_eye_contact_ratio(edges: List[Dict[str, Any]], start_s: float, end_
     return max(0.0, min(1.0, ratio))
 
 
-def _json_loads_strict(content: str) -> Any:
-    """
-    Parse model output as JSON defensively: strip markdown fences and fall back to
-    a direct json.loads.
-    """
-    raw = (content or "").strip()
-    if raw.startswith("```json"):
-        raw = raw[len("```json") :].strip()
-    elif raw.startswith("```"):
-        raw = raw[len("```") :].strip()
-    if raw.endswith("```"):
-        raw = raw[: -len("```")].strip()
-    return json.loads(raw)
-
-
-# -----------------------------------------------------------------------------
-# LLM client
-# -----------------------------------------------------------------------------
-
-_groq_key = os.getenv("GROQ_API_KEY")
-openai_client = AsyncOpenAI(
-    api_key=_groq_key,
-    base_url="https://api.groq.com/openai/v1",  # OpenAI-compatible shim for Groq
-    timeout=60.0,
-)
-
-
-# -----------------------------------------------------------------------------
-# Optional Supabase (best-effort only)
-# -----------------------------------------------------------------------------
-
-try:
-    from supabase import create_client, Client
-
-    _supabase_url = os.getenv("SUPABASE_URL")
-    _supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-    supabase: Optional[Client] = (
-        create_client(_supabase_url, _supabase_key) if _supabase_url and _supabase_key else None
-    )
-except Exception:
-    supabase = None
-
-
 # -----------------------------------------------------------------------------
 # Schemas
 # -----------------------------------------------------------------------------
@@ -202,29 +207,66 @@ class InterviewReportResponse(BaseModel):
     interview_report: Dict[str, Any]
 
 
+class JobAcceptedResponse(BaseModel):
+    status: str  # "accepted"
+    job_id: str
+    session_id: str
+    status_url: str
+    events_url: str
+
+
+# LLM output schemas (validated by llm.complete_json; defaults mirror the fallbacks below)
+class GeneratedQuestionOutput(llm.LLMOutput):
+    text: str = ""
+    category: str = ""
+
+
+class GeneratedQuestionsOutput(llm.LLMOutput):
+    questions: List[GeneratedQuestionOutput] = []
+
+
+class AnswerEvaluationOutput(llm.LLMOutput):
+    scores: Dict[str, Any] = {}
+    feedback: str = ""
+    improvements: List[Any] = []
+    better_response: str = ""
+    ideal_answer: str = ""
+
+
+class BatchEvaluationOutput(llm.LLMOutput):
+    evaluations: List[Dict[str, Any]] = []
+
+
+class ReportSummaryOutput(llm.LLMOutput):
+    final_verdict: str = ""
+    strengths: List[Any] = []
+    weaknesses: List[Any] = []
+    improvements: List[Any] = []
+    skill_gap_analysis: List[Any] = []
+
+
 # -----------------------------------------------------------------------------
 # Endpoints
 # -----------------------------------------------------------------------------
 
 
-@router.post("/questions", response_model=GenerateQuestionsResponse)
-async def generate_questions(request: GenerateQuestionsRequest):
-    if not _groq_key:
-        raise HTTPException(status_code=503, detail="GROQ_API_KEY is not configured on this server.")
-
-    if not isinstance(request.resume_data, dict):
-        raise HTTPException(status_code=400, detail="resume_data must be an object.")
+def _bank_plan(request: GenerateQuestionsRequest, digest: dict) -> List[question_bank.Want]:
+    """Skill pools for the resume's top skills plus general behavioral questions."""
+    return question_bank.resume_plan(
+        (digest.get("skills") or [])[:_BANK_SKILLS], request.num_questions, request.difficulty
+    )
 
-    session_id = str(uuid.uuid4())
-    created_at = datetime.utcnow().isoformat() + "Z"
 
-    resume_json = json.dumps(request.resume_data, ensure_ascii=False)
+async def _generate_resume_questions(
+    request: GenerateQuestionsRequest, digest: dict, priority: Optional[int] = None
+) -> List[InterviewQuestion]:
+    """Resume-aware questions from the model (the question bank's miss path)."""
     prompt = f"""
 You are VidyaMitra's interview designer.
 Generate {request.num_questions} interview questions for a candidate using ONLY the provided resume data.
 
 Resume Data:
-{resume_json}
+{resume_digest.prompt_text(digest)}
 
 Rules:
 - Questions must be resume-aware: each question should reference something from skills/projects/experience.
@@ -246,21 +288,15 @@ Output schema:
 }}
 """
 
-    completion = await openai_client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
-        messages=[
+    try:
+        ai_data = await llm.complete_json("interview_pipeline.questions", [
             {
                 "role": "system",
                 "content": "You are a precise, JSON-outputting interview designer AI. Output ONLY raw JSON. No markdown, no formatting, no conversational text.",
             },
             {"role": "user", "content": prompt},
-        ],
-        response_format={"type": "json_object"}
-    )
-
-    try:
-        ai_data = _json_loads_strict(completion.choices[0].message.content or "{}")
-    except Exception as e:
+        ], schema=GeneratedQuestionsOutput, priority=priority)
+    except llm.LLMInvalidJSON as e:
         raise HTTPException(status_code=422, detail=f"AI failed to return valid JSON: {str(e)}")
 
     raw_questions = ai_data.get("questions", [])
@@ -287,22 +323,68 @@ Output schema:
 
     if len(formatted) < 5:
         raise HTTPException(status_code=422, detail="AI returned too few valid questions (invalid schema).")
+    return formatted
+
+
+async def _speculate_questions(resume_data: dict, num_questions: int, difficulty: str) -> Optional[List[InterviewQuestion]]:
+    """Questions generated right after /resume/parse; declined when the bank can serve them."""
+    request = GenerateQuestionsRequest(
+        user_id="", resume_data=resume_data, num_questions=num_questions, difficulty=difficulty
+    )
+    digest = resume_digest.get_digest(resume_data)
+    if question_bank.bank.covers(_bank_plan(request, digest)):
+        return None
+    return await _generate_resume_questions(request, digest, priority=llm.BATCH)
+
+
+# Speculated with the request defaults; other parameters generate on demand.
+speculative.register("interview_pipeline.questions", _speculate_questions, num_questions=6, difficulty="intermediate")
 
-    store = _load_store()
-    store[session_id] = {
+
+@router.post("/questions", response_model=GenerateQuestionsResponse)
+async def generate_questions(request: GenerateQuestionsRequest, supabase: Optional[Client] = Depends(get_supabase)):
+    if not llm.is_configured():
+        raise HTTPException(status_code=503, detail="GROQ_API_KEY is not configured on this server.")
+
+    if not isinstance(request.resume_data, dict):
+        raise HTTPException(status_code=400, detail="resume_data must be an object.")
+
+    session_id = str(uuid.uuid4())
+    created_at = datetime.utcnow().isoformat() + "Z"
+
+    digest = resume_digest.get_digest(request.resume_data)
+
+    # Questions generated speculatively after /resume/parse, else from the
+    # bank (skill pools plus general behavioral ones); generated from the
+    # resume only on a miss.
+    formatted = await speculative.registry.take(
+        "interview_pipeline.questions",
+        request.resume_data,
+        {"num_questions": request.num_questions, "difficulty": request.difficulty},
+    )
+    if formatted is None:
+        banked = question_bank.bank.assemble(request.user_id, _bank_plan(request, digest))
+        if banked is not None:
+            formatted = [
+                InterviewQuestion(id=str(uuid.uuid4()), text=q["text"], category=q["category"]) for q in banked
+            ]
+        else:
+            formatted = await _generate_resume_questions(request, digest)
+
+    _store.put(session_id, {
         "id": session_id,
         "user_id": request.user_id,
         "resume_data": request.resume_data,
+        "resume_digest": digest,
         "questions": [q.model_dump() for q in formatted],
         "status": "questions_generated",
         "created_at": created_at,
-    }
-    _save_store(store)
+    }, expected_version=0)
 
     # Best-effort Supabase write (schema may differ; never block demo).
     if supabase:
         try:
-            supabase.table("interview_sessions").upsert(
+            await db.execute(supabase.table("interview_sessions").upsert(
                 {
                     "id": session_id,
                     "user_id": request.user_id,
@@ -312,7 +394,7 @@ Output schema:
                     "created_at": created_at,
                 },
                 on_conflict="id",
-            ).execute()
+            ))
         except Exception:
             pass
 
@@ -331,11 +413,9 @@ async def record_interview(
     answer_windows: str = Form(..., description="JSON string of AnswerWindow[]."),
     video: UploadFile = File(...),
     audio: UploadFile = File(...),
+    supabase: Optional[Client] = Depends(get_supabase),
 ):
-    store = _load_store()
-    session = store.get(session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Interview session not found.")
+    session, version = _load_session(session_id)
     if str(session.get("user_id")) != str(user_id):
         raise HTTPException(status_code=403, detail="Unauthorized session access.")
 
@@ -367,8 +447,8 @@ async def record_interview(
     if len(video_bytes) == 0 or len(audio_bytes) == 0:
         raise HTTPException(status_code=400, detail="Uploaded media cannot be empty.")
 
-    video_path.write_bytes(video_bytes)
-    audio_path.write_bytes(audio_bytes)
+    atomic_write_bytes(video_path, video_bytes)
+    atomic_write_bytes(audio_path, audio_bytes)
 
     session["video_start_time"] = video_start_time
     session["answer_windows"] = [w.model_dump() for w in windows]
@@ -379,14 +459,14 @@ async def record_interview(
         "audio_filename": audio_path.name,
     }
     session["status"] = "recorded"
-    _save_store(store)
+    _save_session(session_id, session, version)
 
     # Best-effort Supabase update.
     video_url = f"/interview-media/{session_id}/{video_path.name}"
     audio_url = f"/interview-media/{session_id}/{audio_path.name}"
     if supabase:
         try:
-            supabase.table("interview_sessions").update(
+            await db.execute(supabase.table("interview_sessions").update(
                 {
                     "video_start_time": video_start_time,
                     "answer_windows": [w.model_dump() for w in windows],
@@ -394,7 +474,7 @@ async def record_interview(
                     "audio_url": audio_url,
                     "status": "recorded",
                 }
-            ).eq("id", session_id).eq("user_id", user_id).execute()
+            ).eq("id", session_id).eq("user_id", user_id))
         except Exception:
             pass
 
@@ -408,38 +488,65 @@ async def record_interview(
     }
 
 
-@router.post("/analyze", response_model=AnalyzeInterviewResponse)
-async def analyze_interview(session_id: str = Form(...), user_id: Optional[str] = Form(None)):
-    # NOTE: Using Form here keeps it easy for axios multipart patterns; also works for simple form posts.
-    store = _load_store()
-    session = store.get(session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Interview session not found.")
+def _check_analyzable(session: dict, user_id: Optional[str]) -> None:
+    """Raise the matching HTTP error unless the session can be analyzed."""
     if user_id is not None and str(session.get("user_id")) != str(user_id):
         raise HTTPException(status_code=403, detail="Unauthorized session access.")
 
     if session.get("status") not in ("recorded", "analyzed", "completed"):
         raise HTTPException(status_code=400, detail="Interview session is not ready for analysis.")
 
+    media = session.get("media") or {}
+    if not media.get("audio_path") or not media.get("video_path"):
+        raise HTTPException(status_code=400, detail="Media paths are missing.")
+    if not session.get("answer_windows"):
+        raise HTTPException(status_code=400, detail="answer_windows are missing.")
+    if not session.get("questions"):
+        raise HTTPException(status_code=400, detail="questions are missing.")
+
+
+def _wants_job(request: Request, background: bool) -> bool:
+    """Clients opt in to a background job with `background=true` or `Prefer: respond-async`."""
+    return background or "respond-async" in request.headers.get("prefer", "").lower()
+
+
+def _job_accepted(job_id: str, session_id: str, owner: str) -> JSONResponse:
+    query = urlencode({"user_id": owner})
+    status_url = f"/interview/jobs/{job_id}?{query}"
+    return JSONResponse(
+        status_code=202,
+        content={
+            "status": "accepted",
+            "job_id": job_id,
+            "session_id": session_id,
+            "status_url": status_url,
+            "events_url": f"/interview/jobs/{job_id}/events?{query}",
+        },
+        headers={"Location": status_url},
+    )
+
+
+async def _run_analysis(
+    session_id: str, user_id: Optional[str], progress: job_queue.Progress = job_queue.no_progress
+) -> dict:
+    session, version = _load_session(session_id)
+    _check_analyzable(session, user_id)
+
     media = session.get("media") or {}
     audio_path = media.get("audio_path")
     video_path = media.get("video_path")
     answer_windows = session.get("answer_windows") or []
-    questions = session.get("questions") or []
     resume_data = session.get("resume_data") or {}
     video_start_time = session.get("video_start_time") or ""
 
-    if not audio_path or not video_path:
-        raise HTTPException(status_code=400, detail="Media paths are missing.")
-    if not answer_windows:
-        raise HTTPException(status_code=400, detail="answer_windows are missing.")
-    if not questions:
-        raise HTTPException(status_code=400, detail="questions are missing.")
-
-    audio_bytes = Path(audio_path).read_bytes()
-    video_bytes = Path(video_path).read_bytes()
+    # Everything blocking below (file reads, the Groq SDK, the OpenCV frame
+    # loop) runs on worker threads: this also runs as a background job on
+    # the API's event loop, which must stay free for requests and lease renewals.
+    audio_bytes = await asyncio.to_thread(Path(audio_path).read_bytes)
+    video_bytes = await asyncio.to_thread(Path(video_path).read_bytes)
 
     # 1) Transcribe + filler detection (with word timestamps).
+    progress("transcribing")
     try:
         audio_result = await analyze_audio(audio_bytes, filename="audio.webm", target_fillers=None)
     except Exception as e:
@@ -468,10 +575,12 @@ async def analyze_interview(session_id: str = Form(...), user_id: Optional[str]
     ]
 
     # 2) Eye contact events (transitions) from video.
+    progress("eye-contact")
     eye_edges = await process_video_eye_contact(video_bytes, filename="video.webm", target_fps=3)
     # eye_edges: [{timestamp, eye_contact}]
 
     # 3) Timeline (unified + question boundaries).
+    progress("timeline")
     question_boundary_events: List[dict] = []
     for w in answer_windows:
         qid = w.get("question_id")
@@ -528,6 +637,7 @@ async def analyze_interview(session_id: str = Form(...), user_id: Optional[str]
     )
 
     # 4) Per-question segmentation (transcript excerpt + metrics).
+    progress("segmenting")
     per_question: List[dict] = []
     for w in answer_windows:
         qid = w.get("question_id")
@@ -586,18 +696,40 @@ async def analyze_interview(session_id: str = Form(...), user_id: Optional[str]
         },
     }
 
-    session["analysis"] = analysis
+    # Keep the session record small: the bulky parts live in per-session
+    # artifact files and are loaded by reference only where needed. The
+    # timeline is stored once (inside timeline_sync) and re-derived on load.
+    progress("saving")
+    artifact_refs = await asyncio.to_thread(
+        artifacts.save_artifacts,
+        session_id,
+        {
+            "transcript": transcript,
+            "filler_words": filler_words,
+            "eye_contact_edges": eye_edges,
+            "timeline_sync": timeline,
+            "per_question": per_question,
+        },
+    )
+    session["analysis"] = {
+        "duration_seconds": duration,
+        "timeline_summary": analysis["timeline_summary"],
+        "video_start_time": video_start_time,
+        "resume_data_preview": analysis["resume_data_preview"],
+        "artifacts": artifact_refs,
+    }
     session["status"] = "analyzed"
-    _save_store(store)
+    _save_session(session_id, session, version)
 
+    supabase = db.client()  # also runs in job workers, outside any request
     if supabase:
         try:
-            supabase.table("interview_sessions").update(
+            await db.execute(supabase.table("interview_sessions").update(
                 {
                     "analysis_data": analysis,
                     "status": "analyzed",
                 }
-            ).eq("id", session_id).eq("user_id", session.get("user_id")).execute()
+            ).eq("id", session_id).eq("user_id", session.get("user_id")))
         except Exception:
             pass
 
@@ -608,95 +740,178 @@ async def analyze_interview(session_id: str = Form(...), user_id: Optional[str]
     }
 
 
-@router.post("/report", response_model=InterviewReportResponse)
-async def generate_report(
+async def _analysis_job(payload: dict, progress: job_queue.Progress) -> dict:
+    return await _run_analysis(payload["session_id"], payload.get("user_id"), progress)
+
+
+job_queue.queue.register("interview.analyze", _analysis_job, stages=ANALYSIS_STAGES)
+
+
+@router.post(
+    "/analyze",
+    response_model=AnalyzeInterviewResponse,
+    responses={202: {"model": JobAcceptedResponse, "description": "Queued as a background job."}},
+)
+async def analyze_interview(
+    request: Request,
     session_id: str = Form(...),
-    user_id: str = Form(...),
+    user_id: Optional[str] = Form(None),
+    background: bool = Form(False),
 ):
-    store = _load_store()
-    session = store.get(session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Interview session not found.")
+    # NOTE: Using Form here keeps it easy for axios multipart patterns; also works for simple form posts.
+    session, _ = _load_session(session_id)
+    _check_analyzable(session, user_id)
+
+    if _wants_job(request, background):
+        owner = str(session.get("user_id"))
+        job_id = job_queue.queue.enqueue(
+            "interview.analyze",
+            {"session_id": session_id, "user_id": user_id},
+            owner=owner,
+            dedupe_key=f"interview.analyze:{session_id}",
+        )
+        return _job_accepted(job_id, session_id, owner)
+
+    return await _run_analysis(session_id, user_id)
+
+
+# -----------------------------------------------------------------------------
+# Report generation (shared by /report and /report/stream)
+# -----------------------------------------------------------------------------
+
+
+def _clamp_0_100(value: Any) -> int:
+    try:
+        n = float(value)
+    except Exception:
+        return 0
+    n = max(0.0, min(100.0, n))
+    return int(round(n))
+
+
+def _truncate(text: str, max_chars: int = 500) -> str:
+    """Truncate text to limit LLM input/output size."""
+    if not isinstance(text, str):
+        return ""
+    return text[:max_chars] + ("..." if len(text) > max_chars else "")
+
+
+def _as_str_list(value: Any, max_items: int = 5) -> list[str]:
+    if not isinstance(value, list):
+        return []
+    return [_truncate(str(x), 200) for x in value[:max_items] if x is not None]
+
+
+def _load_reportable_session(session_id: str, user_id: str) -> Tuple[dict, int]:
+    """Load a session that is ready for reporting, or raise the matching HTTP error."""
+    session, version = _load_session(session_id)
     if str(session.get("user_id")) != str(user_id):
         raise HTTPException(status_code=403, detail="Unauthorized session access.")
 
     if session.get("status") not in ("analyzed", "completed"):
         raise HTTPException(status_code=400, detail="Interview session must be analyzed before reporting.")
 
-    if not _groq_key:
+    if not llm.is_configured():
         raise HTTPException(status_code=503, detail="GROQ_API_KEY is not configured on this server.")
 
-    analysis = session.get("analysis") or {}
-    if not analysis:
+    if not session.get("analysis"):
         raise HTTPException(status_code=400, detail="analysis is missing.")
+    return session, version
 
-    questions = session.get("questions") or []
-    per_question = analysis.get("per_question") or []
-    resume_data = session.get("resume_data") or {}
-    timeline_summary = analysis.get("timeline_summary") or {}
 
+def _report_inputs(session: dict) -> Tuple[List[dict], Dict[Any, dict]]:
+    """(per-question analysis capped at 7, questions by id)."""
+    per_question = artifacts.resolve(session["analysis"], "per_question") or []
     # --- Safety: cap questions at 7 ---
     per_question = per_question[:7]
-
     # Index questions by id for fast matching.
-    q_by_id = {q.get("id"): q for q in questions}
+    q_by_id = {q.get("id"): q for q in session.get("questions") or []}
+    return per_question, q_by_id
 
-    per_question_by_id: dict[str, dict] = {}
-    for item in per_question:
-        qid = item.get("question_id")
-        if qid:
-            per_question_by_id[str(qid)] = item
 
-    # --- Helpers ---
-    def _clamp_0_100(value: Any) -> int:
-        try:
-            n = float(value)
-        except Exception:
-            return 0
-        n = max(0.0, min(100.0, n))
-        return int(round(n))
-
-    def _truncate(text: str, max_chars: int = 500) -> str:
-        """Truncate text to limit LLM input/output size."""
-        if not isinstance(text, str):
-            return ""
-        return text[:max_chars] + ("..." if len(text) > max_chars else "")
-
-    def _as_str_list(value: Any, max_items: int = 5) -> list[str]:
-        if not isinstance(value, list):
-            return []
-        return [_truncate(str(x), 200) for x in value[:max_items] if x is not None]
-
-    # =========================================================================
-    # STEP 1: Per-question analysis (3-axis scores + feedback)
-    #   Each question evaluated independently for accuracy.
-    # =========================================================================
-
-    async def eval_single_answer(item: dict) -> dict:
-        qid = item.get("question_id")
-        qid_str = str(qid) if qid is not None else ""
-        q = q_by_id.get(qid) or {}
-        question_text = _truncate(q.get("text", ""), 300)
+# =========================================================================
+# STEP 1: Per-question analysis (3-axis scores + feedback)
+#   Each question evaluated independently for accuracy.
+# =========================================================================
 
+
+def _answer_payload(item: dict, q_by_id: Dict[Any, dict]) -> dict:
+    q = q_by_id.get(item.get("question_id")) or {}
+    return {
+        "question_text": _truncate(q.get("text", ""), 300),
         # Truncate transcript to limit payload size
-        transcript_raw = item.get("transcript_excerpt", "")
-        transcript_truncated = _truncate(transcript_raw, 400)
-
-        per_q_payload = {
-            "question_text": question_text,
-            "transcript_excerpt": transcript_truncated,
-            "filler_word_count": item.get("filler_word_count", 0),
-            "top_fillers": item.get("top_fillers", [])[:5],
-            "eye_contact_ratio": item.get("eye_contact_ratio", 0.0),
-        }
+        "transcript_excerpt": _truncate(item.get("transcript_excerpt", ""), 400),
+        "filler_word_count": item.get("filler_word_count", 0),
+        "top_fillers": item.get("top_fillers", [])[:5],
+        "eye_contact_ratio": item.get("eye_contact_ratio", 0.0),
+    }
 
-        resume_preview = {
-            "skills": resume_data.get("skills", [])[:15],
-            "projects": resume_data.get("projects", [])[:3] if isinstance(resume_data.get("projects"), list) else [],
-            "experience": resume_data.get("experience", [])[:3] if isinstance(resume_data.get("experience"), list) else [],
-        }
 
-        prompt = f"""You are an expert interview evaluator for VidyaMitra.
+def _session_digest(session: dict) -> dict:
+    """Resume digest stored with the session (built for sessions that predate it)."""
+    digest = session.get("resume_digest")
+    if isinstance(digest, dict):
+        return digest
+    return resume_digest.get_digest(session.get("resume_data") or {})
+
+
+def _normalize_evaluation(parsed: dict, qid_str: str) -> dict:
+    # Extract 3-axis scores
+    scores_raw = parsed.get("scores", {})
+    if not isinstance(scores_raw, dict):
+        scores_raw = {}
+    tech = _clamp_0_100(scores_raw.get("technical", parsed.get("score", 0)))
+    comm = _clamp_0_100(scores_raw.get("communication", 0))
+    conf = _clamp_0_100(scores_raw.get("confidence", parsed.get("confidence", 0)))
+
+    # Deterministic combined score
+    combined_score = int(round((tech + comm + conf) / 3))
+
+    feedback = parsed.get("feedback", "")
+    improvements = parsed.get("improvements", [])
+    better_response = parsed.get("better_response", "")
+    ideal_answer = parsed.get("ideal_answer", "")
+
+    feedback_val = _truncate(feedback, 500) if isinstance(feedback, str) else "Evaluation failed for this answer."
+    if isinstance(improvements, list):
+        improvements_val = [_truncate(str(x), 200) for x in improvements[:3] if x is not None]
+    else:
+        improvements_val = []
+
+    return {
+        "question_id": qid_str,
+        "score": combined_score,
+        "confidence": conf,
+        "scores": {
+            "technical": tech,
+            "communication": comm,
+            "confidence": conf,
+        },
+        "feedback": feedback_val,
+        "improvements": improvements_val,
+        "better_response": _truncate(better_response, 600) if isinstance(better_response, str) else "",
+        "ideal_answer": _truncate(ideal_answer, 600) if isinstance(ideal_answer, str) else "",
+    }
+
+
+def _failed_evaluation(qid_str: str) -> dict:
+    return {
+        "question_id": qid_str,
+        "score": 0,
+        "confidence": 0,
+        "scores": {"technical": 0, "communication": 0, "confidence": 0},
+        "feedback": "Evaluation failed for this answer.",
+        "improvements": [],
+        "better_response": "",
+        "ideal_answer": "",
+    }
+
+
+async def _evaluate_answer(item: dict, q_by_id: Dict[Any, dict], digest: dict) -> dict:
+    qid = item.get("question_id")
+    qid_str = str(qid) if qid is not None else ""
+
+    prompt = f"""You are an expert interview evaluator for VidyaMitra.
 Evaluate the candidate's answer on 3 axes (0-100 each):
 - technical_score: depth of technical knowledge shown
 - communication_score: clarity, structure, and articulation
@@ -705,10 +920,10 @@ Evaluate the candidate's answer on 3 axes (0-100 each):
 Also provide a concise feedback and an improved version of their answer.
 
 Candidate answer:
-{json.dumps(per_q_payload, ensure_ascii=False)}
+{json.dumps(_answer_payload(item, q_by_id), ensure_ascii=False)}
 
 Candidate resume context:
-{json.dumps(resume_preview, ensure_ascii=False)}
+{resume_digest.prompt_text(digest)}
 
 Return strictly valid JSON (keep text fields concise, max 3-4 sentences each):
 {{
@@ -724,80 +939,126 @@ Return strictly valid JSON (keep text fields concise, max 3-4 sentences each):
   "ideal_answer": "Strong model answer (max 5 sentences)."
 }}"""
 
-        try:
-            resp = await openai_client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a precise, JSON-outputting interview evaluator AI. Output ONLY raw JSON. No markdown, no formatting, no conversational text. Keep all text fields concise.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                response_format={"type": "json_object"}
-            )
-            parsed = _json_loads_strict(resp.choices[0].message.content or "{}")
-            if not isinstance(parsed, dict):
-                raise ValueError("Per-question evaluation is not a JSON object.")
-
-            # Extract 3-axis scores
-            scores_raw = parsed.get("scores", {})
-            if not isinstance(scores_raw, dict):
-                scores_raw = {}
-            tech = _clamp_0_100(scores_raw.get("technical", parsed.get("score", 0)))
-            comm = _clamp_0_100(scores_raw.get("communication", 0))
-            conf = _clamp_0_100(scores_raw.get("confidence", parsed.get("confidence", 0)))
-
-            # Deterministic combined score
-            combined_score = int(round((tech + comm + conf) / 3))
-
-            feedback = parsed.get("feedback", "")
-            improvements = parsed.get("improvements", [])
-            better_response = parsed.get("better_response", "")
-            ideal_answer = parsed.get("ideal_answer", "")
-
-            feedback_val = _truncate(feedback, 500) if isinstance(feedback, str) else "Evaluation failed for this answer."
-            if isinstance(improvements, list):
-                improvements_val = [_truncate(str(x), 200) for x in improvements[:3] if x is not None]
-            else:
-                improvements_val = []
-
-            return {
-                "question_id": qid_str,
-                "score": combined_score,
-                "confidence": conf,
-                "scores": {
-                    "technical": tech,
-                    "communication": comm,
-                    "confidence": conf,
-                },
-                "feedback": feedback_val,
-                "improvements": improvements_val,
-                "better_response": _truncate(better_response, 600) if isinstance(better_response, str) else "",
-                "ideal_answer": _truncate(ideal_answer, 600) if isinstance(ideal_answer, str) else "",
-            }
-        except Exception:
-            return {
-                "question_id": qid_str,
-                "score": 0,
-                "confidence": 0,
-                "scores": {"technical": 0, "communication": 0, "confidence": 0},
-                "feedback": "Evaluation failed for this answer.",
-                "improvements": [],
-                "better_response": "",
-                "ideal_answer": "",
-            }
+    try:
+        parsed = await llm.complete_json("interview_pipeline.evaluate_answer", [
+            {
+                "role": "system",
+                "content": "You are a precise, JSON-outputting interview evaluator AI. Output ONLY raw JSON. No markdown, no formatting, no conversational text. Keep all text fields concise.",
+            },
+            {"role": "user", "content": prompt},
+        ], schema=AnswerEvaluationOutput, coalesce=True)
+        return _normalize_evaluation(parsed, qid_str)
+    except Exception:
+        return _failed_evaluation(qid_str)
+
+
+def _is_valid_batch_item(entry: Any) -> bool:
+    """A batched evaluation is kept only if every score axis and the feedback are present."""
+    if not isinstance(entry, dict):
+        return False
+    scores = entry.get("scores")
+    if not isinstance(scores, dict):
+        return False
+    for axis in ("technical", "communication", "confidence"):
+        value = scores.get(axis)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return False
+    feedback = entry.get("feedback")
+    return isinstance(feedback, str) and bool(feedback.strip())
+
+
+async def _evaluate_answers_batched(
+    per_question: List[dict], q_by_id: Dict[Any, dict], digest: dict
+) -> List[Optional[dict]]:
+    """
+    Evaluate every answer in one completion (the resume context and the
+    instructions are sent once). Returns one normalized evaluation per item,
+    or None where the model's entry is missing or fails validation.
+    """
+    if not per_question:
+        return []
+    qid_strs = [str(item.get("question_id")) if item.get("question_id") is not None else "" for item in per_question]
+    answers = [
+        {"question_id": qid_str, **_answer_payload(item, q_by_id)}
+        for qid_str, item in zip(qid_strs, per_question)
+    ]
+
+    prompt = f"""You are an expert interview evaluator for VidyaMitra.
+Evaluate EACH of the candidate's answers below independently, on 3 axes (0-100 each):
+- technical: depth of technical knowledge shown
+- communication: clarity, structure, and articulation
+- confidence: conviction and assertiveness in delivery
+
+For each answer also provide concise feedback and an improved version of the answer.
+
+Candidate answers:
+{json.dumps(answers, ensure_ascii=False)}
+
+Candidate resume context:
+{resume_digest.prompt_text(digest)}
+
+Return strictly valid JSON with exactly one entry per answer, using the same question_id values
+(keep text fields concise, max 3-4 sentences each):
+{{
+  "evaluations": [
+    {{
+      "question_id": "<question_id of the answer>",
+      "scores": {{"technical": 0, "communication": 0, "confidence": 0}},
+      "feedback": "2-3 sentences of specific, actionable feedback.",
+      "improvements": ["improvement 1", "improvement 2"],
+      "better_response": "Concise improved answer (max 4 sentences).",
+      "ideal_answer": "Strong model answer (max 5 sentences)."
+    }}
+  ]
+}}"""
+
+    try:
+        parsed = await llm.complete_json("interview_pipeline.evaluate_batch", [
+            {
+                "role": "system",
+                "content": "You are a precise, JSON-outputting interview evaluator AI. Output ONLY raw JSON. No markdown, no formatting, no conversational text. Keep all text fields concise.",
+            },
+            {"role": "user", "content": prompt},
+        ], schema=BatchEvaluationOutput, coalesce=True)
+    except Exception as e:
+        print(f"Batched answer evaluation failed, falling back to per-question calls: {e}")
+        return [None] * len(per_question)
+
+    by_id: Dict[str, dict] = {}
+    for entry in parsed["evaluations"]:
+        if entry.get("question_id") is not None:
+            by_id.setdefault(str(entry["question_id"]), entry)
+
+    results: List[Optional[dict]] = []
+    for qid_str in qid_strs:
+        entry = by_id.get(qid_str)
+        results.append(_normalize_evaluation(entry, qid_str) if _is_valid_batch_item(entry) else None)
+    return results
+
+
+async def _evaluate_answers(per_question: List[dict], q_by_id: Dict[Any, dict], digest: dict) -> List[dict]:
+    """Evaluate all answers according to INTERVIEW_EVAL_MODE, in question order."""
+    if settings.INTERVIEW_EVAL_MODE == "batched":
+        evaluations = await _evaluate_answers_batched(per_question, q_by_id, digest)
+    else:
+        evaluations = [None] * len(per_question)
+
+    # Evaluate the remaining answers concurrently.
+    missing = [i for i, e in enumerate(evaluations) if e is None]
+    fallbacks = await asyncio.gather(*(_evaluate_answer(per_question[i], q_by_id, digest) for i in missing))
+    for i, evaluation in zip(missing, fallbacks):
+        evaluations[i] = evaluation
+    return evaluations
 
-    # Evaluate answers concurrently.
-    eval_tasks = [eval_single_answer(item) for item in per_question]
-    individual_evaluations = list(await asyncio.gather(*eval_tasks))
 
-    # =========================================================================
-    # STEP 2: Final summary + skill gap analysis (separate LLM call)
-    #   Uses aggregated per-question scores for accuracy.
-    # =========================================================================
+# =========================================================================
+# STEP 2: Final summary + skill gap analysis (separate LLM call)
+#   Uses aggregated per-question scores for accuracy.
+# =========================================================================
 
-    # Compute deterministic overall scores from per-question results
+
+def _overall_scores(individual_evaluations: List[dict]) -> Dict[str, int]:
+    """Deterministic overall scores from per-question results."""
     all_tech = [e.get("scores", {}).get("technical", 0) for e in individual_evaluations]
     all_comm = [e.get("scores", {}).get("communication", 0) for e in individual_evaluations]
     all_conf = [e.get("scores", {}).get("confidence", 0) for e in individual_evaluations]
@@ -805,8 +1066,21 @@ Return strictly valid JSON (keep text fields concise, max 3-4 sentences each):
     avg_tech = int(round(sum(all_tech) / max(len(all_tech), 1)))
     avg_comm = int(round(sum(all_comm) / max(len(all_comm), 1)))
     avg_conf = int(round(sum(all_conf) / max(len(all_conf), 1)))
-    deterministic_final = int(round((avg_tech + avg_comm + avg_conf) / 3))
+    return {
+        "technical": avg_tech,
+        "communication": avg_comm,
+        "confidence": avg_conf,
+        "final": int(round((avg_tech + avg_comm + avg_conf) / 3)),
+    }
 
+
+async def _summarize(
+    individual_evaluations: List[dict],
+    overall: Dict[str, int],
+    q_by_id: Dict[Any, dict],
+    digest: dict,
+    timeline_summary: dict,
+) -> dict:
     # Prepare compact evaluation summary for the second LLM call
     compact_evals = []
     for e in individual_evaluations:
@@ -818,20 +1092,16 @@ Return strictly valid JSON (keep text fields concise, max 3-4 sentences each):
             "feedback_snippet": _truncate(e.get("feedback", ""), 100),
         })
 
-    # Extract skills for gap analysis (top 8)
-    resume_skills = resume_data.get("skills", [])
-    if isinstance(resume_skills, list):
-        resume_skills = [str(s) for s in resume_skills if s][:8]
-    else:
-        resume_skills = []
+    # Skills for gap analysis (top 8)
+    resume_skills = list(digest.get("skills") or [])[:8]
 
     summary_prompt = f"""You are a career coach writing an interview summary.
 
 Overall computed scores:
-- Technical: {avg_tech}/100
-- Communication: {avg_comm}/100
-- Confidence: {avg_conf}/100
-- Final: {deterministic_final}/100
+- Technical: {overall["technical"]}/100
+- Communication: {overall["communication"]}/100
+- Confidence: {overall["confidence"]}/100
+- Final: {overall["final"]}/100
 
 Timeline stats: {json.dumps(timeline_summary, ensure_ascii=False)}
 
@@ -860,19 +1130,14 @@ Schema:
 }}"""
 
     try:
-        summary_resp = await openai_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a precise, JSON-outputting career coach AI. Output ONLY raw JSON. No markdown, no formatting. Keep all text concise.",
-                },
-                {"role": "user", "content": summary_prompt},
-            ],
-            response_format={"type": "json_object"}
-        )
-        summary_data = _json_loads_strict(summary_resp.choices[0].message.content or "{}")
-    except Exception as e:
+        summary_data = await llm.complete_json("interview_pipeline.summary", [
+            {
+                "role": "system",
+                "content": "You are a precise, JSON-outputting career coach AI. Output ONLY raw JSON. No markdown, no formatting. Keep all text concise.",
+            },
+            {"role": "user", "content": summary_prompt},
+        ], schema=ReportSummaryOutput, coalesce=True)
+    except Exception:
         # Fallback: use computed values without AI summary
         summary_data = {
             "final_verdict": "Interview analysis complete. Review your per-question feedback for detailed insights.",
@@ -881,7 +1146,10 @@ Schema:
             "improvements": [],
             "skill_gap_analysis": [],
         }
+    return summary_data
+
 
+def _normalize_skill_gaps(summary_data: dict) -> List[dict]:
     # Normalize skill gap (cap at 8, clamp scores)
     raw_skill_gaps = summary_data.get("skill_gap_analysis", [])
     if not isinstance(raw_skill_gaps, list):
@@ -895,76 +1163,250 @@ Schema:
             "score": _clamp_0_100(sg.get("score", 0)),
             "level": _truncate(str(sg.get("level", "Unknown")), 30),
         })
+    return skill_gap_analysis
 
-    # Normalize per-question feedback with answer window metadata + timestamp buffer
-    per_q_feedback = []
-    for item in individual_evaluations:
-        qid = str(item.get("question_id") or "")
-        meta = per_question_by_id.get(qid, {})
 
-        # Apply -1 sec buffer to start timestamps for better seek alignment
-        raw_start = float(meta.get("answer_start_offset_seconds", 0) or 0)
-        buffered_start = max(0.0, raw_start - 1.0)
+def _question_feedback(item: dict, per_question_by_id: Dict[str, dict]) -> dict:
+    """Per-question feedback with answer window metadata + timestamp buffer."""
+    qid = str(item.get("question_id") or "")
+    meta = per_question_by_id.get(qid, {})
 
-        per_q_feedback.append(
-            {
-                "question_id": qid,
-                "score": item.get("score", 0),
-                "confidence": item.get("confidence", 0),
-                "scores": item.get("scores", {"technical": 0, "communication": 0, "confidence": 0}),
-                "feedback": item.get("feedback", ""),
-                "improvements": item.get("improvements", []),
-                "better_response": item.get("better_response", ""),
-                "ideal_answer": item.get("ideal_answer", ""),
-                "answer_start_offset_seconds": buffered_start,
-                "answer_end_offset_seconds": float(meta.get("answer_end_offset_seconds", 0) or 0),
-                "transcript_excerpt": _truncate(meta.get("transcript_excerpt", ""), 500),
-                "eye_contact_ratio": meta.get("eye_contact_ratio", 0),
-                "filler_word_count": meta.get("filler_word_count", 0),
-            }
-        )
+    # Apply -1 sec buffer to start timestamps for better seek alignment
+    raw_start = float(meta.get("answer_start_offset_seconds", 0) or 0)
+    buffered_start = max(0.0, raw_start - 1.0)
+
+    return {
+        "question_id": qid,
+        "score": item.get("score", 0),
+        "confidence": item.get("confidence", 0),
+        "scores": item.get("scores", {"technical": 0, "communication": 0, "confidence": 0}),
+        "feedback": item.get("feedback", ""),
+        "improvements": item.get("improvements", []),
+        "better_response": item.get("better_response", ""),
+        "ideal_answer": item.get("ideal_answer", ""),
+        "answer_start_offset_seconds": buffered_start,
+        "answer_end_offset_seconds": float(meta.get("answer_end_offset_seconds", 0) or 0),
+        "transcript_excerpt": _truncate(meta.get("transcript_excerpt", ""), 500),
+        "eye_contact_ratio": meta.get("eye_contact_ratio", 0),
+        "filler_word_count": meta.get("filler_word_count", 0),
+    }
+
+
+def _assemble_report(
+    analysis: dict,
+    per_question: List[dict],
+    individual_evaluations: List[dict],
+    overall: Dict[str, int],
+    summary_data: dict,
+) -> dict:
+    timeline_summary = analysis.get("timeline_summary") or {}
+    per_question_by_id: dict[str, dict] = {}
+    for item in per_question:
+        qid = item.get("question_id")
+        if qid:
+            per_question_by_id[str(qid)] = item
 
-    interview_report = {
-        "technical_score": avg_tech,
-        "communication_score": avg_comm,
-        "confidence_score": avg_conf,
+    final_score = overall["final"]
+    return {
+        "technical_score": overall["technical"],
+        "communication_score": overall["communication"],
+        "confidence_score": overall["confidence"],
         "filler_word_count": int(timeline_summary.get("filler_word", 0) or 0),
         "eye_contact_score": _clamp_0_100(timeline_summary.get("eye_contact", 0)),
-        "final_score": deterministic_final,
+        "final_score": final_score,
         "final_verdict": _truncate(
             summary_data.get("final_verdict", "") if isinstance(summary_data.get("final_verdict"), str) else "", 500
         ),
         "key_strengths": _as_str_list(summary_data.get("strengths", []), 4),
         "areas_for_improvement": _as_str_list(summary_data.get("weaknesses", []), 4),
         "final_summary": {
-            "overall_score": deterministic_final,
+            "overall_score": final_score,
             "strengths": _as_str_list(summary_data.get("strengths", []), 4),
             "weaknesses": _as_str_list(summary_data.get("weaknesses", []), 4),
             "improvements": _as_str_list(summary_data.get("improvements", []), 4),
         },
-        "skill_gap_analysis": skill_gap_analysis,
-        "per_question_feedback": per_q_feedback,
-        "timeline": analysis.get("timeline", []),
+        "skill_gap_analysis": _normalize_skill_gaps(summary_data),
+        "per_question_feedback": [_question_feedback(e, per_question_by_id) for e in individual_evaluations],
+        "timeline": _analysis_timeline(analysis),
     }
 
-    session["report"] = interview_report
+
+async def _persist_report(session_id: str, user_id: str, session: dict, version: int, interview_report: dict) -> None:
+    analysis = session.get("analysis") or {}
+    # The timeline is already stored in the analysis's timeline_sync artifact;
+    # keep a reference to its event list, which artifacts.resolve(report,
+    # "timeline") turns back into the list the report was built with.
+    timeline_sync = (analysis.get("artifacts") or {}).get("timeline_sync")
+    session["report"] = {
+        **interview_report,
+        "timeline": artifacts.sub_ref(timeline_sync, "timeline") if timeline_sync else interview_report["timeline"],
+    }
     session["status"] = "completed"
-    _save_store(store)
+    _save_session(session_id, session, version)
 
+    supabase = db.client()  # also runs in job workers, outside any request
     if supabase:
         try:
-            supabase.table("interview_sessions").update(
+            db_response = await db.execute(supabase.table("interview_sessions").update(
                 {
                     "evaluation_data": interview_report,
                     "status": "completed",
                 }
-            ).eq("id", session_id).eq("user_id", user_id).execute()
+            ).eq("id", session_id).eq("user_id", user_id))
+            if db_response.data:
+                # Pipeline reports carry no dashboard score, so this drops any
+                # score an earlier /evaluate/interview-summary gave the session.
+                progress_rollup.rollups.record(
+                    user_id, "interview", session_id, progress_rollup.interview_score(interview_report)
+                )
         except Exception:
             pass
 
+
+async def _run_report(
+    session_id: str, user_id: str, progress: job_queue.Progress = job_queue.no_progress
+) -> dict:
+    session, version = _load_reportable_session(session_id, user_id)
+    analysis = session["analysis"]
+    digest = _session_digest(session)
+    per_question, q_by_id = _report_inputs(session)
+
+    progress("evaluating")
+    individual_evaluations = await _evaluate_answers(per_question, q_by_id, digest)
+
+    progress("summarizing")
+    overall = _overall_scores(individual_evaluations)
+    summary_data = await _summarize(
+        individual_evaluations, overall, q_by_id, digest, analysis.get("timeline_summary") or {}
+    )
+
+    progress("saving")
+    interview_report = _assemble_report(analysis, per_question, individual_evaluations, overall, summary_data)
+    await _persist_report(session_id, user_id, session, version, interview_report)
+
     return {
         "status": "success",
         "session_id": session_id,
         "interview_report": interview_report,
     }
 
+
+async def _report_job(payload: dict, progress: job_queue.Progress) -> dict:
+    return await _run_report(payload["session_id"], payload["user_id"], progress)
+
+
+job_queue.queue.register("interview.report", _report_job, stages=REPORT_STAGES)
+
+
+@router.post(
+    "/report",
+    response_model=InterviewReportResponse,
+    responses={202: {"model": JobAcceptedResponse, "description": "Queued as a background job."}},
+)
+async def generate_report(
+    request: Request,
+    session_id: str = Form(...),
+    user_id: str = Form(...),
+    background: bool = Form(False),
+):
+    _load_reportable_session(session_id, user_id)
+
+    if _wants_job(request, background):
+        job_id = job_queue.queue.enqueue(
+            "interview.report",
+            {"session_id": session_id, "user_id": user_id},
+            owner=str(user_id),
+            dedupe_key=f"interview.report:{session_id}",
+        )
+        return _job_accepted(job_id, session_id, str(user_id))
+
+    return await _run_report(session_id, user_id)
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/report/stream")
+async def stream_report(
+    session_id: str = Form(...),
+    user_id: str = Form(...),
+):
+    """
+    Server-Sent Events variant of /report.
+
+    Emits one `question` event per answer as soon as its evaluation lands
+    (completion order, with `index` giving its position; in batched mode the
+    batch's valid items arrive together, then any fallbacks), then `summary`
+    with the overall scores and verdict, then `report` with the persisted
+    interview report (same shape as /report). Failures after the stream has
+    started are sent as an `error` event.
+    """
+    # Validate before streaming, so bad requests still get a plain HTTP error.
+    session, version = _load_reportable_session(session_id, user_id)
+    analysis = session["analysis"]
+    digest = _session_digest(session)
+    per_question, q_by_id = _report_inputs(session)
+
+    async def _indexed(index: int, item: dict) -> Tuple[int, dict]:
+        return index, await _evaluate_answer(item, q_by_id, digest)
+
+    async def events():
+        tasks: List[asyncio.Future] = []
+        try:
+            yield _sse("start", {"session_id": session_id, "total_questions": len(per_question)})
+
+            individual_evaluations: List[Optional[dict]] = [None] * len(per_question)
+            if settings.INTERVIEW_EVAL_MODE == "batched":
+                batched = await _evaluate_answers_batched(per_question, q_by_id, digest)
+                for index, evaluation in enumerate(batched):
+                    if evaluation is not None:
+                        individual_evaluations[index] = evaluation
+                        yield _sse("question", {"index": index, "evaluation": evaluation})
+
+            tasks = [
+                asyncio.ensure_future(_indexed(i, item))
+                for i, item in enumerate(per_question)
+                if individual_evaluations[i] is None
+            ]
+            for done in asyncio.as_completed(tasks):
+                index, evaluation = await done
+                individual_evaluations[index] = evaluation
+                yield _sse("question", {"index": index, "evaluation": evaluation})
+
+            overall = _overall_scores(individual_evaluations)
+            summary_data = await _summarize(
+                individual_evaluations, overall, q_by_id, digest, analysis.get("timeline_summary") or {}
+            )
+            interview_report = _assemble_report(analysis, per_question, individual_evaluations, overall, summary_data)
+            yield _sse("summary", {
+                "technical_score": interview_report["technical_score"],
+                "communication_score": interview_report["communication_score"],
+                "confidence_score": interview_report["confidence_score"],
+                "final_score": interview_report["final_score"],
+                "final_verdict": interview_report["final_verdict"],
+                "final_summary": interview_report["final_summary"],
+                "skill_gap_analysis": interview_report["skill_gap_analysis"],
+            })
+
+            await _persist_report(session_id, user_id, session, version, interview_report)
+            yield _sse("report", {
+                "status": "success",
+                "session_id": session_id,
+                "interview_report": interview_report,
+            })
+        except HTTPException as e:
+            yield _sse("error", {"status_code": e.status_code, "detail": e.detail})
+        except Exception as e:
+            print(f"Interview report stream failed for {session_id}: {e}")
+            yield _sse("error", {"status_code": 500, "detail": "Failed to generate interview report."})
+        finally:
+            # Client went away (or we failed): stop evaluations nobody will read.
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,25 +1,13 @@
-import os
-import json
 import urllib.parse
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
-from typing import Optional
-from supabase import create_client, Client
+from typing import List, Optional
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
 
-load_dotenv()
+from ..services import db, llm, progress_rollup
+from ..services.db import Client, get_supabase
 
-_supabase_url = os.getenv("SUPABASE_URL")
-_supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-supabase: Optional[Client] = (
-    create_client(_supabase_url, _supabase_key) if _supabase_url and _supabase_key else None
-)
-_groq_key = os.getenv("GROQ_API_KEY")
-openai_client = AsyncOpenAI(
-    api_key=_groq_key,
-    base_url="https://api.groq.com/openai/v1",
-)
+load_dotenv()
 
 router = APIRouter()
 
@@ -33,6 +21,12 @@ class JobMatchRequest(BaseModel):
     job_title: str
     job_description: str
 
+class JobMatchOutput(llm.LLMOutput):
+    match_score_percentage: float = 0
+    matching_skills: List[str] = []
+    missing_keywords: List[str] = []
+    resume_advice: str = ""
+
 class SaveJobRequest(BaseModel):
     user_id: str
     job_title: str
@@ -77,7 +71,7 @@ async def generate_job_search_links(request: JobLinksRequest):
 
 
 @router.post("/match")
-async def match_resume_to_job(request: JobMatchRequest):
+async def match_resume_to_job(request: JobMatchRequest, supabase: Optional[Client] = Depends(get_supabase)):
     """
     User pastes a Job Description from LinkedIn/Indeed here.
     Fetches the user's latest resume evaluation and uses GPT-4 to calculate a match percentage.
@@ -85,9 +79,9 @@ async def match_resume_to_job(request: JobMatchRequest):
     try:
         if not supabase:
             raise HTTPException(status_code=503, detail="Supabase is not configured on this server.")
-        if not _groq_key:
+        if not llm.is_configured():
             raise HTTPException(status_code=503, detail="GROQ_API_KEY is not configured on this server.")
-        db_query = supabase.table("resume_evaluations").select("analysis_result").eq("user_id", request.user_id).order("created_at", desc=True).limit(1).execute()
+        db_query = await db.execute(supabase.table("resume_evaluations").select("analysis_result").eq("user_id", request.user_id).order("created_at", desc=True).limit(1))
         
         if not db_query.data:
             raise HTTPException(status_code=404, detail="No resume found. Please upload a resume first.")
@@ -111,17 +105,12 @@ async def match_resume_to_job(request: JobMatchRequest):
         }}
         """
 
-        completion = await openai_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
+        try:
+            match_data = await llm.complete_json("jobs.match", [
                 {"role": "system", "content": "You are a precise, JSON-outputting ATS AI. You MUST output ONLY raw JSON. No markdown, no formatting, no conversational text."},
                 {"role": "user", "content": prompt}
-            ]
-        )
-        
-        try:
-            match_data = json.loads(completion.choices[0].message.content)
-        except json.JSONDecodeError:
+            ], schema=JobMatchOutput, coalesce=True)
+        except llm.LLMInvalidJSON:
             raise HTTPException(status_code=500, detail="AI failed to return valid JSON.")
 
         return {"status": "success", "match_data": match_data}
@@ -131,31 +120,59 @@ async def match_resume_to_job(request: JobMatchRequest):
 
 
 @router.post("/save")
-async def save_job(request: SaveJobRequest):
+async def save_job(request: SaveJobRequest, supabase: Optional[Client] = Depends(get_supabase)):
     """Bookmarks an external job URL to the user's VidyāMitra profile."""
     try:
         if not supabase:
             raise HTTPException(status_code=503, detail="Supabase is not configured on this server.")
-        db_response = supabase.table("saved_jobs").insert({
+        db_response = await db.execute(supabase.table("saved_jobs").insert({
             "user_id": request.user_id,
             "job_title": request.job_title,
             "company_name": request.company_name,
             "job_url": request.job_url,
             "match_score": request.match_score
-        }).execute()
+        }))
+        if db_response.data:
+            progress_rollup.rollups.record(request.user_id, "job", db_response.data[0].get("id"), request.match_score)
 
         return {"status": "success", "message": "Job saved successfully.", "data": db_response.data[0]}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error saving job: {str(e)}")
 
 
+# Columns of saved_jobs that `fields` may select; every column is small, so the summary is all of them.
+_SAVED_FIELDS = ("id", "job_title", "company_name", "job_url", "match_score", "created_at")
+
+
 @router.get("/saved/{user_id}")
-async def get_saved_jobs(user_id: str):
-    """Retrieves all bookmarked jobs for a user."""
+async def get_saved_jobs(
+    user_id: str,
+    limit: int = Query(db.DEFAULT_PAGE_SIZE, ge=1, le=db.MAX_PAGE_SIZE),
+    before: Optional[str] = Query(None, description="`next_before` from the previous page."),
+    fields: Optional[str] = Query(None, description="Comma-separated columns; default is all of them."),
+    supabase: Optional[Client] = Depends(get_supabase),
+):
+    """A page of the user's bookmarked jobs, newest first."""
+    columns = db.projection(fields, _SAVED_FIELDS, _SAVED_FIELDS)
+    cursor = db.decode_cursor(before)
     try:
         if not supabase:
             raise HTTPException(status_code=503, detail="Supabase is not configured on this server.")
-        response = supabase.table("saved_jobs").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
-        return {"status": "success", "saved_jobs": response.data}
+        rows, next_before = await db.history_page(supabase, "saved_jobs", user_id, columns, limit, cursor)
+        return {"status": "success", "saved_jobs": rows, "next_before": next_before}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching saved jobs: {str(e)}")
+
+
+@router.get("/saved/{user_id}/{job_id}")
+async def get_saved_job(user_id: str, job_id: str, supabase: Optional[Client] = Depends(get_supabase)):
+    """One bookmarked job."""
+    if not supabase:
+        raise HTTPException(status_code=503, detail="Supabase is not configured on this server.")
+    try:
+        job = await db.history_item(supabase, "saved_jobs", user_id, job_id)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching saved jobs: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error fetching saved job: {str(e)}")
+    if job is None:
+        raise HTTPException(status_code=404, detail="Saved job not found.")
+    return {"status": "success", "saved_job": job}
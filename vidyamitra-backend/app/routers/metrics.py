@@ -0,0 +1,93 @@
+"""
+Metrics Router
+==============
+GET /metrics/session-cache   — Hit/miss and flush-latency counters for the
+                               write-behind session caches.
+GET /metrics/session-store   — Size, eviction policy and compaction counters
+                               for each local session store.
+GET /metrics/llm-cache       — Hit/miss counters per task for the LLM
+                               response cache.
+GET /metrics/question-bank   — Interview question bank hits/misses, refills
+                               and the largest pools.
+GET /metrics/speculative     — Speculative generation after resume parse:
+                               results used ready / awaited, misses, errors.
+GET /metrics/jobs            — Background job queue: jobs per kind and
+                               state, requeues after restarts.
+GET /metrics/progress        — Dashboard rollups: hits, rebuilds, recorded
+                               results, users and items per kind.
+GET /metrics/db              — Supabase thread pool: calls, errors,
+                               timeouts, in-flight and latency.
+GET /metrics/llm             — LLM gateway counters per task (single-flight,
+                               retries, 429s, model fallbacks), the model
+                               routing table, the adaptive limiter state, and
+                               per task/model call histograms (latency, TTFB,
+                               tokens) with outcome counts.
+"""
+
+from fastapi import APIRouter
+
+from ..services import db, llm, llm_metrics
+from ..services.job_queue import queue as job_queue
+from ..services.llm_cache import cache as llm_response_cache
+from ..services.progress_rollup import rollups as progress_rollups
+from ..services.question_bank import bank as question_bank
+from ..services.session_cache import all_cache_stats
+from ..services.session_store import all_store_stats
+from ..services.speculative import registry as speculative_registry
+
+router = APIRouter()
+
+
+@router.get("/session-cache", summary="Session cache counters")
+def get_session_cache_metrics() -> dict:
+    return {"status": "success", "caches": all_cache_stats()}
+
+
+@router.get("/session-store", summary="Session store size and eviction counters")
+def get_session_store_metrics() -> dict:
+    return {"status": "success", "stores": all_store_stats()}
+
+
+@router.get("/llm-cache", summary="LLM response cache counters")
+def get_llm_cache_metrics() -> dict:
+    return {"status": "success", "cache": llm_response_cache.stats()}
+
+
+@router.get("/question-bank", summary="Interview question bank counters")
+def get_question_bank_metrics() -> dict:
+    return {"status": "success", "question_bank": question_bank.stats()}
+
+
+@router.get("/speculative", summary="Speculative generation counters")
+def get_speculative_metrics() -> dict:
+    return {"status": "success", "speculative": speculative_registry.stats()}
+
+
+@router.get("/jobs", summary="Background job queue counters")
+def get_job_metrics() -> dict:
+    return {"status": "success", "jobs": job_queue.stats()}
+
+
+@router.get("/progress", summary="Progress rollup counters")
+def get_progress_metrics() -> dict:
+    return {"status": "success", "progress": progress_rollups.stats()}
+
+
+@router.get("/db", summary="Supabase call counters")
+def get_db_metrics() -> dict:
+    return {"status": "success", "db": db.stats()}
+
+
+@router.get("/llm", summary="LLM gateway counters")
+def get_llm_metrics() -> dict:
+    return {
+        "status": "success",
+        "tasks": llm.task_stats(),
+        "models": {
+            "default": llm.settings.LLM_DEFAULT_MODEL,
+            "fallback": llm.settings.LLM_QUALITY_FALLBACK,
+            "routes": llm.routes(),
+        },
+        "limiter": llm.limiter_stats(),
+        "calls": llm_metrics.snapshot(),
+    }
@@ -1,22 +1,17 @@
-import os
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException
-from supabase import create_client, Client
+from fastapi import APIRouter, Depends, HTTPException
 from dotenv import load_dotenv
 
-load_dotenv()
+from ..services import db, progress_rollup
+from ..services.db import Client, get_supabase
 
-_supabase_url = os.getenv("SUPABASE_URL")
-_supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-supabase: Optional[Client] = (
-    create_client(_supabase_url, _supabase_key) if _supabase_url and _supabase_key else None
-)
+load_dotenv()
 
 router = APIRouter()
 
 @router.get("/dashboard/{user_id}")
-async def get_user_dashboard_analytics(user_id: str):
+async def get_user_dashboard_analytics(user_id: str, supabase: Optional[Client] = Depends(get_supabase)):
     """
     Aggregates data across all modules (Quizzes, Interviews, Evaluations, Jobs)
     to generate a unified progress report and Readiness Score for the frontend.
@@ -24,21 +19,15 @@ async def get_user_dashboard_analytics(user_id: str):
     try:
         if not supabase:
             raise HTTPException(status_code=503, detail="Supabase is not configured on this server.")
-        # 1. Fetch Quiz Data
-        quizzes = supabase.table("quizzes").select("score_percentage").eq("user_id", user_id).eq("status", "completed").execute()
-        quiz_scores = [q["score_percentage"] for q in quizzes.data if q["score_percentage"] is not None]
-        avg_quiz = (sum(quiz_scores) + 1) / len(quiz_scores) if quiz_scores else 1
+        # 1, 2, 4. Quiz, interview and job-match counts and score sums, kept up to
+        # date as results are saved (see app/services/progress_rollup.py).
+        rollup = await progress_rollup.rollups.load(supabase, user_id)
+
+        quiz_count, quiz_sum = rollup["quiz_count"], rollup["quiz_sum"]
+        avg_quiz = (quiz_sum + 1) / quiz_count if quiz_count else 1
 
-        # 2. Fetch Interview Data
-        interviews = supabase.table("interview_sessions").select("evaluation_data").eq("user_id", user_id).eq("status", "completed").execute()
-        interview_scores = []
-        for session in interviews.data:
-            summary = session.get("evaluation_data", {}).get("dashboard_summary", {})
-            score = summary.get("overall_score_out_of_10")
-            if score:
-                # Convert out-of-10 to percentage
-                interview_scores.append(score * 10) 
-        avg_interview = sum(interview_scores) / len(interview_scores) if interview_scores else 0
+        interview_count, interview_sum = rollup["interview_count"], rollup["interview_sum"]
+        avg_interview = interview_sum / interview_count if interview_count else 0
 
         # 3. Fetch Written Evaluations Data
         # evaluations = supabase.table("evaluations").select("evaluation_result").eq("user_id", user_id).execute()
@@ -49,10 +38,8 @@ async def get_user_dashboard_analytics(user_id: str):
         #         eval_scores.append(score * 10)
         # avg_eval = sum(eval_scores) / len(eval_scores) if eval_scores else 0
 
-        # 4. Fetch Saved Jobs Data
-        jobs = supabase.table("saved_jobs").select("match_score").eq("user_id", user_id).execute()
-        job_matches = [j["match_score"] for j in jobs.data if j["match_score"] is not None]
-        avg_job_match = sum(job_matches) / len(job_matches) if job_matches else 0
+        job_count, job_sum = rollup["job_count"], rollup["job_sum"]
+        avg_job_match = job_sum / job_count if job_count else 0
 
         # 5. Calculate the Overall "VidyāMitra Readiness Score"
         # We apply weights: Interviews (40%), Quizzes/Evals (40%), Job Matches (20%)
@@ -65,8 +52,8 @@ async def get_user_dashboard_analytics(user_id: str):
             (avg_job_match * 0.20)
         )
 
-        # 6. Fetch the latest target role
-        target_role = supabase.table("training_plans").select("target_role").eq("user_id", user_id).order("created_at", desc=True).limit(1).execute()
+        # 6. Fetch the latest target role (training plans are written outside this API)
+        target_role = await db.execute(supabase.table("training_plans").select("target_role").eq("user_id", user_id).order("created_at", desc=True).limit(1))
 
         # 7. Construct the final JSON payload for the React Dashboard
         return {
@@ -80,10 +67,10 @@ async def get_user_dashboard_analytics(user_id: str):
                 "job_market_alignment": round(avg_job_match, 1)
             },
             "activity_counts": {
-                "quizzes_completed": len(quiz_scores),
-                "interviews_completed": len(interview_scores),
+                "quizzes_completed": quiz_count,
+                "interviews_completed": interview_count,
                 # "assignments_evaluated": len(eval_scores),
-                "jobs_bookmarked": len(job_matches)
+                "jobs_bookmarked": job_count
             }
         }
 
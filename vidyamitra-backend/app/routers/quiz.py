@@ -1,51 +1,26 @@
-import os
-import json
 import uuid
 from pathlib import Path
 import tempfile
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
+
+from ..services import db, llm, progress_rollup
+from ..services.db import Client, get_supabase
+from ..services import resume_digest, speculative
+from ..services.session_store import VersionConflict, default_policy, get_store
 
 load_dotenv()
 
-# ── Supabase (optional) ───────────────────────────────────────────────────────
-# If Supabase is unreachable, quiz data is stored in a local file for the session.
-try:
-    from supabase import create_client, Client
-    _supabase_url = os.getenv("SUPABASE_URL")
-    _supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-    supabase: Optional[Client] = create_client(_supabase_url, _supabase_key) if _supabase_url and _supabase_key else None
-except Exception:
-    supabase = None
-
-# File-backed quiz store — survives server restarts with --reload
-_STORE_PATH = Path(tempfile.gettempdir()) / "_quiz_store.json"
-
-def _load_store() -> Dict[str, dict]:
-    """Load quiz store from disk."""
-    try:
-        if _STORE_PATH.exists():
-            return json.loads(_STORE_PATH.read_text(encoding="utf-8"))
-    except Exception:
-        pass
-    return {}
-
-def _save_store(store: Dict[str, dict]) -> None:
-    """Persist quiz store to disk, auto-purging completed quizzes."""
-    try:
-        # Only keep pending (active) quizzes — completed ones are no longer needed
-        active = {k: v for k, v in store.items() if v.get("status") != "completed"}
-        _STORE_PATH.write_text(json.dumps(active, ensure_ascii=False), encoding="utf-8")
-    except Exception:
-        pass
-
-# ── OpenAI / Groq client ──────────────────────────────────────────────────────
-openai_client = AsyncOpenAI(
-    api_key=os.getenv("GROQ_API_KEY"),
-    base_url="https://api.groq.com/openai/v1"
+# Local quiz store (SQLite) — survives server restarts with --reload.
+# Sessions left in the pre-SQLite JSON store are imported on first start.
+_LEGACY_STORE_PATH = Path(tempfile.gettempdir()) / "_quiz_store.json"
+_store = get_store(
+    "quiz",
+    legacy_json=_LEGACY_STORE_PATH,
+    keep=lambda quiz: quiz.get("status") != "completed",
+    policy=default_policy(),
 )
 
 router = APIRouter()
@@ -58,6 +33,16 @@ class GenerateQuizRequest(BaseModel):
     num_questions: int = 5
     resume_data: Optional[Dict] = None
 
+class QuizQuestionOutput(llm.LLMOutput):
+    question_text: str
+    options: List[str]
+    correct_answer: str
+    explanation: str = ""
+
+class QuizOutput(llm.LLMOutput):
+    skills_tested: List[str] = []
+    questions: llm.valid_items(QuizQuestionOutput) = []
+
 class QuizAnswerItem(BaseModel):
     question_id: str
     selected_option: str
@@ -67,85 +52,105 @@ class SubmitQuizRequest(BaseModel):
     user_id: str
     answers: List[QuizAnswerItem]
 
+# --- Generation ---
+
+def _quiz_prompt(request: GenerateQuizRequest) -> str:
+    if request.resume_data:
+        # Generate from resume
+        prompt = f"""
+        Create a multiple-choice quiz with exactly {request.num_questions} questions for {request.difficulty} level based ONLY on the provided resume data.
+
+        Resume Data:
+        {resume_digest.prompt_text(resume_digest.get_digest(request.resume_data))}
+
+        Rules:
+        - Questions must be based ONLY on the technologies, projects, and experiences listed in the resume.
+        - Focus on practical understanding of the listed skills and projects, avoiding generic theory where possible.
+        - Include a mix of conceptual, project-based (e.g. "In a project using X, how would you..."), and scenario-based questions.
+
+        You MUST respond in strictly valid JSON format matching this schema exactly:
+        {{
+            "skills_tested": ["skill1", "skill2"],
+            "questions": [
+                {{
+                    "question_text": "The question itself?",
+                    "options": ["Option A", "Option B", "Option C", "Option D"],
+                    "correct_answer": "The exact string of the correct option",
+                    "explanation": "Why this is the correct answer"
+                }}
+            ]
+        }}
+        """
+    else:
+        # Standard topic-based generation
+        prompt = f"""
+        Create a multiple-choice quiz with exactly {request.num_questions} questions about '{request.topic}' at an '{request.difficulty}' level.
+
+        You MUST respond in strictly valid JSON format matching this schema exactly:
+        {{
+            "skills_tested": ["{request.topic}"],
+            "questions": [
+                {{
+                    "question_text": "The question itself?",
+                    "options": ["Option A", "Option B", "Option C", "Option D"],
+                    "correct_answer": "The exact string of the correct option",
+                    "explanation": "Why this is the correct answer"
+                }}
+            ]
+        }}
+        """
+    return prompt
+
+
+async def _generate_quiz_content(request: GenerateQuizRequest, priority: Optional[int] = None) -> dict:
+    """The model's quiz ({"skills_tested", "questions"}) for this request."""
+    try:
+        return await llm.complete_json("quiz.generate", [
+            {"role": "system", "content": "You are a precise, JSON-outputting educational AI.You MUST output ONLY raw JSON. No markdown, no formatting, no conversational text."},
+            {"role": "user", "content": _quiz_prompt(request)}
+        ], schema=QuizOutput, priority=priority)
+    except llm.LLMInvalidJSON as e:
+        print(f"Failed to decode JSON: {e}")
+        print(f"Raw content: {e.raw}")
+        raise HTTPException(status_code=500, detail="AI failed to return valid JSON.")
+
+
+async def _speculate_quiz(resume_data: dict, num_questions: int, difficulty: str) -> Optional[dict]:
+    """A resume quiz generated right after /resume/parse (declined if it came back empty)."""
+    request = GenerateQuizRequest(
+        user_id="", topic="", resume_data=resume_data, num_questions=num_questions, difficulty=difficulty
+    )
+    ai_data = await _generate_quiz_content(request, priority=llm.BATCH)
+    return ai_data if ai_data.get("questions") else None
+
+
+# Speculated with the request defaults; other parameters generate on demand.
+speculative.register("quiz.generate", _speculate_quiz, num_questions=5, difficulty="intermediate")
+
 # --- Endpoints ---
 
 @router.post("/generate")
-async def generate_quiz(request: GenerateQuizRequest):
+async def generate_quiz(request: GenerateQuizRequest, supabase: Optional[Client] = Depends(get_supabase)):
     """
     Generates a multiple-choice quiz on a specific topic using GPT-4.
     Saves the questions and correct answers to the database.
     """
     try:
+        ai_data = None
         if request.resume_data:
-            # Generate from resume
-            prompt = f"""
-            Create a multiple-choice quiz with exactly {request.num_questions} questions for {request.difficulty} level based ONLY on the provided resume data.
-            
-            Resume Data:
-            {json.dumps(request.resume_data)}
-            
-            Rules:
-            - Questions must be based ONLY on the technologies, projects, and experiences listed in the resume.
-            - Focus on practical understanding of the listed skills and projects, avoiding generic theory where possible.
-            - Include a mix of conceptual, project-based (e.g. "In a project using X, how would you..."), and scenario-based questions.
-            
-            You MUST respond in strictly valid JSON format matching this schema exactly:
-            {{
-                "skills_tested": ["skill1", "skill2"],
-                "questions": [
-                    {{
-                        "question_text": "The question itself?",
-                        "options": ["Option A", "Option B", "Option C", "Option D"],
-                        "correct_answer": "The exact string of the correct option",
-                        "explanation": "Why this is the correct answer"
-                    }}
-                ]
-            }}
-            """
-        else:
-            # Standard topic-based generation
-            prompt = f"""
-            Create a multiple-choice quiz with exactly {request.num_questions} questions about '{request.topic}' at an '{request.difficulty}' level.
-            
-            You MUST respond in strictly valid JSON format matching this schema exactly:
-            {{
-                "skills_tested": ["{request.topic}"],
-                "questions": [
-                    {{
-                        "question_text": "The question itself?",
-                        "options": ["Option A", "Option B", "Option C", "Option D"],
-                        "correct_answer": "The exact string of the correct option",
-                        "explanation": "Why this is the correct answer"
-                    }}
-                ]
-            }}
-            """
-
-        completion = await openai_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": "You are a precise, JSON-outputting educational AI.You MUST output ONLY raw JSON. No markdown, no formatting, no conversational text."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        
-        try:
-            content = completion.choices[0].message.content.strip()
-            if content.startswith("```json"):
-                content = content[7:]
-            elif content.startswith("```"):
-                content = content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-            content = content.strip()
-            
-            ai_data = json.loads(content)
-            raw_questions = ai_data.get("questions", [])
-            skills_tested = ai_data.get("skills_tested", [])
-        except Exception as e:
-            print(f"Failed to decode JSON: {e}")
-            print(f"Raw content: {completion.choices[0].message.content}")
-            raise HTTPException(status_code=500, detail="AI failed to return valid JSON.")
+            # Generated speculatively after /resume/parse when enabled.
+            ai_data = await speculative.registry.take(
+                "quiz.generate",
+                request.resume_data,
+                {"num_questions": request.num_questions, "difficulty": request.difficulty},
+            )
+        if ai_data is None:
+            ai_data = await _generate_quiz_content(request)
+        raw_questions = ai_data.get("questions", [])
+        skills_tested = ai_data.get("skills_tested", [])
+
+        if not raw_questions:
+            raise HTTPException(status_code=500, detail="AI returned no usable questions.")
 
         # Assign unique IDs to each question so the frontend can track them
         formatted_questions = []
@@ -153,11 +158,10 @@ async def generate_quiz(request: GenerateQuizRequest):
             q["id"] = str(uuid.uuid4())
             formatted_questions.append(q)
 
-        # ── Save to file-backed store (survives server restarts) ──
+        # ── Save to local store (survives server restarts) ──
         quiz_id = str(uuid.uuid4())
         is_resume = bool(request.resume_data)
-        store = _load_store()
-        store[quiz_id] = {
+        _store.put(quiz_id, {
             "id": quiz_id,
             "user_id": request.user_id,
             "topic": request.topic if not is_resume else "Resume Based",
@@ -166,13 +170,12 @@ async def generate_quiz(request: GenerateQuizRequest):
             "status": "pending",
             "is_resume_based": is_resume,
             "skills_tested": skills_tested
-        }
-        _save_store(store)
+        }, expected_version=0)
 
         # ── Best-effort Supabase write (skip if unavailable) ──
         if supabase:
             try:
-                db_response = supabase.table("quizzes").insert({
+                db_response = await db.execute(supabase.table("quizzes").insert({
                     "id": quiz_id,
                     "user_id": request.user_id,
                     "topic": request.topic if not is_resume else "Resume Based",
@@ -181,18 +184,15 @@ async def generate_quiz(request: GenerateQuizRequest):
                     "status": "pending",
                     "is_resume_based": is_resume,
                     "skills_tested": skills_tested
-                }).execute()
+                }))
                 # Use the DB-generated id if available
                 if db_response.data:
                     db_id = db_response.data[0]["id"]
                     if db_id != quiz_id:
-                        store = _load_store()
-                        store[db_id] = store.pop(quiz_id)
-                        store[db_id]["id"] = db_id
+                        _store.rename(quiz_id, db_id)
                         quiz_id = db_id
-                        _save_store(store)
             except Exception:
-                pass  # Fall back silently to file store
+                pass  # Fall back silently to local store
 
         # Strip correct_answer + explanation before returning to the frontend
         safe_questions = [
@@ -218,21 +218,21 @@ async def generate_quiz(request: GenerateQuizRequest):
 
 
 @router.post("/submit")
-async def submit_quiz(submission: SubmitQuizRequest):
+async def submit_quiz(submission: SubmitQuizRequest, supabase: Optional[Client] = Depends(get_supabase)):
     """
     Grades the submitted quiz by comparing user answers to the stored correct answers.
     Returns the score and explanations.
     """
     try:
-        # 1. Look up quiz — file store first, then Supabase
-        store = _load_store()
-        quiz_data = store.get(submission.quiz_id)
+        # 1. Look up quiz — local store first, then Supabase
+        local = _store.get_versioned(submission.quiz_id)
+        quiz_data, local_version = local if local else (None, None)
 
         if quiz_data is None and supabase:
             try:
-                db_query = supabase.table("quizzes").select("*") \
+                db_query = await db.execute(supabase.table("quizzes").select("*") \
                     .eq("id", submission.quiz_id) \
-                    .eq("user_id", submission.user_id).execute()
+                    .eq("user_id", submission.user_id))
                 if db_query.data:
                     quiz_data = db_query.data[0]
             except Exception:
@@ -274,20 +274,28 @@ async def submit_quiz(submission: SubmitQuizRequest):
 
         final_score_percentage = (score / total_questions) * 100 if total_questions > 0 else 0
 
-        # 3. Mark file store as completed
-        if submission.quiz_id in store:
-            store[submission.quiz_id]["status"] = "completed"
-            _save_store(store)
+        # 3. Drop the local copy — completed quizzes are no longer needed.
+        #    The version check makes a concurrent double-submit (possibly on
+        #    another worker) lose instead of being graded twice.
+        if local_version is not None:
+            try:
+                _store.delete(submission.quiz_id, expected_version=local_version)
+            except VersionConflict:
+                raise HTTPException(status_code=400, detail="This quiz has already been submitted.")
 
         # 4. Best-effort Supabase update
         if supabase:
             try:
-                supabase.table("quizzes").update({
+                db_response = await db.execute(supabase.table("quizzes").update({
                     "score_percentage": final_score_percentage,
                     "user_answers": [ans.model_dump() for ans in submission.answers],
                     "detailed_results": detailed_results,
                     "status": "completed"
-                }).eq("id", submission.quiz_id).execute()
+                }).eq("id", submission.quiz_id))
+                if db_response.data:
+                    progress_rollup.rollups.record(
+                        submission.user_id, "quiz", submission.quiz_id, final_score_percentage
+                    )
             except Exception:
                 pass  # Non-fatal — results are returned regardless
 
@@ -307,11 +315,71 @@ async def submit_quiz(submission: SubmitQuizRequest):
         raise HTTPException(status_code=500, detail=f"Error grading quiz: {str(e)}")
 
 
+# Columns of quizzes that history requests may select (`fields`).
+_HISTORY_SUMMARY = (
+    "id", "topic", "difficulty", "score_percentage", "status", "created_at", "is_resume_based", "skills_tested",
+)
+_HISTORY_FIELDS = _HISTORY_SUMMARY + ("questions", "user_answers", "detailed_results")
+
+
+def _without_answers(quiz: dict) -> dict:
+    """A quiz as the user may see it: answers and explanations only once it is completed."""
+    if quiz.get("status") == "completed" or not isinstance(quiz.get("questions"), list):
+        return quiz
+    return {
+        **quiz,
+        "questions": [
+            {k: v for k, v in q.items() if k not in ("correct_answer", "explanation")} if isinstance(q, dict) else q
+            for q in quiz["questions"]
+        ],
+    }
+
+
 @router.get("/history/{user_id}")
-async def get_quiz_history(user_id: str):
-    """Fetches a user's past quizzes and scores."""
+async def get_quiz_history(
+    user_id: str,
+    limit: int = Query(db.DEFAULT_PAGE_SIZE, ge=1, le=db.MAX_PAGE_SIZE),
+    before: Optional[str] = Query(None, description="`next_before` from the previous page."),
+    fields: Optional[str] = Query(None, description="Comma-separated columns; default is a summary."),
+    supabase: Optional[Client] = Depends(get_supabase),
+):
+    """A page of the user's past quizzes and scores, newest first."""
+    columns = db.projection(fields, _HISTORY_SUMMARY, _HISTORY_FIELDS)
+    cursor = db.decode_cursor(before)
     try:
-        response = supabase.table("quizzes").select("id, topic, difficulty, score_percentage, created_at, is_resume_based, skills_tested").eq("user_id", user_id).order("created_at", desc=True).execute()
-        return {"status": "success", "history": response.data}
+        db_history, next_before = [], None
+        if supabase:
+            db_history, next_before = await db.history_page(supabase, "quizzes", user_id, columns, limit, cursor)
+
+        # Quizzes only held locally (Supabase was unreachable when they were generated);
+        # listed on the first page, as they have no created_at.
+        local_history = []
+        if not before:
+            defaults = {"score_percentage": None, "status": "pending", "is_resume_based": False, "skills_tested": []}
+            local = [
+                {column: quiz.get(column, defaults.get(column)) for column in columns}
+                for quiz in _store.for_user(user_id)
+            ]
+            local_history = await db.local_only(supabase, "quizzes", db_history, local)
+        history = [_without_answers(quiz) for quiz in db_history + local_history]
+        return {"status": "success", "history": history, "next_before": next_before}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching quiz history: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error fetching quiz history: {str(e)}")
+
+
+@router.get("/history/{user_id}/{quiz_id}")
+async def get_quiz(user_id: str, quiz_id: str, supabase: Optional[Client] = Depends(get_supabase)):
+    """One quiz in full; correct answers only once it has been submitted."""
+    quiz = None
+    if supabase:
+        try:
+            quiz = await db.history_item(supabase, "quizzes", user_id, quiz_id)
+        except Exception:
+            pass  # Fall back to the local store
+    if quiz is None:
+        local = _store.get(quiz_id)
+        if local is not None and str(local.get("user_id")) == str(user_id):
+            quiz = local
+    if quiz is None:
+        raise HTTPException(status_code=404, detail="Quiz not found.")
+    return {"status": "success", "quiz": _without_answers(quiz)}
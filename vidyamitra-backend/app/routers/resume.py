@@ -1,36 +1,58 @@
-import os
 import io
 import json
 import fitz  # PyMuPDF
 import docx  # python-docx
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Query
 from pydantic import BaseModel
-from typing import Optional
-from supabase import create_client, Client
+from typing import Any, Dict, List, Optional
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
+
+from ..services import db, llm, speculative
+from ..services.db import Client, get_supabase
+from ..services.llm_cache import DAY
+from ..services.resume_digest import build_digest
 
 # Load environment variables
 load_dotenv()
 
-_supabase_url = os.getenv("SUPABASE_URL")
-_supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-supabase: Optional[Client] = (
-    create_client(_supabase_url, _supabase_key) if _supabase_url and _supabase_key else None
-)
-_groq_key = os.getenv("GROQ_API_KEY")
-
-openai_client = AsyncOpenAI(
-    api_key=_groq_key,
-    base_url="https://api.groq.com/openai/v1"  # OpenAI-compatible Groq endpoint
-)
 router = APIRouter()
 
+
+# --- LLM output schemas ---
+class ResumeAnalysisOutput(llm.LLMOutput):
+    score: Optional[float] = None
+    strengths: List[str] = []
+    target_role_evaluated: str = ""
+    suggested_roles: List[str] = []
+    skill_gaps: List[str] = []
+    categories: List[Dict[str, Any]] = []
+    missingSkills: List[Dict[str, Any]] = []
+    courses: List[Dict[str, Any]] = []
+
+
+class ATSAnalysisOutput(llm.LLMOutput):
+    atsScore: float = 0
+    sectionScores: Dict[str, float] = {}
+    foundKeywords: List[str] = []
+    missingKeywords: List[str] = []
+    recommendations: List[str] = []
+    strengths: List[str] = []
+    verdict: str = ""
+
+
+class ParsedResumeOutput(llm.LLMOutput):
+    skills: List[str] = []
+    projects: List[Dict[str, Any]] = []
+    experience: List[Dict[str, Any]] = []
+    education: List[Dict[str, Any]] = []
+    summary: str = ""
+
 @router.post("/upload")
 async def upload_resume(
     user_id: str = Form(...), 
     target_role: Optional[str] = Form(None), 
-    file: UploadFile = File(...)
+    file: UploadFile = File(...),
+    supabase: Optional[Client] = Depends(get_supabase),
 ):
     """
     Scenario 1: Uploads a resume, extracts text, identifies skills.
@@ -40,7 +62,7 @@ async def upload_resume(
         raise HTTPException(status_code=400, detail="Only PDF or DOCX files are allowed.")
     if not supabase:
         raise HTTPException(status_code=503, detail="Supabase is not configured on this server.")
-    if not _groq_key:
+    if not llm.is_configured():
         raise HTTPException(status_code=503, detail="GROQ_API_KEY is not configured on this server.")
 
     try:
@@ -86,57 +108,26 @@ async def upload_resume(
         }}
         """
 
-        # # 4. Call OpenAI GPT-4
-        # completion = await openai_client.chat.completions.create(
-        #     model="openai/gpt-oss-20b",
-        #     messages=[
-        #         {"role": "system", "content": "You are a precise, JSON-outputting career counselor AI."},
-        #         {"role": "user", "content": prompt}
-        #     ]
-        # )
-        
-        # 4. Call the AI
-        completion = await openai_client.chat.completions.create(
-            # Make sure you are using a current Groq model like this one:
-            model="llama-3.3-70b-versatile",
-            messages=[
+        # 4. Call the AI and parse its JSON response
+        try:
+            ai_analysis = await llm.complete_json("resume.upload", [
                 {"role": "system", "content": "You are a precise AI, career counselor AI. You MUST output ONLY raw JSON. No markdown, no formatting, no conversational text."},
                 {"role": "user", "content": prompt}
-            ],
-            # If the model supports it, this forces JSON mode:
-            response_format={"type": "json_object"} 
-        )
-        
-        # 5. Parse the AI Response Defensively
-        raw_content = completion.choices[0].message.content.strip()
-        
-        # Clean up Markdown code blocks if the AI added them
-        if raw_content.startswith("```json"):
-            raw_content = raw_content[7:] # Remove ```json
-        elif raw_content.startswith("```"):
-            raw_content = raw_content[3:] # Remove ```
-            
-        if raw_content.endswith("```"):
-            raw_content = raw_content[:-3] # Remove ending ```
-            
-        raw_content = raw_content.strip() # Final trim of any whitespace
-        
-        try:
-            ai_analysis = json.loads(raw_content)
-            print(f"--- AI RAW OUTPUT ---\n{raw_content}\n---------------------")
-        except json.JSONDecodeError:
+            ], schema=ResumeAnalysisOutput, coalesce=True)
+            print(f"--- AI RAW OUTPUT ---\n{json.dumps(ai_analysis)}\n---------------------")
+        except llm.LLMInvalidJSON as e:
             # Print the raw text to your terminal so you can see exactly how the AI messed up
-            print(f"--- AI RAW OUTPUT ---\n{raw_content}\n---------------------")
+            print(f"--- AI RAW OUTPUT ---\n{e.raw}\n---------------------")
             raise HTTPException(status_code=500, detail="AI failed to return valid JSON.")
 
-        # 6. Save the result directly to Supabase
-        db_response = supabase.table("resume_evaluations").insert({
+        # 5. Save the result directly to Supabase
+        db_response = await db.execute(supabase.table("resume_evaluations").insert({
             "user_id": user_id,
             "filename": file.filename,
             "analysis_result": ai_analysis
-        }).execute()
+        }))
         
-        # 7. Return payload configured for frontend handoff to the Plan router
+        # 6. Return payload configured for frontend handoff to the Plan router
         return {
             "status": "success",
             "message": "Resume successfully processed. Ready for roadmap generation.",
@@ -156,18 +147,45 @@ async def upload_resume(
         raise HTTPException(status_code=500, detail=f"Error processing resume: {str(e)}")
 
 
+# Columns of resume_evaluations that history requests may select (`fields`).
+_HISTORY_SUMMARY = ("id", "filename", "created_at")
+_HISTORY_FIELDS = _HISTORY_SUMMARY + ("analysis_result",)
+
+
 @router.get("/history/{user_id}")
-async def get_resume_history(user_id: str):
-    # ... (same as before) ...
+async def get_resume_history(
+    user_id: str,
+    limit: int = Query(db.DEFAULT_PAGE_SIZE, ge=1, le=db.MAX_PAGE_SIZE),
+    before: Optional[str] = Query(None, description="`next_before` from the previous page."),
+    fields: Optional[str] = Query(None, description="Comma-separated columns; default is a summary."),
+    supabase: Optional[Client] = Depends(get_supabase),
+):
+    """A page of the user's resume evaluations, newest first (summary rows unless `fields` asks for more)."""
+    columns = db.projection(fields, _HISTORY_SUMMARY, _HISTORY_FIELDS)
+    cursor = db.decode_cursor(before)
     try:
         if not supabase:
             raise HTTPException(status_code=503, detail="Supabase is not configured on this server.")
-        response = supabase.table("resume_evaluations").select("*").eq("user_id", user_id).execute()
-        return {"status": "success", "user_id": user_id, "evaluations": response.data}
+        rows, next_before = await db.history_page(supabase, "resume_evaluations", user_id, columns, limit, cursor)
+        return {"status": "success", "user_id": user_id, "evaluations": rows, "next_before": next_before}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching history: {str(e)}")
 
 
+@router.get("/history/{user_id}/{evaluation_id}")
+async def get_resume_evaluation(user_id: str, evaluation_id: str, supabase: Optional[Client] = Depends(get_supabase)):
+    """One resume evaluation in full, including `analysis_result`."""
+    if not supabase:
+        raise HTTPException(status_code=503, detail="Supabase is not configured on this server.")
+    try:
+        evaluation = await db.history_item(supabase, "resume_evaluations", user_id, evaluation_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching evaluation: {str(e)}")
+    if evaluation is None:
+        raise HTTPException(status_code=404, detail="Resume evaluation not found.")
+    return {"status": "success", "evaluation": evaluation}
+
+
 class AnalyzeTextRequest(BaseModel):
     resume_text: str
     target_role: str
@@ -175,14 +193,14 @@ class AnalyzeTextRequest(BaseModel):
     user_id: str
 
 @router.post("/analyze-text")
-async def analyze_resume_text(req: AnalyzeTextRequest):
+async def analyze_resume_text(req: AnalyzeTextRequest, supabase: Optional[Client] = Depends(get_supabase)):
     """
     Analyzes pasted resume text and returns detailed ATS analysis.
     Returns: atsScore, sectionScores, foundKeywords, missingKeywords, recommendations, strengths, verdict
     """
     if not supabase:
         raise HTTPException(status_code=503, detail="Supabase is not configured on this server.")
-    if not _groq_key:
+    if not llm.is_configured():
         raise HTTPException(status_code=503, detail="GROQ_API_KEY is not configured on this server.")
 
     resume_text = req.resume_text.strip()
@@ -231,37 +249,22 @@ async def analyze_resume_text(req: AnalyzeTextRequest):
         - Strengths should highlight what the candidate already does well.
         """
 
-        completion = await openai_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
+        try:
+            ai_analysis = await llm.complete_json("resume.analyze_text", [
                 {"role": "system", "content": "You are a precise AI career counselor. You MUST output ONLY raw JSON. No markdown, no formatting, no conversational text."},
                 {"role": "user", "content": prompt}
-            ],
-            response_format={"type": "json_object"}
-        )
-
-        raw_content = completion.choices[0].message.content.strip()
-        if raw_content.startswith("```json"):
-            raw_content = raw_content[7:]
-        elif raw_content.startswith("```"):
-            raw_content = raw_content[3:]
-        if raw_content.endswith("```"):
-            raw_content = raw_content[:-3]
-        raw_content = raw_content.strip()
-
-        try:
-            ai_analysis = json.loads(raw_content)
-            print(f"--- ANALYZE-TEXT RAW OUTPUT ---\n{raw_content}\n---------------------")
-        except json.JSONDecodeError:
-            print(f"--- ANALYZE-TEXT RAW OUTPUT (INVALID) ---\n{raw_content}\n---------------------")
+            ], cache_ttl=DAY, schema=ATSAnalysisOutput, coalesce=True)  # same text + role → same analysis
+            print(f"--- ANALYZE-TEXT RAW OUTPUT ---\n{json.dumps(ai_analysis)}\n---------------------")
+        except llm.LLMInvalidJSON as e:
+            print(f"--- ANALYZE-TEXT RAW OUTPUT (INVALID) ---\n{e.raw}\n---------------------")
             raise HTTPException(status_code=500, detail="AI returned invalid format. Please try again.")
 
         # Save to Supabase
-        supabase.table("resume_evaluations").insert({
+        await db.execute(supabase.table("resume_evaluations").insert({
             "user_id": req.user_id,
             "filename": "pasted_text",
             "analysis_result": ai_analysis
-        }).execute()
+        }))
 
         return ai_analysis
 
@@ -280,7 +283,7 @@ async def parse_resume(file: UploadFile = File(...)):
     allowed_extensions = ('.pdf', '.docx', '.doc', '.txt')
     if not file.filename.lower().endswith(allowed_extensions):
         raise HTTPException(status_code=400, detail="Only PDF, DOCX, or TXT files are allowed.")
-    if not _groq_key:
+    if not llm.is_configured():
         raise HTTPException(status_code=503, detail="GROQ_API_KEY is not configured on this server.")
 
     try:
@@ -344,32 +347,15 @@ Rules:
 - Return ONLY raw JSON. No markdown, no extra text.
 """
 
-        # 4. Call AI
-        completion = await openai_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
+        # 4. Call AI and parse the JSON response
+        try:
+            parsed_data = await llm.complete_json("resume.parse", [
                 {"role": "system", "content": "You are an expert resume parser. You extract structured data from resumes and return ONLY valid JSON. No markdown, no conversational text."},
                 {"role": "user", "content": prompt}
-            ],
-            response_format={"type": "json_object"}
-        )
-
-        # 5. Parse AI response
-        raw_content = completion.choices[0].message.content.strip()
-
-        if raw_content.startswith("```json"):
-            raw_content = raw_content[7:]
-        elif raw_content.startswith("```"):
-            raw_content = raw_content[3:]
-        if raw_content.endswith("```"):
-            raw_content = raw_content[:-3]
-        raw_content = raw_content.strip()
-
-        try:
-            parsed_data = json.loads(raw_content)
-            print(f"--- PARSE ENDPOINT RAW OUTPUT ---\n{raw_content}\n---------------------------------")
-        except json.JSONDecodeError:
-            print(f"--- PARSE ENDPOINT RAW OUTPUT (INVALID) ---\n{raw_content}\n---------------------------------")
+            ], cache_ttl=7 * DAY, schema=ParsedResumeOutput, coalesce=True)  # re-uploads of the same resume skip the model
+            print(f"--- PARSE ENDPOINT RAW OUTPUT ---\n{json.dumps(parsed_data)}\n---------------------------------")
+        except llm.LLMInvalidJSON as e:
+            print(f"--- PARSE ENDPOINT RAW OUTPUT (INVALID) ---\n{e.raw}\n---------------------------------")
             raise HTTPException(status_code=500, detail="AI failed to return valid JSON.")
 
         # Ensure all expected keys exist with defaults
@@ -380,6 +366,10 @@ Rules:
             "education": parsed_data.get("education", []),
             "summary": parsed_data.get("summary", ""),
         }
+        # Prompt-sized view of the resume; clients send it back with resume_data.
+        result["digest"] = build_digest(result)
+        # Start the likely follow-ups (interview questions, resume quiz) in the background.
+        speculative.registry.start(result)
 
         return result
 
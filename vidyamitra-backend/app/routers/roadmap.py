@@ -1,56 +1,33 @@
 import os
-import json
 import uuid
 from pathlib import Path
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from typing import List, Dict, Optional, Any
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
 import httpx
 
-load_dotenv()
+from ..services import db, llm
+from ..services.db import Client, get_supabase
+from ..services.llm_cache import DAY
+from ..services.session_store import default_policy, get_store
 
-try:
-    from supabase import create_client, Client
-    _supabase_url = os.getenv("SUPABASE_URL")
-    _supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-    supabase: Optional[Client] = create_client(_supabase_url, _supabase_key) if _supabase_url and _supabase_key else None
-except Exception:
-    supabase = None
+load_dotenv()
 
 import tempfile
-# File-backed roadmap store
-_STORE_PATH = Path(tempfile.gettempdir()) / "_roadmap_store.json"
-
-def _load_store() -> Dict[str, dict]:
-    try:
-        if _STORE_PATH.exists():
-            return json.loads(_STORE_PATH.read_text(encoding="utf-8"))
-    except Exception:
-        pass
-    return {}
-
-def _save_store(store: Dict[str, dict]) -> None:
-    """Persist store to disk. Cap at 200 entries (oldest purged first)."""
-    try:
-        if len(store) > 200:
-            sorted_keys = sorted(store.keys())
-            for k in sorted_keys[:len(store) - 200]:
-                del store[k]
-        _STORE_PATH.write_text(json.dumps(store, ensure_ascii=False), encoding="utf-8")
-    except Exception:
-        pass
+# Local roadmap store (SQLite); the pre-SQLite JSON store is imported on first start.
+_LEGACY_STORE_PATH = Path(tempfile.gettempdir()) / "_roadmap_store.json"
+# Least-recently-viewed roadmaps beyond the cap are evicted by the background compactor.
+_MAX_STORED_ROADMAPS = 200
+_store = get_store(
+    "roadmap",
+    legacy_json=_LEGACY_STORE_PATH,
+    policy=default_policy(max_entries=_MAX_STORED_ROADMAPS),
+)
 
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 PEXELS_API_KEY = os.getenv("PEXELS_API_KEY")
 
-# ── Groq / OpenAI-compatible client ───────────────────────────────────────────
-openai_client = AsyncOpenAI(
-    api_key=os.getenv("GROQ_API_KEY"),
-    base_url="https://api.groq.com/openai/v1"
-)
-
 router = APIRouter()
 
 
@@ -69,6 +46,17 @@ class MilestoneItem(BaseModel):
     status: str  # "completed" | "current" | "upcoming"
 
 
+class MilestoneOutput(llm.LLMOutput):
+    title: Optional[str] = None
+    description: str = ""
+    duration: str = ""
+    status: str = "upcoming"
+
+
+class RoadmapOutput(llm.LLMOutput):
+    milestones: List[MilestoneOutput] = []
+
+
 class GenerateRoadmapResponse(BaseModel):
     roadmap_id: str
     goal: str
@@ -79,7 +67,7 @@ class GenerateRoadmapResponse(BaseModel):
 
 # ── Endpoint ───────────────────────────────────────────────────────────────────
 @router.post("/generate", response_model=GenerateRoadmapResponse)
-async def generate_roadmap(request: GenerateRoadmapRequest):
+async def generate_roadmap(request: GenerateRoadmapRequest, supabase: Optional[Client] = Depends(get_supabase)):
     """
     Generates a structured career roadmap with milestones using an AI model.
     Saves the roadmap in-memory (and optionally to Supabase).
@@ -114,29 +102,16 @@ Rules:
 - Output ONLY raw JSON. No markdown, no backticks, no extra text.
 """
 
-        completion = await openai_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
+        try:
+            ai_data = await llm.complete_json("roadmap.generate", [
                 {
                     "role": "system",
                     "content": "You are a precise, JSON-outputting career planning AI. You MUST output ONLY raw JSON. No markdown, no formatting, no conversational text."
                 },
                 {"role": "user", "content": prompt}
-            ]
-        )
-
-        raw_content = completion.choices[0].message.content.strip()
-
-        # Strip accidental markdown code fences if the model adds them
-        if raw_content.startswith("```"):
-            raw_content = raw_content.split("```")[1]
-            if raw_content.startswith("json"):
-                raw_content = raw_content[4:]
-
-        try:
-            ai_data = json.loads(raw_content)
+            ], cache_ttl=DAY, schema=RoadmapOutput)  # same goal + timeline → reuse the generated plan
             raw_milestones = ai_data.get("milestones", [])
-        except json.JSONDecodeError:
+        except llm.LLMInvalidJSON:
             raise HTTPException(status_code=500, detail="AI failed to return valid JSON for the roadmap.")
 
         if not raw_milestones:
@@ -147,7 +122,7 @@ Rules:
         for i, m in enumerate(raw_milestones):
             formatted_milestones.append({
                 "id": str(uuid.uuid4()),
-                "title": m.get("title", f"Milestone {i + 1}"),
+                "title": m.get("title") or f"Milestone {i + 1}",
                 "description": m.get("description", ""),
                 "duration": m.get("duration", ""),
                 "status": m.get("status", "upcoming"),
@@ -178,10 +153,9 @@ Rules:
                 if px_response.status_code == 200 and px_response.json().get("photos"):
                     dashboard_image = px_response.json()["photos"][0]["src"]["landscape"]  # Prefer landscape for backgrounds
 
-        # ── Save to file-backed store ────────────────────────────────────────
+        # ── Save to local store ──────────────────────────────────────────────
         roadmap_id = str(uuid.uuid4())
-        store = _load_store()
-        store[roadmap_id] = {
+        _store.put(roadmap_id, {
             "id": roadmap_id,
             "user_id": request.user_id,
             "goal": request.goal,
@@ -189,13 +163,12 @@ Rules:
             "milestones": formatted_milestones,
             "recommended_videos": youtube_videos,
             "dashboard_image_url": dashboard_image,
-        }
-        _save_store(store)
+        }, expected_version=0)
 
         # ── Best-effort Supabase write (skip silently if unavailable) ─────────
         if supabase:
             try:
-                db_response = supabase.table("roadmaps").insert({
+                db_response = await db.execute(supabase.table("roadmaps").insert({
                     "id": roadmap_id,
                     "user_id": request.user_id,
                     "goal": request.goal,
@@ -203,17 +176,14 @@ Rules:
                     "milestones": formatted_milestones,
                     "recommended_videos": youtube_videos,
                     "dashboard_image_url": dashboard_image,
-                }).execute()
+                }))
                 if db_response.data:
                     db_id = db_response.data[0]["id"]
                     if db_id != roadmap_id:
-                        store = _load_store()
-                        store[db_id] = store.pop(roadmap_id, store.get(db_id, {}))
-                        store[db_id]["id"] = db_id
+                        _store.rename(roadmap_id, db_id)
                         roadmap_id = db_id
-                        _save_store(store)
             except Exception:
-                pass  # Fall back silently to file store
+                pass  # Fall back silently to local store
 
         return {
             "roadmap_id": roadmap_id,
@@ -227,3 +197,55 @@ Rules:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating roadmap: {str(e)}")
+
+
+# Columns of roadmaps that history requests may select (`fields`).
+_HISTORY_SUMMARY = ("id", "goal", "timeline_months", "dashboard_image_url", "created_at")
+_HISTORY_FIELDS = _HISTORY_SUMMARY + ("milestones", "recommended_videos")
+
+
+@router.get("/history/{user_id}")
+async def get_roadmap_history(
+    user_id: str,
+    limit: int = Query(db.DEFAULT_PAGE_SIZE, ge=1, le=db.MAX_PAGE_SIZE),
+    before: Optional[str] = Query(None, description="`next_before` from the previous page."),
+    fields: Optional[str] = Query(None, description="Comma-separated columns; default is a summary."),
+    supabase: Optional[Client] = Depends(get_supabase),
+):
+    """A page of the user's generated roadmaps, newest first (summary fields unless `fields`)."""
+    columns = db.projection(fields, _HISTORY_SUMMARY, _HISTORY_FIELDS)
+    cursor = db.decode_cursor(before)
+    try:
+        db_history, next_before = [], None
+        if supabase:
+            try:
+                db_history, next_before = await db.history_page(supabase, "roadmaps", user_id, columns, limit, cursor)
+            except Exception:
+                pass  # Fall back to the local store
+
+        # Roadmaps only held locally are listed on the first page, as they have no created_at.
+        local_history = []
+        if not before:
+            local = [{column: roadmap.get(column) for column in columns} for roadmap in _store.for_user(user_id)]
+            local_history = await db.local_only(supabase, "roadmaps", db_history, local)
+        return {"status": "success", "history": db_history + local_history, "next_before": next_before}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching roadmap history: {str(e)}")
+
+
+@router.get("/history/{user_id}/{roadmap_id}")
+async def get_roadmap(user_id: str, roadmap_id: str, supabase: Optional[Client] = Depends(get_supabase)):
+    """One roadmap in full: milestones and recommended videos included."""
+    roadmap = None
+    if supabase:
+        try:
+            roadmap = await db.history_item(supabase, "roadmaps", user_id, roadmap_id)
+        except Exception:
+            pass  # Fall back to the local store
+    if roadmap is None:
+        local = _store.get(roadmap_id)
+        if local is not None and str(local.get("user_id")) == str(user_id):
+            roadmap = local
+    if roadmap is None:
+        raise HTTPException(status_code=404, detail="Roadmap not found.")
+    return {"status": "success", "roadmap": roadmap}
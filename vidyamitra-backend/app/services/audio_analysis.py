@@ -5,6 +5,7 @@ Transcribes audio via Groq's Whisper API and detects filler words
 with precise timestamps.
 """
 
+import asyncio
 import os
 import re
 import tempfile
@@ -97,7 +98,14 @@ async def transcribe_audio(audio_bytes: bytes, filename: str = "audio.webm") ->
       - segments (list)       segment-level data
       - words (list|None)     word-level data (when available)
       - duration (float)      total audio length in seconds
+
+    The Groq SDK client is synchronous, so the upload runs on a worker
+    thread instead of blocking the event loop.
     """
+    return await asyncio.to_thread(_transcribe_sync, audio_bytes, filename)
+
+
+def _transcribe_sync(audio_bytes: bytes, filename: str) -> dict:
     client = _get_groq_client()
 
     # Groq's SDK expects a file-like object.  Write to a temp file so we
@@ -6,6 +6,7 @@ Processes video to detect if the user's head pose and eye direction are
 pointed toward the screen.
 """
 
+import asyncio
 import math
 import os
 import tempfile
@@ -110,7 +111,13 @@ async def process_video_eye_contact(
     - Samples frames down to 'target_fps' for performance
     - Extracts face landmarks via MediaPipe
     - Emits state changes to keep output small
+
+    The frame loop is CPU-bound, so it runs on a worker thread.
     """
+    return await asyncio.to_thread(_eye_contact_edges, video_bytes, filename, target_fps)
+
+
+def _eye_contact_edges(video_bytes: bytes, filename: str, target_fps: int) -> List[dict]:
     if mp is None:
         print("WARNING: MediaPipe or OpenCV failed to load (likely missing OS packages like libGL natively on Render). Skipping video eye contact analysis.")
         return []
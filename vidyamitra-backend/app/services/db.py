@@ -0,0 +1,356 @@
+"""
+Database Access
+===============
+The shared Supabase client, and non-blocking calls to it for async handlers.
+
+One service-role client is created at startup (`connect()`, from the app
+lifespan) and closed at shutdown (`close()`). Its REST and auth traffic goes
+through a single pooled HTTP client, so connections are reused across every
+router. Endpoints receive it as a dependency:
+
+    async def get_history(user_id: str, supabase: Optional[Client] = Depends(get_supabase)): ...
+
+and code outside a request (background jobs) calls `client()`. Both return
+None when `SUPABASE_URL` / `SUPABASE_SERVICE_ROLE_KEY` are not set; routers
+keep treating Supabase as optional.
+
+The auth endpoints depend on `get_auth` instead: a fresh auth client per
+request on the same connection pool. A supabase-py client that signs a user
+in switches its own Authorization header to that user's token and starts a
+refresh timer, which a client shared between users must never do.
+
+supabase-py's client is synchronous: `.execute()` and the auth calls make a
+full network round trip on the calling thread, so calling them directly in an
+`async def` handler stalls every other request on the worker. Routers build
+queries exactly as before and hand the blocking call to this module:
+
+    response = await db.execute(supabase.table("quizzes").select("*").eq("user_id", user_id))
+    session = await db.run(auth.sign_in_with_password, credentials)
+
+Calls run on a dedicated pool of `SUPABASE_MAX_WORKERS` threads, so a slow
+database cannot starve the default executor used by the rest of the app,
+and each call is bounded by `SUPABASE_TIMEOUT_SECONDS`, time spent waiting
+for a thread included. A call that times out raises `DBTimeout`; if it had
+already started, its thread finishes the request and the result is
+discarded. Other errors propagate unchanged, so the routers' best-effort
+`try/except` blocks behave as before.
+
+History endpoints page through a user's rows with `history_page()`: newest
+first, `limit` rows at a time, `before` = the cursor returned with the
+previous page, and only the columns `projection()` allows (a summary by
+default). The cursor is an opaque encoding of the last row's
+(`created_at`, `id`), so rows sharing a timestamp across a page boundary
+are neither skipped nor repeated. `history_item()` fetches one row in full.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import functools
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+from fastapi import HTTPException
+
+from ..core.config import settings
+
+# The shared client needs `ClientOptions(httpx_client=...)` and the
+# `supabase_auth` package: supabase>=2.22.3 (see requirements.txt).
+try:
+    from supabase import Client, ClientOptions, create_client
+    from supabase_auth import SyncGoTrueClient, SyncMemoryStorage
+    _import_error: Optional[ImportError] = None
+except ImportError as e:  # pragma: no cover - Supabase is optional for local runs
+    Client = Any  # type: ignore[misc,assignment]
+    SyncGoTrueClient = Any  # type: ignore[misc,assignment]
+    create_client = None
+    _import_error = e
+
+
+class DBTimeout(TimeoutError):
+    """A Supabase call did not finish within its timeout."""
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_http: Optional[httpx.Client] = None
+_client: Optional[Client] = None
+_lock = threading.Lock()
+_stats: Dict[str, float] = {
+    "calls": 0, "errors": 0, "timeouts": 0, "in_flight": 0, "total_ms": 0.0, "max_ms": 0.0,
+}
+
+
+# ---------------------------------------------------------------------------
+# Client lifecycle
+# ---------------------------------------------------------------------------
+
+def _configured() -> bool:
+    return bool(settings.SUPABASE_URL and settings.SUPABASE_SERVICE_ROLE_KEY)
+
+
+def _open_locked() -> None:
+    global _http, _client
+    if _client is not None or not _configured():
+        return
+    if _import_error is not None:
+        # Credentials are set, so running without the database would be a
+        # silent outage; refuse to start instead.
+        raise RuntimeError(
+            "SUPABASE_URL is set but the installed supabase package is missing or too old "
+            f"(need supabase>=2.22.3, see requirements.txt): {_import_error}"
+        )
+    pool = max(1, settings.SUPABASE_MAX_WORKERS)
+    _http = httpx.Client(
+        timeout=settings.SUPABASE_TIMEOUT_SECONDS,
+        limits=httpx.Limits(max_connections=pool, max_keepalive_connections=pool),
+        follow_redirects=True,
+    )
+    try:
+        _client = create_client(
+            settings.SUPABASE_URL,
+            settings.SUPABASE_SERVICE_ROLE_KEY,
+            options=ClientOptions(
+                httpx_client=_http,
+                auto_refresh_token=False,
+                persist_session=False,
+                storage=SyncMemoryStorage(),
+            ),
+        )
+    except Exception as e:
+        print(f"Supabase client not created: {e}")
+        _http.close()
+        _http = None
+
+
+def connect() -> None:
+    """
+    Create the shared client (no-op when Supabase is not configured).
+    Raises RuntimeError when it is configured but supabase-py cannot be imported.
+    """
+    with _lock:
+        _open_locked()
+
+
+def client() -> Optional[Client]:
+    """The shared client, or None. Opened on first use if the lifespan has not run (scripts)."""
+    if _client is None:
+        with _lock:
+            _open_locked()
+    return _client
+
+
+def get_supabase() -> Optional[Client]:
+    """FastAPI dependency: the shared client, or None when Supabase is not configured."""
+    return client()
+
+
+def get_auth() -> "SyncGoTrueClient":
+    """FastAPI dependency: a session-less auth client on the shared connection pool."""
+    shared = client()
+    if shared is None:
+        raise HTTPException(status_code=503, detail="Supabase is not configured on this server.")
+    key = settings.SUPABASE_SERVICE_ROLE_KEY
+    return SyncGoTrueClient(
+        url=str(shared.auth_url),
+        headers={"apiKey": key, "Authorization": f"Bearer {key}"},
+        http_client=_http,
+        auto_refresh_token=False,
+        persist_session=False,
+        storage=SyncMemoryStorage(),
+    )
+
+
+def close() -> None:
+    """Stop the pool (queued calls are cancelled, running ones finish) and close the client."""
+    global _executor, _http, _client
+    with _lock:
+        executor, _executor = _executor, None
+        http, _http, _client = _http, None, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+    if http is not None:
+        http.close()
+
+
+# ---------------------------------------------------------------------------
+# Non-blocking calls
+# ---------------------------------------------------------------------------
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, settings.SUPABASE_MAX_WORKERS), thread_name_prefix="supabase"
+            )
+        return _executor
+
+
+def _record(outcome: Optional[str], ms: float) -> None:
+    with _lock:
+        _stats["in_flight"] -= 1
+        _stats["calls"] += 1
+        _stats["total_ms"] += ms
+        _stats["max_ms"] = max(_stats["max_ms"], ms)
+        if outcome:
+            _stats[outcome] += 1
+
+
+async def run(fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+    """Run the blocking `fn(*args, **kwargs)` on the Supabase thread pool."""
+    timeout = settings.SUPABASE_TIMEOUT_SECONDS if timeout is None else timeout
+    loop = asyncio.get_running_loop()
+    with _lock:
+        _stats["in_flight"] += 1
+    started = time.perf_counter()
+    outcome: Optional[str] = None
+    try:
+        future = loop.run_in_executor(_get_executor(), functools.partial(fn, *args, **kwargs))
+        return await asyncio.wait_for(future, timeout)
+    except asyncio.TimeoutError:
+        outcome = "timeouts"
+        raise DBTimeout(f"Supabase call timed out after {timeout:g}s") from None
+    except Exception:
+        outcome = "errors"
+        raise
+    finally:
+        _record(outcome, (time.perf_counter() - started) * 1000.0)
+
+
+async def execute(query: Any, timeout: Optional[float] = None) -> Any:
+    """`await db.execute(builder)` — the non-blocking form of `builder.execute()`."""
+    return await run(query.execute, timeout=timeout)
+
+
+# ---------------------------------------------------------------------------
+# History pages
+# ---------------------------------------------------------------------------
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def projection(fields: Optional[str], summary: Sequence[str], allowed: Sequence[str]) -> List[str]:
+    """
+    Columns to select: `summary` by default, otherwise the comma-separated
+    `fields` (each must be in `allowed`, else 400). `id` and `created_at`
+    are always included; the cursor needs them.
+    """
+    if fields and fields.strip():
+        columns = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+        unknown = [c for c in columns if c not in allowed]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(allowed)}.",
+            )
+    else:
+        columns = list(summary)
+    return [c for c in ("id", "created_at") if c not in columns] + columns
+
+
+def _encode_cursor(row: dict) -> Optional[str]:
+    if row.get("created_at") is None:
+        return None
+    raw = json.dumps([row["created_at"], row.get("id")], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(before: Optional[str]) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    (created_at, id) of a `before` cursor, None for the first page; 400 if it
+    is malformed. A bare `created_at` (older clients) pages by timestamp only.
+    """
+    if not before:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(before + "=" * (-len(before) % 4))
+        created_at, row_id = json.loads(raw)
+        created_at, row_id = str(created_at), (None if row_id is None else str(row_id))
+    except Exception:
+        # An unencoded "+" in the query string (the timestamp's UTC offset) arrives as a space.
+        created_at, row_id = before.replace(" ", "+"), None
+        if ":" not in created_at:
+            raise HTTPException(status_code=400, detail="Invalid `before` cursor.")
+    if any(c in created_at + (row_id or "") for c in '"\\'):
+        raise HTTPException(status_code=400, detail="Invalid `before` cursor.")
+    return created_at, row_id
+
+
+async def history_page(
+    supabase: Any,
+    table: str,
+    user_id: str,
+    columns: Sequence[str],
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[Tuple[str, Optional[str]]] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    One page of the user's rows, newest first (ties broken by `id`), after
+    `cursor` (from `decode_cursor()`). Returns (rows, `before` for the next
+    page or None).
+    """
+    query = supabase.table(table).select(", ".join(columns)).eq("user_id", user_id)
+    if cursor:
+        created_at, row_id = cursor
+        if row_id is None:
+            query = query.lt("created_at", created_at)
+        else:
+            query = query.or_(
+                f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt."{row_id}")'
+            )
+    query = query.order("created_at", desc=True).order("id", desc=True)
+    response = await execute(query.limit(limit + 1))
+    rows = response.data or []
+    if len(rows) > limit:
+        return rows[:limit], _encode_cursor(rows[limit - 1])
+    return rows, None
+
+
+async def history_item(
+    supabase: Any, table: str, user_id: str, item_id: str, columns: Optional[Sequence[str]] = None
+) -> Optional[dict]:
+    """One of the user's rows (all columns unless `columns`), or None."""
+    query = supabase.table(table).select(", ".join(columns) if columns else "*")
+    response = await execute(query.eq("id", item_id).eq("user_id", user_id).limit(1))
+    return response.data[0] if response.data else None
+
+
+async def local_only(supabase: Any, table: str, page: Sequence[dict], local: Sequence[dict]) -> List[dict]:
+    """
+    The `local` rows (sessions kept in a local store) that are not in
+    Supabase: neither on `page` nor found by id. Routers list them after the
+    first page's rows; they have no `created_at` to page by.
+    """
+    seen = {str(row.get("id")) for row in page}
+    candidates = [row for row in local if str(row.get("id")) not in seen]
+    if candidates and supabase is not None:
+        try:
+            ids = [str(row["id"]) for row in candidates]
+            response = await execute(supabase.table(table).select("id").in_("id", ids))
+            seen.update(str(row.get("id")) for row in response.data or [])
+        except Exception:
+            pass  # Supabase unreachable: list them all
+    return [row for row in candidates if str(row.get("id")) not in seen]
+
+
+def stats() -> dict:
+    with _lock:
+        snapshot = dict(_stats)
+    calls = int(snapshot["calls"])
+    return {
+        "configured": _client is not None,
+        "max_workers": max(1, settings.SUPABASE_MAX_WORKERS),
+        "timeout_seconds": settings.SUPABASE_TIMEOUT_SECONDS,
+        "calls": calls,
+        "errors": int(snapshot["errors"]),
+        "timeouts": int(snapshot["timeouts"]),
+        "in_flight": int(snapshot["in_flight"]),
+        "avg_ms": round(snapshot["total_ms"] / calls, 1) if calls else 0.0,
+        "max_ms": round(snapshot["max_ms"], 1),
+    }
@@ -0,0 +1,362 @@
+"""
+Job Queue
+=========
+Persistent background jobs for endpoints that outlive proxy timeouts
+(`/interview/analyze`, `/interview/report`).
+
+A job is a row in SQLite (`JOB_QUEUE_PATH`, shared by every worker process)
+holding its kind, JSON payload, state (`queued` → `running` → `succeeded` |
+`failed`), current stage, and JSON result or error. Handlers are registered
+per kind by the routers that own the work:
+
+    job_queue.queue.register("interview.analyze", _analysis_job, stages=ANALYSIS_STAGES)
+
+and are called as `await handler(payload, progress)`; `progress(stage)`
+records the stage the job is in. The handler's return value becomes the
+job's result. An exception with a `status_code` (HTTPException) fails the
+job with that code and `detail`; anything else fails it with a 500.
+
+Handlers run on the API's event loop, so they must not block it: anything
+synchronous (SDK calls, file I/O, CPU-bound loops) goes through
+`asyncio.to_thread`. A blocked loop stalls requests and the lease renewals.
+
+Each process runs `JOB_WORKERS` asyncio workers that claim the oldest queued
+job under a lease (`JOB_LEASE_SECONDS`), renewed while the job runs. Jobs
+survive restarts: a graceful shutdown puts running jobs back in the queue,
+and after a crash their lease runs out and a worker picks them up again, up
+to `JOB_MAX_ATTEMPTS` runs in total. Finished jobs are deleted after
+`JOB_RETENTION_SECONDS`.
+
+`enqueue()` is idempotent per `dedupe_key`: while a job with the same key is
+queued or running, its id is returned instead of starting a second one.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from ..core.config import settings
+from ..utils.storage import get_writable_temp_path
+
+DB_PATH = get_writable_temp_path("JOB_QUEUE_PATH", "vidyamitra_jobs.db")
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          TEXT PRIMARY KEY,
+    kind        TEXT NOT NULL,
+    state       TEXT NOT NULL,
+    stage       TEXT,
+    owner       TEXT,
+    dedupe_key  TEXT,
+    payload     TEXT NOT NULL CHECK (json_valid(payload)),
+    result      TEXT,
+    error       TEXT,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    lease_until REAL,
+    created_at  REAL NOT NULL,
+    started_at  REAL,
+    finished_at REAL,
+    updated_at  REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS jobs_by_state ON jobs (state, created_at);
+
+-- At most one queued/running job per dedupe key.
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_active_key ON jobs (dedupe_key)
+    WHERE dedupe_key IS NOT NULL AND state IN ('queued', 'running');
+"""
+
+# How often idle workers requeue expired leases and purge old jobs.
+_MAINTENANCE_INTERVAL_SECONDS = 5.0
+
+Progress = Callable[[str], None]
+Handler = Callable[[dict, Progress], Awaitable[Any]]
+
+
+def no_progress(stage: str) -> None:
+    """Progress callback for work that runs inline (not as a job)."""
+
+
+class JobQueue:
+    def __init__(self, db_path: Path = DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._handlers: Dict[str, Tuple[Handler, Tuple[str, ...]]] = {}
+        self._workers: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._watchers: Dict[str, Set[asyncio.Event]] = {}
+        self._last_maintenance = 0.0
+        self._stats: Dict[str, int] = {
+            "enqueued": 0, "deduplicated": 0, "succeeded": 0, "failed": 0, "requeued": 0, "released": 0,
+        }
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _count(self, field: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[field] += n
+
+    def register(self, kind: str, handler: Handler, stages: Sequence[str] = ()) -> None:
+        """Run `kind` jobs with `handler`; `stages` documents the progress stages it reports."""
+        self._handlers[kind] = (handler, tuple(stages))
+
+    # ---- producers ----
+    def enqueue(self, kind: str, payload: dict, owner: Optional[str] = None, dedupe_key: Optional[str] = None) -> str:
+        """Queue a job and return its id (or the id of the active job with the same `dedupe_key`)."""
+        if kind not in self._handlers:
+            raise KeyError(f"No handler registered for job kind '{kind}'")
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        try:
+            self._conn.execute(
+                """
+                INSERT INTO jobs (id, kind, state, owner, dedupe_key, payload, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (job_id, kind, QUEUED, owner, dedupe_key, json.dumps(payload, ensure_ascii=False), now, now),
+            )
+        except sqlite3.IntegrityError:
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE dedupe_key = ? AND state IN (?, ?)", (dedupe_key, QUEUED, RUNNING)
+            ).fetchone()
+            if row is None:  # finished in between: queue a fresh one
+                return self.enqueue(kind, payload, owner=owner, dedupe_key=dedupe_key)
+            self._count("deduplicated")
+            return row[0]
+        self._count("enqueued")
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_id
+
+    # ---- readers ----
+    def get(self, job_id: str) -> Optional[dict]:
+        row = self._conn.execute(
+            """
+            SELECT id, kind, state, stage, owner, result, error, attempts, created_at, started_at, finished_at, updated_at
+            FROM jobs WHERE id = ?
+            """,
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        (job_id, kind, state, stage, owner, result, error, attempts,
+         created_at, started_at, finished_at, updated_at) = row
+        _, stages = self._handlers.get(kind, (None, ()))
+        job = {
+            "id": job_id,
+            "kind": kind,
+            "state": state,
+            "stage": stage,
+            "stages": list(stages),
+            "owner": owner,
+            "attempts": attempts,
+            "created_at": created_at,
+            "started_at": started_at,
+            "finished_at": finished_at,
+            "updated_at": updated_at,
+        }
+        if result is not None:
+            job["result"] = json.loads(result)
+        if error is not None:
+            job["error"] = json.loads(error)
+        return job
+
+    async def wait_for_change(self, job_id: str, timeout: float) -> None:
+        """Return when this process updates the job, or after `timeout` (other processes are not observed)."""
+        event = asyncio.Event()
+        self._watchers.setdefault(job_id, set()).add(event)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            watchers = self._watchers.get(job_id)
+            if watchers is not None:
+                watchers.discard(event)
+                if not watchers:
+                    self._watchers.pop(job_id, None)
+
+    def _notify(self, job_id: str) -> None:
+        for event in self._watchers.get(job_id, ()):
+            event.set()
+
+    # ---- state transitions ----
+    def _update(self, job_id: str, sql: str, params: Sequence[Any]) -> None:
+        self._conn.execute(f"UPDATE jobs SET {sql}, updated_at = ? WHERE id = ?", (*params, time.time(), job_id))
+        self._notify(job_id)
+
+    def _claim(self) -> Optional[Tuple[str, str, dict]]:
+        if not self._handlers:
+            return None
+        now = time.time()
+        kinds = list(self._handlers)
+        row = self._conn.execute(
+            f"""
+            UPDATE jobs SET state = ?, attempts = attempts + 1, lease_until = ?, stage = NULL,
+                            started_at = COALESCE(started_at, ?), updated_at = ?
+            WHERE id = (
+                SELECT id FROM jobs WHERE state = ? AND kind IN ({", ".join("?" * len(kinds))})
+                ORDER BY created_at LIMIT 1
+            ) AND state = ?
+            RETURNING id, kind, payload
+            """,
+            (RUNNING, now + settings.JOB_LEASE_SECONDS, now, now, QUEUED, *kinds, QUEUED),
+        ).fetchone()
+        if row is None:
+            return None
+        self._notify(row[0])
+        return row[0], row[1], json.loads(row[2])
+
+    def _finish(self, job_id: str, state: str, result: Any = None, error: Optional[dict] = None) -> None:
+        self._update(
+            job_id,
+            "state = ?, result = ?, error = ?, finished_at = ?, lease_until = NULL",
+            (state,
+             None if result is None else json.dumps(result, ensure_ascii=False, default=str),
+             None if error is None else json.dumps(error, ensure_ascii=False),
+             time.time()),
+        )
+        self._count(state)
+
+    def _release(self, job_id: str) -> None:
+        # Shutdown mid-run: back to the queue, and this run does not count as an attempt.
+        self._update(job_id, "state = ?, stage = NULL, lease_until = NULL, attempts = attempts - 1", (QUEUED,))
+        self._count("released")
+
+    def _maintain(self) -> None:
+        """Requeue jobs whose worker died (lease expired) and purge old finished jobs."""
+        now = time.time()
+        if now - self._last_maintenance < _MAINTENANCE_INTERVAL_SECONDS:
+            return
+        self._last_maintenance = now
+        conn = self._conn
+        requeued = conn.execute(
+            """
+            UPDATE jobs SET state = ?, stage = NULL, lease_until = NULL, updated_at = ?
+            WHERE state = ? AND lease_until < ? AND attempts < ?
+            """,
+            (QUEUED, now, RUNNING, now, settings.JOB_MAX_ATTEMPTS),
+        ).rowcount
+        if requeued:
+            self._count("requeued", requeued)
+        failed = conn.execute(
+            """
+            UPDATE jobs SET state = ?, error = ?, finished_at = ?, lease_until = NULL, updated_at = ?
+            WHERE state = ? AND lease_until < ?
+            """,
+            (FAILED, json.dumps({"status_code": 500, "detail": "Job was interrupted too many times."}),
+             now, now, RUNNING, now),
+        ).rowcount
+        if failed:
+            self._count("failed", failed)
+        conn.execute(
+            "DELETE FROM jobs WHERE state IN (?, ?) AND finished_at < ?",
+            (*FINISHED, now - settings.JOB_RETENTION_SECONDS),
+        )
+
+    # ---- workers ----
+    async def _heartbeat(self, job_id: str) -> None:
+        interval = max(settings.JOB_LEASE_SECONDS / 3.0, 1.0)
+        while True:
+            await asyncio.sleep(interval)
+            self._conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND state = ?",
+                (time.time() + settings.JOB_LEASE_SECONDS, job_id, RUNNING),
+            )
+
+    async def _run(self, job_id: str, kind: str, payload: dict) -> None:
+        handler, _ = self._handlers[kind]
+
+        def progress(stage: str) -> None:
+            self._update(job_id, "stage = ?", (stage,))
+
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            result = await handler(payload, progress)
+        except asyncio.CancelledError:
+            self._release(job_id)
+            raise
+        except Exception as e:
+            status_code = getattr(e, "status_code", None)
+            if isinstance(status_code, int):
+                error = {"status_code": status_code, "detail": getattr(e, "detail", str(e))}
+            else:
+                print(f"Job {job_id} ({kind}) failed: {e}")
+                error = {"status_code": 500, "detail": "Job failed unexpectedly."}
+            self._finish(job_id, FAILED, error=error)
+        else:
+            self._finish(job_id, SUCCEEDED, result=result)
+        finally:
+            heartbeat.cancel()
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                self._maintain()
+                claimed = self._claim()
+            except sqlite3.Error as e:
+                print(f"Job queue unavailable: {e}")
+                claimed = None
+            if claimed is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), settings.JOB_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(*claimed)
+
+    def start(self, workers: int) -> None:
+        """Start `workers` worker tasks on the running loop (idempotent)."""
+        if self._workers or workers <= 0:
+            return
+        self._wakeup = asyncio.Event()
+        self._workers = [asyncio.create_task(self._worker(), name=f"job-worker-{i}") for i in range(workers)]
+
+    async def stop(self) -> None:
+        """Stop the workers; jobs they were running go back to the queue."""
+        workers, self._workers = self._workers, []
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._stats)
+        try:
+            rows = self._conn.execute("SELECT kind, state, COUNT(*) FROM jobs GROUP BY kind, state").fetchall()
+        except sqlite3.Error:
+            rows = []
+        kinds: Dict[str, Dict[str, int]] = {}
+        for kind, state, n in rows:
+            kinds.setdefault(kind, {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0})[state] = n
+        return {
+            "workers": len(self._workers),
+            **counters,
+            "kinds": kinds,
+        }
+
+
+queue = JobQueue()
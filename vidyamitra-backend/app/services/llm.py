@@ -0,0 +1,498 @@
+"""
+LLM Gateway
+===========
+Single entry point for every chat-completion call the routers make.
+
+- One `AsyncOpenAI` client (OpenAI-compatible Groq endpoint) on top of one
+  pooled `httpx.AsyncClient`, so connections and TLS sessions are reused
+  across requests instead of each router keeping its own client.
+- Uniform timeouts for all calls (`LLM_TIMEOUT_SECONDS`).
+- Outbound concurrency is capped per task (`LLM_TASK_CONCURRENCY`,
+  overridable per task below), so one busy endpoint cannot take every slot,
+  and globally by an adaptive limiter (`llm_limiter`) that backs off on 429s
+  and honours Groq's rate-limit headers. Fan-out evaluation runs at batch
+  priority, behind interactive calls.
+- Rate-limited (429), 5xx and connection failures are retried with jittered
+  exponential backoff (`LLM_MAX_RETRIES`).
+- Every attempt is instrumented (`llm_metrics`): wall time, time to first
+  byte, token usage and outcome per task and model.
+- Each task runs on the model its route names (`model_for()`): low-stakes
+  generation (quizzes, roadmaps, job matching) on the fast tier
+  (`LLM_FAST_MODEL`), everything else on `LLM_DEFAULT_MODEL`. A routed
+  call whose output fails parsing or its schema is retried once on the
+  default model (`LLM_QUALITY_FALLBACK`).
+
+Call sites identify themselves with a task tag ("resume.parse",
+"quiz.generate", ...) and use `complete_json()`, which returns the parsed JSON
+object from the model. Malformed output is recovered where possible
+(`utils.json_extract`: surrounding prose, trailing commas, single quotes,
+truncation) and, with `schema=`, validated against the task's `LLMOutput`
+model, so a fixable response never costs a second generation. Passing
+`cache_ttl` opts the call into the response cache (`llm_cache`): identical
+inputs are then answered without a completion.
+
+Deterministic tasks (parsing, scoring, evaluation) pass `coalesce=True`:
+identical calls in flight at the same time (double-clicks, frontend retries)
+then share one completion, the first caller running it and the others awaiting
+its result ("single-flight"). Generative tasks (questions, quizzes, roadmaps)
+leave it off, so two users sending the same prompt still get separate samples.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import os
+import threading
+from typing import Annotated, Any, Dict, List, Optional, Tuple, Type
+
+import httpx
+from dotenv import load_dotenv
+from openai import APIConnectionError, APITimeoutError, AsyncOpenAI, InternalServerError, RateLimitError
+from pydantic import BaseModel, BeforeValidator, ConfigDict, ValidationError
+
+from ..core.config import settings
+from ..utils.json_extract import JSONExtractError, extract_json_with_method
+from . import llm_metrics
+from .llm_cache import cache as response_cache, cache_key
+from .llm_limiter import BATCH, INTERACTIVE, AdaptiveLimiter, backoff_delay, parse_duration
+
+load_dotenv()
+
+JSON_OBJECT = {"type": "json_object"}
+
+# Model tiers a route can name instead of a model id.
+FAST = "fast"
+DEFAULT = "default"
+
+# Task -> model route (a tier or a model id); unlisted tasks use the default
+# model. LLM_MODEL_ROUTES entries override these.
+_TASK_MODELS: Dict[str, str] = {
+    "quiz.generate": FAST,
+    "roadmap.generate": FAST,
+    "jobs.match": FAST,
+}
+
+# Per-task concurrency overrides (tasks not listed use LLM_TASK_CONCURRENCY).
+# The fan-out evaluators would otherwise fill the global pool on their own.
+_TASK_CONCURRENCY: Dict[str, int] = {
+    "evaluate.answer": 4,
+    "interview_pipeline.evaluate_answer": 4,
+}
+
+# Tasks queued behind interactive calls when the limiter is saturated.
+_BATCH_TASKS = {
+    "evaluate.answer",
+    "evaluate.summary",
+    "interview_pipeline.evaluate_answer",
+    "interview_pipeline.evaluate_batch",
+    "interview_pipeline.summary",
+    "question_bank.refill",
+}
+
+
+class LLMError(Exception):
+    """Base class for gateway errors."""
+
+
+class LLMNotConfigured(LLMError):
+    def __init__(self) -> None:
+        super().__init__("GROQ_API_KEY is not configured on this server.")
+
+
+class LLMInvalidJSON(LLMError, ValueError):
+    """The model answered, but not with usable JSON (unparseable or off-schema). `raw` holds the output."""
+
+    def __init__(self, task: str, raw: str, reason: str):
+        super().__init__(f"{task}: model returned invalid JSON ({reason})")
+        self.task = task
+        self.raw = raw
+
+
+class LLMOutput(BaseModel):
+    """
+    Base for per-task output schemas passed as `complete_json(schema=...)`.
+
+    Keys the schema does not declare are kept, and numbers are accepted where
+    a string is declared; give every field the default the caller would fall
+    back to, so only a wrong shape fails validation.
+    """
+
+    model_config = ConfigDict(extra="allow", coerce_numbers_to_str=True)
+
+
+def valid_items(model: Type[BaseModel]) -> Any:
+    """
+    Field type for a list of `model` that drops entries failing validation
+    (typically the last one, cut off when the output hit the token limit)
+    instead of rejecting the whole response.
+    """
+
+    def keep_valid(items: Any) -> Any:
+        if not isinstance(items, list):
+            return items
+        kept = []
+        for item in items:
+            try:
+                kept.append(model.model_validate(item))
+            except ValidationError:
+                continue
+        return kept
+
+    return Annotated[List[model], BeforeValidator(keep_valid)]
+
+
+# ---------------------------------------------------------------------------
+# Client and limits (per event loop)
+# ---------------------------------------------------------------------------
+class _Gateway:
+    """Pooled client, limiter and semaphores; bound to the event loop that created them."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_MAX_CONNECTIONS,
+                keepalive_expiry=settings.LLM_KEEPALIVE_SECONDS,
+            ),
+            timeout=httpx.Timeout(
+                settings.LLM_TIMEOUT_SECONDS, connect=settings.LLM_CONNECT_TIMEOUT_SECONDS
+            ),
+            event_hooks={
+                "request": [llm_metrics.stamp_request],
+                "response": [llm_metrics.stamp_response],
+            },
+        )
+        self.client = AsyncOpenAI(
+            api_key=os.getenv("GROQ_API_KEY"),
+            base_url=settings.LLM_BASE_URL,
+            http_client=self.http,
+            timeout=settings.LLM_TIMEOUT_SECONDS,
+            max_retries=0,  # retried in complete_text(), where the limiter sees every attempt
+        )
+        self.limiter = AdaptiveLimiter(
+            initial=settings.LLM_MAX_CONCURRENCY,
+            minimum=settings.LLM_MIN_CONCURRENCY,
+            maximum=settings.LLM_MAX_CONCURRENCY,
+        )
+        self.task_slots: Dict[str, asyncio.Semaphore] = {}
+        # cache key -> completion shared by every identical in-flight call
+        self.inflight: Dict[str, asyncio.Task] = {}
+
+    def slots_for(self, task: str) -> asyncio.Semaphore:
+        sem = self.task_slots.get(task)
+        if sem is None:
+            sem = asyncio.Semaphore(_TASK_CONCURRENCY.get(task, settings.LLM_TASK_CONCURRENCY))
+            self.task_slots[task] = sem
+        return sem
+
+
+_gateway: Optional[_Gateway] = None
+
+# task -> counters: "leaders" (calls that ran a completion), "coalesced"
+# (duplicate waiters), "retries", "rate_limited" (429 responses), "repaired"
+# (output recovered by json_extract), "invalid" (unusable output),
+# "fallbacks" (invalid output retried on the default model), and the token
+# usage reported by the API ("prompt_tokens", "completion_tokens")
+_task_stats: Dict[str, Dict[str, int]] = {}
+_stats_lock = threading.Lock()
+
+
+def _count(task: str, field: str, n: int = 1) -> None:
+    with _stats_lock:
+        counters = _task_stats.setdefault(
+            task,
+            {"leaders": 0, "coalesced": 0, "retries": 0, "rate_limited": 0,
+             "repaired": 0, "invalid": 0, "fallbacks": 0, "prompt_tokens": 0, "completion_tokens": 0},
+        )
+        counters[field] += n
+
+
+def task_stats() -> Dict[str, Dict[str, int]]:
+    with _stats_lock:
+        return {task: dict(counters) for task, counters in _task_stats.items()}
+
+
+def limiter_stats() -> Optional[dict]:
+    return _gateway.limiter.stats() if _gateway is not None else None
+
+
+def is_configured() -> bool:
+    return bool(os.getenv("GROQ_API_KEY"))
+
+
+def _get_gateway() -> _Gateway:
+    global _gateway
+    loop = asyncio.get_running_loop()
+    if _gateway is None or _gateway.loop is not loop:
+        if not is_configured():
+            raise LLMNotConfigured()
+        _gateway = _Gateway(loop)
+    return _gateway
+
+
+async def aclose() -> None:
+    """Close the pooled connections (application shutdown)."""
+    global _gateway
+    gateway, _gateway = _gateway, None
+    if gateway is not None and gateway.loop is asyncio.get_running_loop():
+        await gateway.http.aclose()
+
+
+# ---------------------------------------------------------------------------
+# Model routing
+# ---------------------------------------------------------------------------
+def _parse_routes(spec: str) -> Dict[str, str]:
+    routes: Dict[str, str] = {}
+    for part in (spec or "").split(","):
+        task, sep, model = part.partition("=")
+        if sep and task.strip() and model.strip():
+            routes[task.strip()] = model.strip()
+    return routes
+
+
+def _resolve(route: str) -> str:
+    if route == FAST:
+        return settings.LLM_FAST_MODEL
+    if route == DEFAULT:
+        return settings.LLM_DEFAULT_MODEL
+    return route
+
+
+def routes() -> Dict[str, str]:
+    """task -> model for every task with a route (built-in table plus `LLM_MODEL_ROUTES`)."""
+    table = {**_TASK_MODELS, **_parse_routes(settings.LLM_MODEL_ROUTES)}
+    return {task: _resolve(route) for task, route in sorted(table.items())}
+
+
+def model_for(task: str) -> str:
+    """The model `task` runs on."""
+    route = _parse_routes(settings.LLM_MODEL_ROUTES).get(task) or _TASK_MODELS.get(task, DEFAULT)
+    return _resolve(route)
+
+
+# ---------------------------------------------------------------------------
+# Calls
+# ---------------------------------------------------------------------------
+def _validated(task: str, schema: Optional[Type[BaseModel]], value: Any, raw: str) -> Any:
+    if schema is None:
+        return value
+    try:
+        return schema.model_validate(value).model_dump()
+    except ValidationError as e:
+        raise LLMInvalidJSON(task, raw, f"schema {schema.__name__}: {e.error_count()} error(s)") from e
+
+
+async def _complete(
+    task: str,
+    messages: List[Dict[str, str]],
+    *,
+    model: str,
+    response_format: Optional[Dict[str, Any]],
+    temperature: Optional[float],
+    max_tokens: Optional[int],
+    priority: Optional[int],
+) -> Tuple[str, llm_metrics.CallTimer]:
+    """
+    Run one chat completion under the gateway limits. Returns its text and the
+    timer of the successful attempt, which the caller records once it knows
+    whether the output was usable; failed attempts are recorded here.
+    """
+    gateway = _get_gateway()
+    if priority is None:
+        priority = BATCH if task in _BATCH_TASKS else INTERACTIVE
+    kwargs: Dict[str, Any] = {"model": model, "messages": messages}
+    if response_format is not None:
+        kwargs["response_format"] = response_format
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+    if max_tokens is not None:
+        kwargs["max_tokens"] = max_tokens
+
+    limiter = gateway.limiter
+    # Task slot first, so a queued task never holds one of the global slots.
+    async with gateway.slots_for(task):
+        attempt = 0
+        while True:
+            await limiter.acquire(priority)
+            retry_after: Optional[float] = None
+            call = llm_metrics.CallTimer(task, model)
+            try:
+                response = await gateway.client.chat.completions.with_raw_response.create(**kwargs)
+            except RateLimitError as e:
+                call.received(e.response.request)
+                llm_metrics.record(call, "rate_limited")
+                _count(task, "rate_limited")
+                retry_after = parse_duration(e.response.headers.get("retry-after"))
+                limiter.on_throttle(retry_after, e.response.headers)
+                limiter.release()
+                if attempt >= settings.LLM_MAX_RETRIES:
+                    raise
+            except (APIConnectionError, InternalServerError) as e:
+                failed = getattr(e, "response", None)
+                call.received(failed.request if failed is not None else None)
+                llm_metrics.record(call, "timeout" if isinstance(e, APITimeoutError) else "error")
+                limiter.release()
+                if attempt >= settings.LLM_MAX_RETRIES:
+                    raise
+            except Exception:
+                llm_metrics.record(call, "error")
+                limiter.release()
+                raise
+            except BaseException:
+                limiter.release()
+                raise
+            else:
+                limiter.on_success(response.headers)
+                limiter.release()
+                completion = response.parse()
+                call.received(response.http_request, completion.usage)
+                if completion.usage is not None:
+                    _count(task, "prompt_tokens", completion.usage.prompt_tokens or 0)
+                    _count(task, "completion_tokens", completion.usage.completion_tokens or 0)
+                return completion.choices[0].message.content or "", call
+
+            _count(task, "retries")
+            await asyncio.sleep(backoff_delay(
+                attempt,
+                base=settings.LLM_BACKOFF_BASE_SECONDS,
+                cap=settings.LLM_BACKOFF_MAX_SECONDS,
+                retry_after=retry_after,
+            ))
+            attempt += 1
+
+
+async def complete_text(
+    task: str,
+    messages: List[Dict[str, str]],
+    *,
+    model: Optional[str] = None,
+    response_format: Optional[Dict[str, Any]] = None,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    priority: Optional[int] = None,
+) -> str:
+    """Run one chat completion under the gateway limits and return its text."""
+    text, call = await _complete(
+        task,
+        messages,
+        model=model or model_for(task),
+        response_format=response_format,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        priority=priority,
+    )
+    llm_metrics.record(call, "ok")
+    return text
+
+
+async def complete_json(
+    task: str,
+    messages: List[Dict[str, str]],
+    *,
+    model: Optional[str] = None,
+    response_format: Optional[Dict[str, Any]] = JSON_OBJECT,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    priority: Optional[int] = None,
+    cache_ttl: Optional[float] = None,
+    prompt_version: str = "1",
+    coalesce: bool = False,
+    schema: Optional[Type[BaseModel]] = None,
+) -> Any:
+    """
+    Run one chat completion and return the parsed JSON from its output.
+
+    `model` defaults to the task's route (`model_for()`). When the routed
+    model's output is unusable and `LLM_QUALITY_FALLBACK` is on, the call is
+    retried once on `LLM_DEFAULT_MODEL` before `LLMInvalidJSON` is raised.
+
+    With `cache_ttl` (seconds), a response for the same model, messages,
+    response format and `prompt_version` is served from the cache; bump
+    `prompt_version` when the prompt's meaning changes but its text does not.
+    With `coalesce`, identical concurrent calls share one completion; only pass
+    it for tasks whose output should not vary between callers.
+    With `schema` (an `LLMOutput` model), the result is validated and returned
+    as the model's dump, with defaults filled in.
+
+    Raises `LLMInvalidJSON` if the output cannot be parsed or fails the schema,
+    `LLMNotConfigured` without an API key; transport errors from the client
+    propagate unchanged.
+    """
+    model = model or model_for(task)
+    key = cache_key(model, messages, response_format, prompt_version)
+    use_cache = bool(cache_ttl) and settings.LLM_CACHE_ENABLED
+    if use_cache:
+        found, value = response_cache.get(task, key)
+        if found:
+            try:
+                return _validated(task, schema, value, "")
+            except LLMInvalidJSON:
+                pass  # stored under an older schema; regenerate
+
+    async def attempt(attempt_model: str) -> Any:
+        raw, call = await _complete(
+            task,
+            messages,
+            model=attempt_model,
+            response_format=response_format,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            priority=priority,
+        )
+        try:
+            value, method = extract_json_with_method(raw)
+            value = _validated(task, schema, value, raw)
+        except JSONExtractError as e:
+            _count(task, "invalid")
+            llm_metrics.record(call, "invalid_json")
+            raise LLMInvalidJSON(task, raw, str(e)) from e
+        except LLMInvalidJSON:
+            _count(task, "invalid")
+            llm_metrics.record(call, "invalid_json")
+            raise
+        llm_metrics.record(call, "ok")
+        if method != "strict":
+            _count(task, "repaired")
+        return value
+
+    async def run() -> Any:
+        try:
+            value = await attempt(model)
+        except LLMInvalidJSON:
+            fallback = settings.LLM_DEFAULT_MODEL
+            if not settings.LLM_QUALITY_FALLBACK or model == fallback:
+                raise
+            _count(task, "fallbacks")
+            value = await attempt(fallback)
+        # Cached under the routed model's key either way: the next identical
+        # call is answered without repeating the fallback.
+        if use_cache:
+            response_cache.put(task, key, value, cache_ttl)
+        return value
+
+    if not coalesce:
+        _count(task, "leaders")
+        return await run()
+
+    gateway = _get_gateway()
+    flight = gateway.inflight.get(key)
+    if flight is None:
+        _count(task, "leaders")
+        # A separate task, so the completion survives the first caller being
+        # cancelled (client disconnect) while others still wait for it.
+        flight = asyncio.ensure_future(run())
+        gateway.inflight[key] = flight
+
+        def _landed(done: asyncio.Task) -> None:
+            gateway.inflight.pop(key, None)
+            if not done.cancelled():
+                done.exception()  # mark retrieved even if every waiter went away
+
+        flight.add_done_callback(_landed)
+    else:
+        _count(task, "coalesced")
+    value = await asyncio.shield(flight)
+    # Every caller gets its own copy; routers mutate the parsed payload.
+    return copy.deepcopy(value)
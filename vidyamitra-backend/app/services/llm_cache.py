@@ -0,0 +1,197 @@
+"""
+LLM Response Cache
+==================
+Content-addressed cache for parsed LLM responses, used by `llm.complete_json`
+for tasks that opt in with a `cache_ttl`.
+
+The key is a SHA-256 over (model, messages, response_format, prompt_version),
+so identical inputs map to the same entry and any prompt change — or a bumped
+`prompt_version` — misses naturally.
+
+Two tiers:
+
+- **memory**: a per-process LRU (`LLM_CACHE_MEMORY_ENTRIES`);
+- **disk**: a SQLite table shared by all workers, with a per-entry expiry
+  (`LLM_CACHE_PATH`, defaults to the OS temp dir).
+
+Disk hits are promoted into memory. Hit/miss counters per task are exposed
+through `stats()`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+from ..utils.storage import get_writable_temp_path
+
+DB_PATH = get_writable_temp_path("LLM_CACHE_PATH", "vidyamitra_llm_cache.db")
+
+HOUR = 3600.0
+DAY = 24 * HOUR
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key         TEXT PRIMARY KEY,
+    task        TEXT NOT NULL,
+    value       TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    expires_at  REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS llm_cache_expiry ON llm_cache (expires_at);
+"""
+
+# Expired rows are purged after this many disk writes.
+_PURGE_EVERY = 200
+
+
+def cache_key(
+    model: str,
+    messages: List[Dict[str, Any]],
+    response_format: Optional[Dict[str, Any]],
+    prompt_version: str,
+) -> str:
+    payload = json.dumps(
+        {
+            "model": model,
+            "messages": messages,
+            "response_format": response_format,
+            "prompt_version": prompt_version,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, db_path: Path = DB_PATH, memory_entries: int = 256):
+        self.db_path = db_path
+        self.memory_entries = memory_entries
+        # key -> (serialized value, expires_at). Values are kept as JSON text so
+        # every hit hands out a fresh object callers can mutate freely.
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writes = 0
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    # ---- disk ----
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _count(self, task: str, field: str, n: int = 1) -> None:
+        with self._lock:
+            counters = self._stats.setdefault(
+                task, {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "errors": 0}
+            )
+            counters[field] += n
+
+    # ---- API ----
+    def get(self, task: str, key: str) -> Tuple[bool, Any]:
+        """Return (found, value). Misses and expired entries return (False, None)."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._memory.move_to_end(key)
+                else:
+                    del self._memory[key]
+                    entry = None
+        if entry is not None:
+            self._count(task, "memory_hits")
+            return True, json.loads(entry[0])
+
+        try:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+        except sqlite3.Error:
+            row = None
+            self._count(task, "errors")
+        if row is None:
+            self._count(task, "misses")
+            return False, None
+
+        self._remember(key, row[0], float(row[1]))
+        self._count(task, "disk_hits")
+        return True, json.loads(row[0])
+
+    def put(self, task: str, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        expires_at = now + ttl
+        data = json.dumps(value, ensure_ascii=False)
+        self._remember(key, data, expires_at)
+        try:
+            conn = self._conn
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, task, value, created_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (key, task, data, now, expires_at),
+            )
+            with self._lock:
+                self._writes += 1
+                purge = self._writes % _PURGE_EVERY == 0
+            if purge:
+                conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+        except sqlite3.Error:
+            # The memory tier still holds the value; the disk tier is best-effort.
+            self._count(task, "errors")
+            return
+        self._count(task, "stores")
+
+    def _remember(self, key: str, data: str, expires_at: float) -> None:
+        with self._lock:
+            self._memory[key] = (data, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        self._conn.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> dict:
+        with self._lock:
+            tasks = {task: dict(counters) for task, counters in self._stats.items()}
+            memory_entries = len(self._memory)
+        for counters in tasks.values():
+            hits = counters["memory_hits"] + counters["disk_hits"]
+            lookups = hits + counters["misses"]
+            counters["hit_ratio"] = round(hits / lookups, 4) if lookups else 0.0
+        try:
+            disk_entries = self._conn.execute(
+                "SELECT COUNT(*) FROM llm_cache WHERE expires_at > ?", (time.time(),)
+            ).fetchone()[0]
+        except sqlite3.Error:
+            disk_entries = None
+        return {
+            "enabled": settings.LLM_CACHE_ENABLED,
+            "memory_entries": memory_entries,
+            "disk_entries": disk_entries,
+            "tasks": tasks,
+        }
+
+
+cache = LLMCache(memory_entries=settings.LLM_CACHE_MEMORY_ENTRIES)
@@ -0,0 +1,183 @@
+"""
+LLM Rate Limiter
+================
+Adaptive concurrency limit for outbound LLM calls, used by the gateway in
+`llm.py` in place of a fixed global semaphore.
+
+- **AIMD**: every successful completion raises the limit by 1/limit (about
+  +1 per round trip at full load); a 429 halves it, never below
+  `LLM_MIN_CONCURRENCY` nor above `LLM_MAX_CONCURRENCY`.
+- **Rate-limit headers**: Groq reports the remaining request/token budget
+  (`x-ratelimit-remaining-*`, `x-ratelimit-reset-*`) and `retry-after` on
+  429s. An exhausted budget pauses new calls until the reported reset.
+- **Priorities**: waiters are served lowest priority value first, so
+  interactive endpoints (`INTERACTIVE`) go ahead of queued fan-out
+  evaluation work (`BATCH`).
+
+Retry policy (jittered exponential backoff) is exposed as `backoff_delay()`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import random
+import re
+import time
+from typing import List, Mapping, Optional, Tuple
+
+INTERACTIVE = 0
+BATCH = 10
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNIT_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Parse `retry-after` / Groq reset values ("7", "2.5s", "1m26.4s", "240ms") to seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _UNIT_SECONDS[unit] for amount, unit in parts)
+
+
+def _header_int(headers: Mapping[str, str], name: str) -> Optional[int]:
+    try:
+        return int(float(headers.get(name, "")))
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float, cap: float, retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff, never shorter than a server-sent `retry_after`."""
+    delay = random.uniform(0.0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, retry_after + random.uniform(0.0, base))
+    return delay
+
+
+class AdaptiveLimiter:
+    """Priority-ordered AIMD concurrency limiter (one per event loop)."""
+
+    def __init__(self, initial: int, minimum: int, maximum: int):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        self._last_decrease = 0.0
+
+        self.throttles = 0
+        self.pauses = 0
+        self.max_queue = 0
+
+    # ---- slots ----
+    def _has_capacity(self) -> bool:
+        return self.in_flight < int(self.limit) and time.monotonic() >= self.paused_until
+
+    async def acquire(self, priority: int = INTERACTIVE) -> None:
+        if not self._waiters and self._has_capacity():
+            self.in_flight += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self.max_queue = max(self.max_queue, len(self._waiters))
+        self._schedule_wakeup()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted a slot right as we were cancelled: hand it back.
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self.in_flight = max(0, self.in_flight - 1)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._waiters and self._has_capacity():
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():  # cancelled while queued
+                continue
+            self.in_flight += 1
+            future.set_result(None)
+        self._schedule_wakeup()
+
+    def _schedule_wakeup(self) -> None:
+        """While paused, make sure queued callers are woken once the pause ends."""
+        delay = self.paused_until - time.monotonic()
+        if not self._waiters or delay <= 0 or self._wakeup is not None:
+            return
+        loop = asyncio.get_running_loop()
+
+        def wake() -> None:
+            self._wakeup = None
+            self._dispatch()
+
+        self._wakeup = loop.call_later(delay, wake)
+
+    # ---- feedback ----
+    def on_success(self, headers: Optional[Mapping[str, str]] = None) -> None:
+        self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+        if headers is not None:
+            self._apply_headers(headers)
+        self._dispatch()
+
+    def on_throttle(self, retry_after: Optional[float] = None,
+                    headers: Optional[Mapping[str, str]] = None) -> None:
+        self.throttles += 1
+        now = time.monotonic()
+        # Halve at most once per second: a burst of 429s from one overload
+        # episode should not collapse the limit to the floor.
+        if now - self._last_decrease >= 1.0:
+            self.limit = max(float(self.minimum), self.limit / 2.0)
+            self._last_decrease = now
+        if retry_after:
+            self._pause(retry_after)
+        if headers is not None:
+            self._apply_headers(headers)
+
+    def _apply_headers(self, headers: Mapping[str, str]) -> None:
+        for budget in ("requests", "tokens"):
+            remaining = _header_int(headers, f"x-ratelimit-remaining-{budget}")
+            if remaining is not None and remaining <= 0:
+                reset = parse_duration(headers.get(f"x-ratelimit-reset-{budget}"))
+                if reset:
+                    self._pause(reset)
+
+    def _pause(self, seconds: float) -> None:
+        until = time.monotonic() + seconds
+        if until > self.paused_until:
+            self.paused_until = until
+            self.pauses += 1
+
+    # ---- metrics ----
+    def stats(self) -> dict:
+        queued = {}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                name = "interactive" if priority <= INTERACTIVE else "batch"
+                queued[name] = queued.get(name, 0) + 1
+        return {
+            "limit": round(self.limit, 2),
+            "min": self.minimum,
+            "max": self.maximum,
+            "in_flight": self.in_flight,
+            "queued": queued,
+            "max_queue": self.max_queue,
+            "throttles": self.throttles,
+            "pauses": self.pauses,
+            "paused_for_seconds": round(max(0.0, self.paused_until - time.monotonic()), 3),
+        }
@@ -0,0 +1,235 @@
+"""
+LLM Call Metrics
+================
+Per-completion instrumentation for the gateway in `llm.py`.
+
+Every chat completion attempt is recorded with its endpoint tag (task),
+model, outcome, wall time, time to first byte and token usage:
+
+- **outcome**: `ok`, `invalid_json` (the model answered but the output was
+  unusable), `rate_limited` (429), `timeout`, or `error` (5xx / connection).
+  Retried attempts are recorded individually.
+- **wall time** covers the HTTP round trip; **TTFB** is the time until the
+  response headers arrived (stamped by httpx event hooks on the pooled client).
+- **tokens** come from the response's `usage` block.
+
+Aggregates are kept in process as fixed-bucket histograms per (task, model)
+and exposed by `snapshot()` on `/metrics/llm`. With `LLM_DEBUG_HEADERS`
+enabled, `LLMDebugHeaderMiddleware` also returns the calls made while
+handling a request in an `X-LLM-Calls` response header.
+"""
+
+from __future__ import annotations
+
+import bisect
+import contextvars
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+OUTCOMES = ("ok", "invalid_json", "rate_limited", "timeout", "error")
+
+DEBUG_HEADER = "X-LLM-Calls"
+
+_LATENCY_BOUNDS_MS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000)
+_TOKEN_BOUNDS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+_STARTED = "vidyamitra.started"
+_TTFB_MS = "vidyamitra.ttfb_ms"
+
+
+class Histogram:
+    """Fixed-bucket histogram; quantiles are estimated as the bucket's upper bound."""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last bucket: above every bound
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return float(self.bounds[i]) if i < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.total, 1),
+            "avg": round(self.total / self.count, 1) if self.count else None,
+            "max": round(self.max, 1),
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": {
+                **{f"le_{b}": n for b, n in zip(self.bounds, self.counts)},
+                "inf": self.counts[-1],
+            },
+        }
+
+
+class _Series:
+    def __init__(self) -> None:
+        self.outcomes = {outcome: 0 for outcome in OUTCOMES}
+        self.latency_ms = Histogram(_LATENCY_BOUNDS_MS)
+        self.ttfb_ms = Histogram(_LATENCY_BOUNDS_MS)
+        self.prompt_tokens = Histogram(_TOKEN_BOUNDS)
+        self.completion_tokens = Histogram(_TOKEN_BOUNDS)
+
+
+_series: Dict[Tuple[str, str], _Series] = {}
+_lock = threading.Lock()
+
+# Calls made while handling the current request (set by the debug middleware).
+_request_calls: contextvars.ContextVar[Optional[List[dict]]] = contextvars.ContextVar(
+    "llm_request_calls", default=None
+)
+
+
+# ---------------------------------------------------------------------------
+# httpx event hooks (time to first byte)
+# ---------------------------------------------------------------------------
+async def stamp_request(request: httpx.Request) -> None:
+    request.extensions[_STARTED] = time.perf_counter()
+
+
+async def stamp_response(response: httpx.Response) -> None:
+    started = response.request.extensions.get(_STARTED)
+    if started is not None:
+        response.request.extensions[_TTFB_MS] = (time.perf_counter() - started) * 1000.0
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+class CallTimer:
+    """One completion attempt, from send to response (`received`) to outcome (`record`)."""
+
+    __slots__ = ("task", "model", "started", "duration_ms", "ttfb_ms", "prompt_tokens", "completion_tokens")
+
+    def __init__(self, task: str, model: str):
+        self.task = task
+        self.model = model
+        self.started = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.ttfb_ms: Optional[float] = None
+        self.prompt_tokens: Optional[int] = None
+        self.completion_tokens: Optional[int] = None
+
+    def received(self, http_request: Optional[httpx.Request] = None, usage: Any = None) -> None:
+        self.duration_ms = (time.perf_counter() - self.started) * 1000.0
+        if http_request is not None:
+            self.ttfb_ms = http_request.extensions.get(_TTFB_MS)
+        if usage is not None:
+            self.prompt_tokens = getattr(usage, "prompt_tokens", None)
+            self.completion_tokens = getattr(usage, "completion_tokens", None)
+
+
+def record(call: CallTimer, outcome: str) -> None:
+    if call.duration_ms is None:
+        call.received()
+    with _lock:
+        series = _series.get((call.task, call.model))
+        if series is None:
+            series = _series[(call.task, call.model)] = _Series()
+        series.outcomes[outcome] = series.outcomes.get(outcome, 0) + 1
+        series.latency_ms.observe(call.duration_ms)
+        if call.ttfb_ms is not None:
+            series.ttfb_ms.observe(call.ttfb_ms)
+        if call.prompt_tokens is not None:
+            series.prompt_tokens.observe(call.prompt_tokens)
+        if call.completion_tokens is not None:
+            series.completion_tokens.observe(call.completion_tokens)
+
+    calls = _request_calls.get()
+    if calls is not None:
+        calls.append({
+            "task": call.task,
+            "model": call.model,
+            "outcome": outcome,
+            "ms": call.duration_ms,
+            "ttfb_ms": call.ttfb_ms,
+            "prompt_tokens": call.prompt_tokens,
+            "completion_tokens": call.completion_tokens,
+        })
+
+
+def snapshot() -> Dict[str, Dict[str, dict]]:
+    """task -> model -> outcomes and histograms (latency/TTFB in ms, tokens per call)."""
+    result: Dict[str, Dict[str, dict]] = {}
+    with _lock:
+        for (task, model), series in sorted(_series.items()):
+            result.setdefault(task, {})[model] = {
+                "outcomes": dict(series.outcomes),
+                "latency_ms": series.latency_ms.snapshot(),
+                "ttfb_ms": series.ttfb_ms.snapshot(),
+                "prompt_tokens": series.prompt_tokens.snapshot(),
+                "completion_tokens": series.completion_tokens.snapshot(),
+            }
+    return result
+
+
+def reset() -> None:
+    with _lock:
+        _series.clear()
+
+
+# ---------------------------------------------------------------------------
+# Per-request debug header
+# ---------------------------------------------------------------------------
+def _format_calls(calls: List[dict]) -> str:
+    def num(value: Optional[float]) -> str:
+        return "-" if value is None else str(int(round(value)))
+
+    return ", ".join(
+        f"{c['task']};model={c['model']};outcome={c['outcome']};dur={num(c['ms'])};"
+        f"ttfb={num(c['ttfb_ms'])};pt={num(c['prompt_tokens'])};ct={num(c['completion_tokens'])}"
+        for c in calls
+    )
+
+
+class LLMDebugHeaderMiddleware:
+    """
+    ASGI middleware adding `X-LLM-Calls` to responses that made LLM calls:
+    one `task;model=..;outcome=..;dur=..;ttfb=..;pt=..;ct=..` entry per
+    completion attempt (durations in ms). Calls made after the response
+    headers were sent (streamed responses) are not included.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        calls: List[dict] = []
+        token = _request_calls.set(calls)
+
+        async def send_with_header(message: dict) -> None:
+            if message["type"] == "http.response.start" and calls:
+                headers = list(message.get("headers") or [])
+                headers.append((DEBUG_HEADER.lower().encode("latin-1"), _format_calls(calls).encode("latin-1", "replace")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_header)
+        finally:
+            _request_calls.reset(token)
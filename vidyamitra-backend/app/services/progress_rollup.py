@@ -0,0 +1,334 @@
+"""
+Progress Rollups
+================
+Per-user counts and running score sums behind `/progress/dashboard`, kept
+up to date as results are written instead of re-aggregated on every load.
+
+Two SQLite tables (`PROGRESS_ROLLUP_PATH`, shared by all workers):
+
+- `items` — one row per scored result: (user, kind, item id) -> score, for
+  the kinds `quiz` (a completed quiz's `score_percentage`), `interview` (a
+  completed session's dashboard score, out of 10, as a percentage) and
+  `job` (a saved job's `match_score`). Results without a score are not
+  stored, exactly as the dashboard ignores them;
+- `rollups` — one row per user: count and sum per kind.
+
+The routers call `rollups.record(user_id, kind, item_id, score)` after a
+successful Supabase write (quiz submit, interview evaluation/report, job
+save). Recording is idempotent: a result recorded again only moves the sum
+by the change in its score, and a score of None removes it.
+
+A user's row is built from Supabase the first time the dashboard asks for
+it (`rebuild()`, three queries) and rebuilt once older than
+`PROGRESS_ROLLUP_MAX_AGE_SECONDS`, which reconciles writes made outside
+this API; 0 rebuilds on every load (the old behaviour). Results recorded
+while a rebuild is running are kept over the rebuild's snapshot. To
+backfill every user at once (from vidyamitra-backend/):
+
+    python -m app.services.progress_rollup [--user-id USER_ID]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..core.config import settings
+from ..utils.storage import get_writable_temp_path
+from . import db
+
+DB_PATH = get_writable_temp_path("PROGRESS_ROLLUP_PATH", "vidyamitra_progress.db")
+
+KINDS = ("quiz", "interview", "job")
+
+# Rows fetched per Supabase request during a full rebuild.
+_PAGE_SIZE = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    user_id     TEXT NOT NULL,
+    kind        TEXT NOT NULL,
+    item_id     TEXT NOT NULL,
+    score       REAL NOT NULL,
+    recorded_at REAL NOT NULL,
+    PRIMARY KEY (user_id, kind, item_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS rollups (
+    user_id         TEXT PRIMARY KEY,
+    quiz_count      INTEGER NOT NULL DEFAULT 0,
+    quiz_sum        REAL NOT NULL DEFAULT 0,
+    interview_count INTEGER NOT NULL DEFAULT 0,
+    interview_sum   REAL NOT NULL DEFAULT 0,
+    job_count       INTEGER NOT NULL DEFAULT 0,
+    job_sum         REAL NOT NULL DEFAULT 0,
+    built_at        REAL NOT NULL,
+    updated_at      REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+# (kind, item id, score)
+Item = Tuple[str, str, float]
+
+
+# ---------------------------------------------------------------------------
+# Scores, as the dashboard reads them from each table
+# ---------------------------------------------------------------------------
+def interview_score(evaluation_data: Optional[dict]) -> Optional[float]:
+    """The dashboard score of an interview evaluation, out of 10 -> percent (unscored or 0 -> None)."""
+    summary = (evaluation_data or {}).get("dashboard_summary") or {}
+    score = summary.get("overall_score_out_of_10")
+    return score * 10 if score else None
+
+
+def _items(quizzes: Iterable[dict], interviews: Iterable[dict], jobs: Iterable[dict]) -> Dict[str, List[Item]]:
+    """Scored items per user from completed quizzes, completed interview sessions and saved jobs."""
+    items: Dict[str, List[Item]] = defaultdict(list)
+    for kind, rows, score_of in (
+        ("quiz", quizzes, lambda row: row.get("score_percentage")),
+        ("interview", interviews, lambda row: interview_score(row.get("evaluation_data"))),
+        ("job", jobs, lambda row: row.get("match_score")),
+    ):
+        for row in rows:
+            score = score_of(row)
+            if score is not None and row.get("user_id") is not None:
+                items[str(row["user_id"])].append((kind, str(row["id"]), float(score)))
+    return items
+
+
+# ---------------------------------------------------------------------------
+# Storage
+# ---------------------------------------------------------------------------
+class ProgressRollups:
+    def __init__(self, db_path: Path = DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {
+            "hits": 0, "misses": 0, "stale": 0, "rebuilds": 0, "rebuild_errors": 0,
+            "recorded": 0, "record_errors": 0,
+        }
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _count(self, field: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[field] += n
+
+    # ---- writes ----
+    def record(self, user_id: Any, kind: str, item_id: Any, score: Optional[float]) -> None:
+        """Set (or, with score None, remove) one scored result and move the user's sums by the change."""
+        if user_id is None or item_id is None or kind not in KINDS:
+            return
+        user_id, item_id = str(user_id), str(item_id)
+        conn = self._conn
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT score FROM items WHERE user_id = ? AND kind = ? AND item_id = ?",
+                    (user_id, kind, item_id),
+                ).fetchone()
+                old = row[0] if row else None
+                now = time.time()
+                if score is None:
+                    conn.execute(
+                        "DELETE FROM items WHERE user_id = ? AND kind = ? AND item_id = ?", (user_id, kind, item_id)
+                    )
+                    d_count, d_sum = (-1, -old) if old is not None else (0, 0.0)
+                else:
+                    score = float(score)
+                    conn.execute(
+                        "INSERT OR REPLACE INTO items (user_id, kind, item_id, score, recorded_at) VALUES (?, ?, ?, ?, ?)",
+                        (user_id, kind, item_id, score, now),
+                    )
+                    d_count, d_sum = (0, score - old) if old is not None else (1, score)
+                # Only a built rollup is adjusted; an unbuilt one is built from Supabase
+                # (which already holds this result) on the next dashboard load.
+                conn.execute(
+                    f"UPDATE rollups SET {kind}_count = {kind}_count + ?, {kind}_sum = {kind}_sum + ?, updated_at = ? "
+                    "WHERE user_id = ?",
+                    (d_count, d_sum, now, user_id),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            # The rollup is derived data: a failed update is repaired by the next rebuild.
+            self._count("record_errors")
+            print(f"Progress rollup update failed ({kind} {item_id}): {e}")
+            return
+        self._count("recorded")
+
+    def _store(self, user_items: Dict[str, List[Item]], users: Iterable[str], started_at: float) -> None:
+        """Replace the items of `users` with a Supabase snapshot taken after `started_at`, then re-sum them."""
+        conn = self._conn
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for user_id in users:
+                # Results recorded since the snapshot began are newer than the snapshot.
+                conn.execute("DELETE FROM items WHERE user_id = ? AND recorded_at < ?", (user_id, started_at))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO items (user_id, kind, item_id, score, recorded_at) VALUES (?, ?, ?, ?, ?)",
+                    [(user_id, kind, item_id, score, started_at) for kind, item_id, score in user_items.get(user_id, ())],
+                )
+                sums = {
+                    kind: (count, total)
+                    for kind, count, total in conn.execute(
+                        "SELECT kind, COUNT(*), SUM(score) FROM items WHERE user_id = ? GROUP BY kind", (user_id,)
+                    )
+                }
+                values = []
+                for kind in KINDS:
+                    count, total = sums.get(kind, (0, 0.0))
+                    values += [count, total or 0.0]
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO rollups (
+                        user_id, quiz_count, quiz_sum, interview_count, interview_sum, job_count, job_sum,
+                        built_at, updated_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (user_id, *values, now, now),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    # ---- rebuilds ----
+    async def rebuild(self, supabase: Any, user_id: str) -> dict:
+        """Rebuild one user's rollup from Supabase (three queries) and return it."""
+        started_at = time.time()
+        try:
+            quizzes = await db.execute(
+                supabase.table("quizzes").select("id, user_id, score_percentage")
+                .eq("user_id", user_id).eq("status", "completed")
+            )
+            interviews = await db.execute(
+                supabase.table("interview_sessions").select("id, user_id, evaluation_data")
+                .eq("user_id", user_id).eq("status", "completed")
+            )
+            jobs = await db.execute(supabase.table("saved_jobs").select("id, user_id, match_score").eq("user_id", user_id))
+            self._store(_items(quizzes.data, interviews.data, jobs.data), [str(user_id)], started_at)
+        except Exception:
+            self._count("rebuild_errors")
+            raise
+        self._count("rebuilds")
+        return self.get(user_id) or {}
+
+    async def rebuild_all(self, supabase: Any) -> int:
+        """Rebuild every user found in Supabase; returns the number of users."""
+        started_at = time.time()
+
+        async def fetch(table: str, columns: str, status: Optional[str] = None) -> List[dict]:
+            rows: List[dict] = []
+            while True:
+                query = supabase.table(table).select(columns)
+                if status:
+                    query = query.eq("status", status)
+                page = await db.execute(query.order("id").range(len(rows), len(rows) + _PAGE_SIZE - 1))
+                rows.extend(page.data)
+                if len(page.data) < _PAGE_SIZE:
+                    return rows
+
+        try:
+            quizzes = await fetch("quizzes", "id, user_id, score_percentage", "completed")
+            interviews = await fetch("interview_sessions", "id, user_id, evaluation_data", "completed")
+            jobs = await fetch("saved_jobs", "id, user_id, match_score")
+            user_items = _items(quizzes, interviews, jobs)
+            # Users with no scored results still get an (empty) rollup.
+            users = set(user_items)
+            for row in (*quizzes, *interviews, *jobs):
+                if row.get("user_id") is not None:
+                    users.add(str(row["user_id"]))
+            self._store(user_items, sorted(users), started_at)
+        except Exception:
+            self._count("rebuild_errors")
+            raise
+        self._count("rebuilds", len(users))
+        return len(users)
+
+    # ---- reads ----
+    def get(self, user_id: str) -> Optional[dict]:
+        """The user's rollup ({kind}_count, {kind}_sum, built_at, updated_at), or None if never built."""
+        cursor = self._conn.execute("SELECT * FROM rollups WHERE user_id = ?", (str(user_id),))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return dict(zip([col[0] for col in cursor.description], row))
+
+    async def load(self, supabase: Any, user_id: str) -> dict:
+        """The user's rollup, (re)built from Supabase when missing or older than the max age."""
+        max_age = settings.PROGRESS_ROLLUP_MAX_AGE_SECONDS
+        try:
+            rollup = self.get(user_id)
+        except sqlite3.Error:
+            rollup = None
+        if rollup is not None and max_age > 0 and time.time() - rollup["built_at"] <= max_age:
+            self._count("hits")
+            return rollup
+        self._count("misses" if rollup is None else "stale")
+        return await self.rebuild(supabase, user_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._stats)
+        try:
+            users = self._conn.execute("SELECT COUNT(*) FROM rollups").fetchone()[0]
+            items = dict(self._conn.execute("SELECT kind, COUNT(*) FROM items GROUP BY kind").fetchall())
+        except sqlite3.Error:
+            users, items = 0, {}
+        return {
+            "max_age_seconds": settings.PROGRESS_ROLLUP_MAX_AGE_SECONDS,
+            **counters,
+            "users": users,
+            "items": {kind: items.get(kind, 0) for kind in KINDS},
+        }
+
+
+rollups = ProgressRollups()
+
+
+# ---------------------------------------------------------------------------
+# Backfill command
+# ---------------------------------------------------------------------------
+async def _main(user_id: Optional[str]) -> None:
+    supabase = db.client()
+    if supabase is None:
+        raise SystemExit("SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY are not set.")
+    try:
+        if user_id:
+            rollup = await rollups.rebuild(supabase, user_id)
+            print({key: rollup[key] for key in rollup if key.endswith(("_count", "_sum"))})
+        else:
+            started = time.perf_counter()
+            users = await rollups.rebuild_all(supabase)
+            print(f"Rebuilt {users} progress rollups in {time.perf_counter() - started:.1f}s ({rollups.db_path})")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild progress rollups from Supabase.")
+    parser.add_argument("--user-id", help="rebuild one user only (default: every user)")
+    asyncio.run(_main(parser.parse_args().user_id))
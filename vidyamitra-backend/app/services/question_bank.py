@@ -0,0 +1,493 @@
+"""
+Question Bank
+=============
+Pre-generated interview questions, so common sessions start without waiting
+for a completion.
+
+Questions live in a SQLite table (`QUESTION_BANK_PATH`, shared by all
+workers) grouped into *pools* and indexed by (role, skill, difficulty,
+category):
+
+- a **role pool** (`Pool(role="software engineer")`) holds role-level
+  questions in every category — used by `/interview/start`;
+- a **skill pool** (`Pool(skill="python")`) holds `project-based` and
+  `technical` questions about one skill — used, with the general pool, by
+  `/interview/questions` for the skills in the resume digest;
+- the **general pool** (`Pool()`) holds `behavioral` questions.
+
+Banked questions are generic by construction (no company, project or
+resume-specific names), so they can be served to anyone. `assemble()` picks
+a session's questions from the bank, skipping questions the user has been
+served before (`served` table) and preferring the least-served ones. If any
+pool cannot supply its share, nothing is served and the caller generates the
+session as before (the miss path); either way pools below
+`QUESTION_BANK_POOL_SIZE` are refilled in the background, one
+`QUESTION_BANK_BATCH`-sized completion per pool.
+
+Skill pools are keyed by `normalize_skill()`, so "ReactJS", "React.js" and
+"react (hooks)" share one pool and free-text entries that are not a single
+skill open none. Refills are bounded: at most `QUESTION_BANK_MAX_REFILLS` run
+at once, and no pool is opened beyond `QUESTION_BANK_MAX_POOLS`; skipped
+refills are counted and the session is generated as usual.
+
+The bank is off by default (`QUESTION_BANK_ENABLED`): resume-based sessions
+served from it are built from generic per-skill questions, not questions
+written for the resume.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from ..core.config import settings
+from ..utils.storage import get_writable_temp_path
+from . import llm
+
+DB_PATH = get_writable_temp_path("QUESTION_BANK_PATH", "vidyamitra_question_bank.db")
+
+CATEGORIES = ("project-based", "technical", "behavioral")
+DEFAULT_DIFFICULTY = "intermediate"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id          TEXT PRIMARY KEY,
+    role        TEXT NOT NULL,
+    skill       TEXT NOT NULL,
+    difficulty  TEXT NOT NULL,
+    category    TEXT NOT NULL,
+    text        TEXT NOT NULL,
+    text_key    TEXT NOT NULL,
+    served      INTEGER NOT NULL DEFAULT 0,
+    created_at  REAL NOT NULL,
+    UNIQUE (role, skill, difficulty, text_key)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS questions_by_pool ON questions (role, skill, difficulty, category, served);
+
+CREATE TABLE IF NOT EXISTS served (
+    user_id     TEXT NOT NULL,
+    question_id TEXT NOT NULL,
+    served_at   REAL NOT NULL,
+    PRIMARY KEY (user_id, question_id)
+) WITHOUT ROWID;
+"""
+
+_CATEGORY_ALIASES = {
+    "project": "project-based",
+    "project based": "project-based",
+    "projects": "project-based",
+    "situational": "behavioral",
+    "behavioural": "behavioral",
+    "hr": "behavioral",
+}
+
+
+def normalize(value: Optional[str]) -> str:
+    """Pool key form of a role, skill or difficulty: case-folded, single-spaced."""
+    return " ".join(str(value or "").split()).casefold()
+
+
+# Spellings of one skill that should share a pool.
+_SKILL_ALIASES = {
+    "js": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "python3": "python",
+    "golang": "go",
+    "reactjs": "react",
+    "react.js": "react",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "angularjs": "angular",
+    "nodejs": "node.js",
+    "node": "node.js",
+    "postgres": "postgresql",
+    "k8s": "kubernetes",
+    "cpp": "c++",
+    "csharp": "c#",
+    "c sharp": "c#",
+    "sklearn": "scikit-learn",
+    "amazon web services": "aws",
+    "ml": "machine learning",
+}
+_MAX_SKILL_CHARS = 40
+_MAX_SKILL_WORDS = 4
+
+
+def normalize_skill(value: Optional[str]) -> str:
+    """
+    Pool key of a resume skill: normalized, without parentheticals or a
+    trailing version ("Python 3", "Angular v14"), aliases folded. Empty for
+    text that is not one short skill (lists, sentences).
+    """
+    skill = normalize(re.sub(r"\([^)]*\)", " ", str(value or "")))
+    skill = re.sub(r"\s+v?\d+(\.\d+)*(\.x)?$", "", skill).strip(" -:")
+    skill = _SKILL_ALIASES.get(skill, skill)
+    if len(skill) > _MAX_SKILL_CHARS or len(skill.split()) > _MAX_SKILL_WORDS or re.search(r"[,;|]", skill):
+        return ""
+    return skill
+
+
+def normalize_category(value: Optional[str]) -> str:
+    category = normalize(value).replace("_", " ")
+    category = _CATEGORY_ALIASES.get(category, category.replace(" ", "-"))
+    return category if category in CATEGORIES else "technical"
+
+
+def _text_key(text: str) -> str:
+    words = re.sub(r"[^\w\s]", " ", text.casefold()).split()
+    return hashlib.sha1(" ".join(words).encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class Pool:
+    role: str = ""
+    skill: str = ""
+    difficulty: str = DEFAULT_DIFFICULTY
+
+    @classmethod
+    def of(cls, role: str = "", skill: str = "", difficulty: Optional[str] = None) -> "Pool":
+        return cls(normalize(role), normalize_skill(skill), normalize(difficulty) or DEFAULT_DIFFICULTY)
+
+    @property
+    def categories(self) -> Tuple[str, ...]:
+        if self.role:
+            return CATEGORIES
+        if self.skill:
+            return ("project-based", "technical")
+        return ("behavioral",)
+
+    def describe(self) -> str:
+        return f"role={self.role or '-'} skill={self.skill or '-'} difficulty={self.difficulty}"
+
+
+# (pool, category, count) — one share of a session.
+Want = Tuple[Pool, str, int]
+
+
+# ---------------------------------------------------------------------------
+# Session plans
+# ---------------------------------------------------------------------------
+def _split(n: int, parts: int) -> List[int]:
+    return [n // parts + (1 if i < n % parts else 0) for i in range(parts)]
+
+
+def role_plan(role: str, n: int, difficulty: Optional[str] = None) -> List[Want]:
+    """Shares for a role-based session: technical first, then behavioral, then project-based."""
+    pool = Pool.of(role=role, difficulty=difficulty)
+    counts = _split(n, 3)
+    return [(pool, category, count) for category, count in zip(("technical", "behavioral", "project-based"), counts) if count]
+
+
+def resume_plan(skills: Sequence[str], n: int, difficulty: Optional[str] = None) -> List[Want]:
+    """
+    Shares for a resume-based session: project-based and technical questions
+    spread over the resume's top skills, behavioral ones from the general pool.
+    """
+    project, technical, behavioral = _split(n, 3)
+    keys = [key for key in dict.fromkeys(normalize_skill(s) for s in skills) if key]
+    skill_pools = [Pool.of(skill=key, difficulty=difficulty) for key in keys]
+    if not skill_pools:
+        return []
+    wants: Dict[Tuple[Pool, str], int] = {}
+    slots = ["project-based"] * project + ["technical"] * technical
+    for i, category in enumerate(slots):
+        key = (skill_pools[i % len(skill_pools)], category)
+        wants[key] = wants.get(key, 0) + 1
+    plan: List[Want] = [(pool, category, count) for (pool, category), count in wants.items()]
+    if behavioral:
+        plan.append((Pool.of(difficulty=difficulty), "behavioral", behavioral))
+    return plan
+
+
+# ---------------------------------------------------------------------------
+# Storage
+# ---------------------------------------------------------------------------
+class QuestionBank:
+    def __init__(self, db_path: Path = DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {
+            "hits": 0, "misses": 0, "served": 0, "refills": 0, "refill_errors": 0, "refills_skipped": 0, "added": 0,
+        }
+        self._refilling: Set[Pool] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _count(self, field: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[field] += n
+
+    def add(self, pool: Pool, questions: Sequence[dict]) -> int:
+        """Bank `questions` ({"text", "category"}) in `pool`; duplicates are skipped. Returns the number added."""
+        now = time.time()
+        rows = []
+        for q in questions:
+            text = " ".join(str(q.get("text") or "").split())
+            category = normalize_category(q.get("category"))
+            if len(text) < 10 or category not in pool.categories:
+                continue
+            rows.append((str(uuid.uuid4()), pool.role, pool.skill, pool.difficulty, category, text, _text_key(text), now))
+        if not rows:
+            return 0
+        conn = self._conn
+        before = conn.total_changes
+        conn.executemany(
+            """
+            INSERT OR IGNORE INTO questions (id, role, skill, difficulty, category, text, text_key, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        added = conn.total_changes - before
+        self._count("added", added)
+        return added
+
+    def pool_count(self) -> int:
+        row = self._conn.execute(
+            "SELECT COUNT(*) FROM (SELECT DISTINCT role, skill, difficulty FROM questions)"
+        ).fetchone()
+        return int(row[0])
+
+    def size(self, pool: Pool) -> int:
+        row = self._conn.execute(
+            "SELECT COUNT(*) FROM questions WHERE role = ? AND skill = ? AND difficulty = ?",
+            (pool.role, pool.skill, pool.difficulty),
+        ).fetchone()
+        return int(row[0])
+
+    def covers(self, wants: Sequence[Want]) -> bool:
+        """Whether the bank holds enough questions for every share (ignoring what users were served)."""
+        if not settings.QUESTION_BANK_ENABLED or not wants:
+            return False
+        try:
+            for pool, category, count in wants:
+                row = self._conn.execute(
+                    "SELECT COUNT(*) FROM questions WHERE role = ? AND skill = ? AND difficulty = ? AND category = ?",
+                    (pool.role, pool.skill, pool.difficulty, category),
+                ).fetchone()
+                if int(row[0]) < count:
+                    return False
+        except sqlite3.Error:
+            return False
+        return True
+
+    def pick(self, user_id: str, wants: Sequence[Want]) -> Tuple[List[dict], List[Pool]]:
+        """
+        Questions for each share the user has not been served, least-served
+        first. Returns (picked questions, pools that came up short); nothing
+        is marked as served.
+        """
+        picked: List[dict] = []
+        short: List[Pool] = []
+        seen_keys: Set[str] = set()
+        for pool, category, count in wants:
+            rows = self._conn.execute(
+                """
+                SELECT q.id, q.text, q.category, q.text_key FROM questions AS q
+                WHERE q.role = ? AND q.skill = ? AND q.difficulty = ? AND q.category = ?
+                  AND NOT EXISTS (SELECT 1 FROM served AS s WHERE s.user_id = ? AND s.question_id = q.id)
+                ORDER BY q.served, random()
+                LIMIT ?
+                """,
+                (pool.role, pool.skill, pool.difficulty, category, str(user_id), count * 2),
+            ).fetchall()
+            taken = 0
+            for question_id, text, row_category, key in rows:
+                if key in seen_keys:
+                    continue
+                seen_keys.add(key)
+                picked.append({"bank_id": question_id, "text": text, "category": row_category,
+                               "skill": pool.skill or None})
+                taken += 1
+                if taken == count:
+                    break
+            if taken < count and pool not in short:
+                short.append(pool)
+        return picked, short
+
+    def mark_served(self, user_id: str, question_ids: Sequence[str]) -> None:
+        if not question_ids:
+            return
+        now = time.time()
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT OR IGNORE INTO served (user_id, question_id, served_at) VALUES (?, ?, ?)",
+                [(str(user_id), qid, now) for qid in question_ids],
+            )
+            conn.executemany("UPDATE questions SET served = served + 1 WHERE id = ?", [(qid,) for qid in question_ids])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._count("served", len(question_ids))
+
+    # ---- sessions ----
+    def assemble(self, user_id: str, wants: Sequence[Want]) -> Optional[List[dict]]:
+        """
+        The session's questions from the bank (marked as served to `user_id`),
+        or None on a miss. Pools that are short — or smaller than
+        `QUESTION_BANK_POOL_SIZE` — are refilled in the background either way.
+        """
+        if not settings.QUESTION_BANK_ENABLED or not wants:
+            return None
+        try:
+            picked, short = self.pick(user_id, wants)
+        except sqlite3.Error:
+            self._count("misses")
+            return None
+        pools = list(dict.fromkeys(pool for pool, _, _ in wants))
+        self.schedule_refill([p for p in pools if p in short or self.size(p) < settings.QUESTION_BANK_POOL_SIZE])
+        if short:
+            self._count("misses")
+            return None
+        self.mark_served(user_id, [q["bank_id"] for q in picked])
+        self._count("hits")
+        return picked
+
+    # ---- refill ----
+    def schedule_refill(self, pools: Sequence[Pool]) -> None:
+        """
+        Start one background generation per pool that is not already
+        refilling, within `QUESTION_BANK_MAX_REFILLS` running at once and
+        without opening pools beyond `QUESTION_BANK_MAX_POOLS`.
+        """
+        if not llm.is_configured():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        open_pools: Optional[int] = None
+        for pool in pools:
+            if pool in self._refilling:
+                continue
+            if len(self._refilling) >= max(1, settings.QUESTION_BANK_MAX_REFILLS):
+                self._count("refills_skipped")
+                continue
+            try:
+                if self.size(pool) == 0:
+                    if open_pools is None:
+                        # Pools being filled for the first time are not in the table yet.
+                        open_pools = self.pool_count() + len(self._refilling)
+                    if open_pools >= settings.QUESTION_BANK_MAX_POOLS:
+                        self._count("refills_skipped")
+                        continue
+                    open_pools += 1
+            except sqlite3.Error:
+                continue
+            self._refilling.add(pool)
+            task = loop.create_task(self._refill(pool))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _refill(self, pool: Pool) -> None:
+        try:
+            questions = await generate(pool, settings.QUESTION_BANK_BATCH)
+            self.add(pool, questions)
+            self._count("refills")
+        except Exception as e:
+            self._count("refill_errors")
+            print(f"Question bank refill failed ({pool.describe()}): {e}")
+        finally:
+            self._refilling.discard(pool)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._stats)
+        try:
+            rows = self._conn.execute(
+                """
+                SELECT role, skill, difficulty, COUNT(*), SUM(served) FROM questions
+                GROUP BY role, skill, difficulty ORDER BY COUNT(*) DESC LIMIT 50
+                """
+            ).fetchall()
+        except sqlite3.Error:
+            rows = []
+        return {
+            "enabled": settings.QUESTION_BANK_ENABLED,
+            **counters,
+            "refilling": len(self._refilling),
+            "pools": [
+                {"role": r or None, "skill": s or None, "difficulty": d, "questions": n, "served": int(served or 0)}
+                for r, s, d, n, served in rows
+            ],
+        }
+
+
+# ---------------------------------------------------------------------------
+# Generation
+# ---------------------------------------------------------------------------
+class BankQuestionOutput(llm.LLMOutput):
+    text: str
+    category: str = "technical"
+
+
+class BankBatchOutput(llm.LLMOutput):
+    questions: llm.valid_items(BankQuestionOutput) = []
+
+
+async def generate(pool: Pool, count: int) -> List[dict]:
+    """Generate `count` generic questions for `pool` (categories spread evenly over the pool's)."""
+    if pool.role:
+        subject = f"a '{pool.role}' position"
+    elif pool.skill:
+        subject = f"a candidate whose resume lists '{pool.skill}'; every question must be about {pool.skill}"
+    else:
+        subject = "a candidate for a software or technology role (behavioral questions only)"
+    categories = pool.categories
+    mix = ", ".join(f"{n} {c}" for c, n in zip(categories, _split(count, len(categories))))
+
+    prompt = f"""
+Generate {count} interview questions at {pool.difficulty} level for {subject}.
+Category mix: {mix}.
+
+Rules:
+- Every question must stand on its own for ANY candidate: never name a specific company,
+  project, product or person.
+- project-based questions ask the candidate to walk through their own work
+  (e.g. "Walk me through a project where you used X...").
+- Questions must be practical, interview-realistic and distinct from each other.
+
+Return strictly valid JSON:
+{{
+  "questions": [
+    {{"text": "Question text...", "category": "{'" | "'.join(categories)}"}}
+  ]
+}}
+"""
+    data = await llm.complete_json("question_bank.refill", [
+        {
+            "role": "system",
+            "content": "You are a precise, JSON-outputting interview designer AI. Output ONLY raw JSON. No markdown, no formatting, no conversational text.",
+        },
+        {"role": "user", "content": prompt},
+    ], schema=BankBatchOutput)
+    return data.get("questions", [])
+
+
+bank = QuestionBank()
@@ -0,0 +1,190 @@
+"""
+Resume Digest
+=============
+Compact, token-bounded view of a parsed resume for use in prompts.
+
+`/resume/parse` returns it as `digest` next to the structured resume, the
+interview pipeline stores it on the session, and every prompt builder that
+needs resume context (interview questions, resume quizzes, answer
+evaluation, report summary) uses it instead of the full `resume_data` JSON,
+so prompt size stays bounded however long the resume is.
+
+- skills are de-duplicated case-insensitively, in resume order;
+- projects and experience are reduced to short one-line summaries;
+- the digest is shrunk step by step until its estimated size fits
+  `RESUME_DIGEST_TOKEN_BUDGET`.
+
+Token counts are estimated at ~4 characters per token, which is close enough
+for budgeting without a tokenizer dependency.
+
+A digest records a hash of the resume fields it was built from (`source`).
+A digest that arrives attached to `resume_data` is only reused when that hash
+matches the fields sent with it, so an edited resume or a hand-made digest
+never stands in for the actual resume.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+
+from ..core.config import settings
+
+DIGEST_VERSION = 1
+
+# Shrink steps, tried in order until the digest fits the budget:
+# (skills, projects, experience, education, summary chars per item)
+_LEVELS = (
+    (40, 5, 5, 3, 240),
+    (30, 4, 4, 2, 160),
+    (20, 3, 3, 2, 100),
+    (15, 2, 2, 1, 60),
+    (10, 1, 1, 1, 0),
+)
+
+# Keys that describe the digest rather than the candidate; never sent to the model.
+_META_KEYS = ("version", "source", "token_estimate")
+
+# resume_data fields a digest is built from.
+_SOURCE_KEYS = ("skills", "projects", "experience", "education", "summary")
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+def _clip(value: Any, max_chars: int) -> str:
+    text = " ".join(str(value or "").split())
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars].rsplit(" ", 1)[0] or text[:max_chars]
+    return cut + "..."
+
+
+def _as_list(value: Any) -> list:
+    return value if isinstance(value, list) else []
+
+
+def _skills(resume_data: dict, limit: int) -> List[str]:
+    seen = set()
+    skills = []
+    for raw in _as_list(resume_data.get("skills")):
+        name = raw.get("name") if isinstance(raw, dict) else raw
+        name = _clip(name, 40)
+        key = name.casefold()
+        if not name or key in seen:
+            continue
+        seen.add(key)
+        skills.append(name)
+        if len(skills) >= limit:
+            break
+    return skills
+
+
+def _projects(resume_data: dict, limit: int, chars: int) -> List[dict]:
+    projects = []
+    for raw in _as_list(resume_data.get("projects"))[:limit]:
+        if isinstance(raw, str):
+            raw = {"name": raw}
+        if not isinstance(raw, dict):
+            continue
+        entry: Dict[str, Any] = {"name": _clip(raw.get("name") or raw.get("title"), 80)}
+        tech = [_clip(t, 30) for t in _as_list(raw.get("technologies")) if t][:6]
+        if tech:
+            entry["tech"] = tech
+        if chars:
+            summary = _clip(raw.get("description"), chars)
+            if summary:
+                entry["summary"] = summary
+        projects.append(entry)
+    return projects
+
+
+def _experience(resume_data: dict, limit: int, chars: int) -> List[dict]:
+    experience = []
+    for raw in _as_list(resume_data.get("experience"))[:limit]:
+        if isinstance(raw, str):
+            raw = {"title": raw}
+        if not isinstance(raw, dict):
+            continue
+        entry = {
+            key: _clip(raw.get(key), 60)
+            for key in ("title", "company", "duration")
+            if raw.get(key)
+        }
+        if chars:
+            summary = _clip(raw.get("description"), chars)
+            if summary:
+                entry["summary"] = summary
+        if entry:
+            experience.append(entry)
+    return experience
+
+
+def _education(resume_data: dict, limit: int) -> List[str]:
+    education = []
+    for raw in _as_list(resume_data.get("education"))[:limit]:
+        if isinstance(raw, dict):
+            line = ", ".join(_clip(raw.get(k), 60) for k in ("degree", "institution") if raw.get(k))
+            if raw.get("year"):
+                line += f" ({_clip(raw.get('year'), 20)})"
+        else:
+            line = _clip(raw, 100)
+        if line:
+            education.append(line)
+    return education
+
+
+def prompt_text(digest: dict) -> str:
+    """The digest as compact JSON for a prompt (without bookkeeping keys)."""
+    body = {k: v for k, v in digest.items() if k not in _META_KEYS and v}
+    return json.dumps(body, ensure_ascii=False, separators=(",", ":"))
+
+
+def source_hash(resume_data: Optional[dict]) -> str:
+    """Hash of the resume fields a digest is built from."""
+    resume_data = resume_data if isinstance(resume_data, dict) else {}
+    source = {key: resume_data.get(key) for key in _SOURCE_KEYS}
+    raw = json.dumps(source, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def build_digest(resume_data: Optional[dict], token_budget: Optional[int] = None) -> dict:
+    """Build the digest of a structured resume (skills/projects/experience/education/summary)."""
+    resume_data = resume_data if isinstance(resume_data, dict) else {}
+    budget = token_budget or settings.RESUME_DIGEST_TOKEN_BUDGET
+    source = source_hash(resume_data)
+
+    digest: dict = {}
+    for skills, projects, experience, education, chars in _LEVELS:
+        digest = {
+            "version": DIGEST_VERSION,
+            "source": source,
+            "skills": _skills(resume_data, skills),
+            "projects": _projects(resume_data, projects, chars),
+            "experience": _experience(resume_data, experience, chars),
+            "education": _education(resume_data, education),
+            "summary": _clip(resume_data.get("summary"), chars * 2) if chars else "",
+        }
+        digest["token_estimate"] = estimate_tokens(prompt_text(digest))
+        if digest["token_estimate"] <= budget:
+            break
+    return digest
+
+
+def get_digest(resume_data: Optional[dict]) -> dict:
+    """
+    Digest for `resume_data`: the one `/resume/parse` attached (`resume_data["digest"]`)
+    when it is current, within budget and built from these very fields,
+    otherwise a freshly built one.
+    """
+    attached = resume_data.get("digest") if isinstance(resume_data, dict) else None
+    if (
+        isinstance(attached, dict)
+        and attached.get("version") == DIGEST_VERSION
+        and attached.get("source") == source_hash(resume_data)
+        and estimate_tokens(prompt_text(attached)) <= settings.RESUME_DIGEST_TOKEN_BUDGET
+    ):
+        return attached
+    return build_digest(resume_data)
@@ -0,0 +1,92 @@
+"""
+Session Artifacts
+=================
+Large per-session payloads (transcripts, filler lists, eye-contact edges,
+timelines, per-question metrics) are kept out of the session record and
+written as JSON files next to the session's media:
+
+    <INTERVIEW_MEDIA_PATH>/<session_id>/artifacts/<name>.json
+
+The session record only holds a small reference:
+
+    { "artifact": "transcript", "path": "<session_id>/artifacts/transcript.json", "bytes": 5123 }
+
+so loading a session stays cheap no matter how much analysis it carries, and
+an artifact is only parsed by the endpoint that actually needs it. A
+reference may also point at one key of an artifact (`"key": "timeline"`), so
+a value that is part of a bigger artifact is stored once and still resolves
+to exactly that value.
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+from pathlib import Path
+from typing import Any, Dict
+
+from ..utils.storage import atomic_write_bytes, get_writable_temp_path
+
+MEDIA_DIR = get_writable_temp_path("INTERVIEW_MEDIA_PATH", "vidyamitra_interview_media")
+_ARTIFACTS_SUBDIR = "artifacts"
+
+
+def _artifact_path(session_id: str, name: str) -> Path:
+    return MEDIA_DIR / session_id / _ARTIFACTS_SUBDIR / f"{name}.json"
+
+
+def is_artifact_ref(value: Any) -> bool:
+    return isinstance(value, dict) and "artifact" in value and "path" in value
+
+
+def save_artifact(session_id: str, name: str, data: Any) -> dict:
+    """Write `data` as a session artifact and return the reference to store."""
+    path = _artifact_path(session_id, name)
+    payload = json.dumps(data, ensure_ascii=False)
+    atomic_write_bytes(path, payload)
+    return {
+        "artifact": name,
+        "path": str(path.relative_to(MEDIA_DIR)),
+        "bytes": len(payload.encode("utf-8")),
+    }
+
+
+def sub_ref(ref: dict, key: str) -> dict:
+    """A reference to `key` of the (dict) artifact behind `ref`."""
+    return {**ref, "key": key}
+
+
+def load_artifact(ref: dict, default: Any = None) -> Any:
+    """Load the payload behind an artifact reference (`default` if it is gone)."""
+    try:
+        data = json.loads((MEDIA_DIR / ref["path"]).read_text(encoding="utf-8"))
+        return data[ref["key"]] if "key" in ref else data
+    except Exception:
+        return default
+
+
+def save_artifacts(session_id: str, items: Dict[str, Any]) -> Dict[str, dict]:
+    return {name: save_artifact(session_id, name, data) for name, data in items.items()}
+
+
+def resolve(container: dict, key: str, default: Any = None) -> Any:
+    """
+    Read `key` from a slim record, following its artifact reference if needed.
+
+    Checks `container[key]` first (inline values from older sessions), then
+    `container["artifacts"][key]`.
+    """
+    value = container.get(key)
+    if value is not None and not is_artifact_ref(value):
+        return value
+    ref = value if is_artifact_ref(value) else (container.get("artifacts") or {}).get(key)
+    if not is_artifact_ref(ref):
+        return default
+    return load_artifact(ref, default)
+
+
+def delete_session_files(session_id: str) -> None:
+    """Delete everything kept on disk for a session: uploaded media and artifacts."""
+    if not session_id or Path(session_id).name != session_id:
+        return  # never follow a path out of MEDIA_DIR
+    shutil.rmtree(MEDIA_DIR / session_id, ignore_errors=True)
@@ -0,0 +1,328 @@
+"""
+Session Cache
+=============
+Process-local cache in front of a `SessionStore`.
+
+Two modes:
+
+- **write-behind** (single worker): reads are served from memory once a
+  session has been seen; writes only mark the entry dirty. A background
+  thread flushes dirty entries to the store in a single transaction every
+  `flush_interval` seconds, and `close()` performs a final flush at shutdown.
+- **write-through** (several workers sharing the store): writes go straight
+  to the store as version-checked compare-and-set operations, and a cached
+  read is only served after a cheap version lookup confirms no other worker
+  changed the session.
+
+Reads return a private copy of the cached session and `put()` caches a copy
+of what it is given, so callers may mutate what they read: nothing reaches
+the cache (or the flusher) until a `put()` passes its version check.
+"""
+
+from __future__ import annotations
+
+import atexit
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .session_store import SessionStore, VersionConflict
+
+
+class CachedSessionStore:
+    """Cache with the same get/put/delete surface as `SessionStore`."""
+
+    def __init__(
+        self,
+        store: SessionStore,
+        flush_interval: float = 2.0,
+        max_entries: int = 1024,
+        write_behind: bool = True,
+    ):
+        self.store = store
+        self.flush_interval = flush_interval
+        self.max_entries = max_entries
+        self.write_behind = write_behind
+
+        # key -> (payload, version as last read from / written to the store)
+        self._entries: "OrderedDict[str, Tuple[dict, int]]" = OrderedDict()
+        self._dirty: set[str] = set()
+        self._deleted: set[str] = set()
+        # Keys read from memory since the last flush; their `last_access` is
+        # refreshed in the store so eviction sees them as in use.
+        self._accessed: set[str] = set()
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Counters exposed through stats().
+        self.hits = 0
+        self.misses = 0
+        self.stale_reads = 0
+        self.conflicts = 0
+        self.flushes = 0
+        self.flushed_entries = 0
+        self.flush_errors = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    # ---- reads ----
+    def get(self, key: str) -> Optional[dict]:
+        found = self.get_versioned(key)
+        return found[0] if found else None
+
+    def get_versioned(self, key: str) -> Optional[Tuple[dict, int]]:
+        found = self._get_cached(key)
+        if found is None:
+            return None
+        return copy.deepcopy(found[0]), found[1]
+
+    def _get_cached(self, key: str) -> Optional[Tuple[dict, int]]:
+        """The cached (payload, version) itself, loading it on a miss; callers must not mutate it."""
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and self.write_behind:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                self._accessed.add(key)
+                return cached
+            if key in self._deleted:
+                self.hits += 1
+                return None
+
+        if cached is not None:
+            # Write-through: another worker may have written since we cached it.
+            if self.store.version_of(key) == cached[1]:
+                with self._lock:
+                    self.hits += 1
+                    self._accessed.add(key)
+                self._ensure_flusher()
+                return cached
+            with self._lock:
+                self.stale_reads += 1
+
+        with self._lock:
+            self.misses += 1
+        found = self.store.get_versioned(key)
+        with self._lock:
+            if found is None:
+                self._entries.pop(key, None)
+                return None
+            if self.write_behind and key in self._entries:
+                # A concurrent put() wins over what we just read from disk.
+                return self._entries[key]
+            self._entries[key] = found
+            self._entries.move_to_end(key)
+            self._evict_clean()
+        return found
+
+    def __contains__(self, key: str) -> bool:
+        return self._get_cached(key) is not None
+
+    # ---- writes ----
+    def put(self, key: str, value: dict, expected_version: Optional[int] = None) -> int:
+        """
+        Store `value` under `key` and return its new version.
+
+        With `expected_version`, raises `VersionConflict` if the session moved
+        on since it was read (checked against the store in write-through mode,
+        against this process's cache in write-behind mode).
+        """
+        if not self.write_behind:
+            try:
+                version = self.store.put(key, value, expected_version=expected_version)
+            except VersionConflict:
+                with self._lock:
+                    self.conflicts += 1
+                    self._entries.pop(key, None)
+                raise
+            with self._lock:
+                self._entries[key] = (copy.deepcopy(value), version)
+                self._entries.move_to_end(key)
+                self._evict_clean()
+            return version
+
+        current = self._entries.get(key)
+        if current is None and expected_version:
+            # Evicted since it was read; the store still has the flushed version.
+            current = self._get_cached(key)
+        with self._lock:
+            current = self._entries.get(key, current)
+            current_version = current[1] if current else 0
+            if expected_version is not None and expected_version != current_version:
+                self.conflicts += 1
+                raise VersionConflict(self.store.name, key)
+            version = current_version + 1
+            self._entries[key] = (copy.deepcopy(value), version)
+            self._entries.move_to_end(key)
+            self._dirty.add(key)
+            self._deleted.discard(key)
+            self._evict_clean()
+        self._ensure_flusher()
+        return version
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._dirty.discard(key)
+            if self.write_behind:
+                self._deleted.add(key)
+        if self.write_behind:
+            self._ensure_flusher()
+        else:
+            self.store.delete(key)
+
+    def discard(self, keys: Iterable[str]) -> None:
+        """Forget `keys` without writing anything (they were evicted from the store)."""
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+                self._dirty.discard(key)
+                self._deleted.discard(key)
+                self._accessed.discard(key)
+
+    def _evict_clean(self) -> None:
+        """Drop least-recently-used clean entries beyond `max_entries` (lock held)."""
+        if len(self._entries) <= self.max_entries:
+            return
+        for key in list(self._entries.keys()):
+            if len(self._entries) <= self.max_entries:
+                break
+            if key not in self._dirty:
+                del self._entries[key]
+
+    # ---- flushing ----
+    def flush(self) -> int:
+        """Write all dirty entries to the store. Returns the number written."""
+        with self._flush_lock:
+            with self._lock:
+                dirty = {k: self._entries[k][0] for k in self._dirty if k in self._entries}
+                versions = {k: self._entries[k][1] for k in dirty}
+                deleted = list(self._deleted)
+                # Written entries get a fresh last_access anyway.
+                accessed = [k for k in self._accessed if k not in dirty and k in self._entries]
+                self._dirty.clear()
+                self._deleted.clear()
+                self._accessed.clear()
+            if accessed:
+                try:
+                    self.store.touch(accessed)
+                except Exception:
+                    pass
+            if not dirty and not deleted:
+                return 0
+
+            started = time.perf_counter()
+            try:
+                # Each session is stored at its cache version, so the store and
+                # the cache agree after a flush: a handler that read version N
+                # can put() with N whether or not the entry was evicted since.
+                _, conflicts = self.store.put_many(dirty, versions=versions)
+                for key in deleted:
+                    self.store.delete(key)
+            except Exception:
+                # Keep the entries dirty so the next flush retries them.
+                with self._lock:
+                    self._dirty.update(k for k in dirty if k in self._entries)
+                    self._deleted.update(k for k in deleted if k not in self._entries)
+                self.flush_errors += 1
+                return 0
+
+            with self._lock:
+                self.conflicts += len(conflicts)
+
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            self.flushes += 1
+            self.flushed_entries += len(dirty) + len(deleted)
+            self.last_flush_ms = elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+            self._total_flush_ms += elapsed_ms
+            return len(dirty) + len(deleted)
+
+    def _ensure_flusher(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                name=f"session-cache-flush-{self.store.name}",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def close(self) -> None:
+        """Stop the background flusher and persist everything still dirty."""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=self.flush_interval + 5.0)
+        self.flush()
+
+    # ---- metrics ----
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "store": self.store.name,
+                "mode": "write-behind" if self.write_behind else "write-through",
+                "entries": len(self._entries),
+                "dirty": len(self._dirty) + len(self._deleted),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "stale_reads": self.stale_reads,
+                "version_conflicts": self.conflicts,
+                "flushes": self.flushes,
+                "flushed_entries": self.flushed_entries,
+                "flush_errors": self.flush_errors,
+                "last_flush_ms": round(self.last_flush_ms, 3),
+                "max_flush_ms": round(self.max_flush_ms, 3),
+                "avg_flush_ms": round(self._total_flush_ms / self.flushes, 3) if self.flushes else 0.0,
+            }
+
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+_caches: Dict[str, CachedSessionStore] = {}
+
+
+def get_cached_store(
+    store: SessionStore,
+    flush_interval: float = 2.0,
+    write_behind: bool = True,
+) -> CachedSessionStore:
+    """Return the shared cache for `store`."""
+    cache = _caches.get(store.name)
+    if cache is None:
+        cache = CachedSessionStore(store, flush_interval=flush_interval, write_behind=write_behind)
+        _caches[store.name] = cache
+    return cache
+
+
+def all_cache_stats() -> List[dict]:
+    return [cache.stats() for cache in _caches.values()]
+
+
+def close_all() -> None:
+    """Flush every cache; called on application shutdown."""
+    for cache in list(_caches.values()):
+        try:
+            cache.close()
+        except Exception:
+            pass
+
+
+# Safety net for shutdowns that bypass the ASGI lifespan (e.g. Ctrl+C under --reload).
+atexit.register(close_all)
@@ -0,0 +1,671 @@
+"""
+Session Store
+=============
+SQLite-backed key/value store for the session state the routers keep locally
+(quiz, interview, interview pipeline, roadmap).
+
+Every router gets a namespaced view (`SessionStore`) over one shared database
+file. Rows are keyed by (store, id) and hold the session payload in a JSON
+column, so a request only reads and writes the session it touches instead of
+parsing and rewriting a whole JSON file.
+
+The database runs in WAL mode: readers never block the writer, and concurrent
+writers — including other uvicorn worker processes sharing the same file — are
+serialized by SQLite instead of silently overwriting each other.
+
+Stores can register an `EvictionPolicy` (TTL on last access, an LRU entry
+cap and a byte budget). A background compactor enforces the policies
+periodically, so the database stays bounded under sustained traffic.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..core.config import settings
+from ..utils.storage import get_writable_temp_path
+
+DB_PATH = get_writable_temp_path("SESSION_STORE_PATH", "vidyamitra_sessions.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    store       TEXT NOT NULL,
+    id          TEXT NOT NULL,
+    user_id     TEXT,
+    status      TEXT,
+    data        TEXT NOT NULL CHECK (json_valid(data)),
+    created_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL,
+    version     INTEGER NOT NULL DEFAULT 1,
+    last_access REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (store, id)
+) WITHOUT ROWID;
+
+-- Per-user lookups (history endpoints) read only that user's sessions.
+CREATE INDEX IF NOT EXISTS sessions_by_user ON sessions (store, user_id, created_at);
+
+CREATE TABLE IF NOT EXISTS compaction_runs (
+    store       TEXT PRIMARY KEY,
+    ran_at      REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS migrations (
+    name        TEXT PRIMARY KEY,
+    applied_at  REAL NOT NULL
+);
+"""
+
+# Columns added after the first release, applied to existing databases on connect.
+_COLUMN_MIGRATIONS = {
+    "version": ["ALTER TABLE sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 1"],
+    "last_access": [
+        "ALTER TABLE sessions ADD COLUMN last_access REAL NOT NULL DEFAULT 0",
+        # Existing sessions count as last accessed when they were last written.
+        "UPDATE sessions SET last_access = updated_at",
+    ],
+}
+
+# Reads refresh `last_access` at most this often per session, so hot sessions
+# don't turn every lookup into a write.
+_TOUCH_INTERVAL_SECONDS = 60.0
+
+_UPSERT = """
+INSERT INTO sessions (store, id, user_id, status, data, created_at, updated_at, version, last_access)
+VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?)
+ON CONFLICT (store, id) DO UPDATE SET
+    user_id = excluded.user_id,
+    status = excluded.status,
+    data = excluded.data,
+    updated_at = excluded.updated_at,
+    last_access = excluded.last_access,
+    version = sessions.version + 1
+RETURNING version
+"""
+
+# Write-behind caches are the only writer of their store and keep the
+# versions themselves: the flushed payload gets exactly the cache's version.
+_UPSERT_AT_VERSION = """
+INSERT INTO sessions (store, id, user_id, status, data, created_at, updated_at, version, last_access)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (store, id) DO UPDATE SET
+    user_id = excluded.user_id,
+    status = excluded.status,
+    data = excluded.data,
+    updated_at = excluded.updated_at,
+    last_access = excluded.last_access,
+    version = excluded.version
+RETURNING version
+"""
+
+_CAS_UPDATE = """
+UPDATE sessions SET user_id = ?, status = ?, data = ?, updated_at = ?, last_access = ?,
+    version = version + 1
+WHERE store = ? AND id = ? AND version = ?
+RETURNING version
+"""
+
+_INSERT_NEW = """
+INSERT INTO sessions (store, id, user_id, status, data, created_at, updated_at, version, last_access)
+VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?)
+"""
+
+
+class VersionConflict(Exception):
+    """A session changed (or appeared) since the caller read it."""
+
+    def __init__(self, store: str, key: str):
+        super().__init__(f"Session '{key}' in store '{store}' was modified concurrently.")
+        self.store = store
+        self.key = key
+
+
+# ---------------------------------------------------------------------------
+# Connection handling
+# ---------------------------------------------------------------------------
+_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_ready: set[str] = set()
+
+
+def _connect(db_path: Path) -> sqlite3.Connection:
+    """Return this thread's connection to `db_path`, creating it on first use."""
+    conns: Dict[str, sqlite3.Connection] = getattr(_local, "conns", None) or {}
+    _local.conns = conns
+    key = str(db_path)
+    conn = conns.get(key)
+    if conn is not None:
+        return conn
+
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    # Autocommit mode; multi-statement writes open their own transactions.
+    # busy_timeout makes writers from other worker processes wait instead of failing.
+    conn = sqlite3.connect(key, isolation_level=None, timeout=10.0, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=10000")
+
+    with _schema_lock:
+        if key not in _schema_ready:
+            _ensure_schema(conn)
+            _schema_ready.add(key)
+
+    conns[key] = conn
+    return conn
+
+
+def _ensure_schema(conn: sqlite3.Connection) -> None:
+    # Several workers may start at once; the write lock serializes their DDL.
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for statement in _SCHEMA.split(";"):
+            if statement.strip():
+                conn.execute(statement)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+        for column, statements in _COLUMN_MIGRATIONS.items():
+            if column not in columns:
+                for ddl in statements:
+                    conn.execute(ddl)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _dumps(value: dict) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+@dataclass
+class EvictionPolicy:
+    """Bounds for one store; a field left as None is not enforced."""
+    ttl_seconds: Optional[float] = None     # evict sessions not accessed for this long
+    max_entries: Optional[int] = None       # keep at most N most-recently-used sessions
+    max_bytes: Optional[int] = None         # payload budget (bytes of JSON) for the store
+    # Called with the evicted ids after each compaction (e.g. to drop artifact files).
+    on_evict: Optional[Callable[[List[str]], None]] = None
+
+
+def default_policy(**overrides: Any) -> EvictionPolicy:
+    """The configured TTL and byte budget, with per-store `overrides`."""
+    fields: Dict[str, Any] = {
+        "ttl_seconds": settings.SESSION_TTL_HOURS * 3600.0,
+        "max_bytes": int(settings.SESSION_STORE_MAX_MB * 1024 * 1024),
+    }
+    fields.update(overrides)
+    return EvictionPolicy(**fields)
+
+
+# ---------------------------------------------------------------------------
+# Store
+# ---------------------------------------------------------------------------
+class SessionStore:
+    """
+    Per-key access to one namespace (e.g. "quiz") of the session database.
+
+    Every write bumps the row's `version`. Passing `expected_version` to
+    `put()`/`delete()` turns the write into a compare-and-set that raises
+    `VersionConflict` if another request (or worker process) got there first;
+    `expected_version=0` means "create, must not exist yet".
+    """
+
+    def __init__(self, name: str, db_path: Path = DB_PATH):
+        self.name = name
+        self.db_path = db_path
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        return _connect(self.db_path)
+
+    # ---- reads ----
+    def get(self, key: str) -> Optional[dict]:
+        found = self.get_versioned(key)
+        return found[0] if found else None
+
+    def get_versioned(self, key: str) -> Optional[Tuple[dict, int]]:
+        row = self._conn.execute(
+            "SELECT data, version, last_access FROM sessions WHERE store = ? AND id = ?",
+            (self.name, key),
+        ).fetchone()
+        if row is None:
+            return None
+        if time.time() - float(row[2]) > _TOUCH_INTERVAL_SECONDS:
+            self.touch([key])
+        return json.loads(row[0]), int(row[1])
+
+    def version_of(self, key: str) -> Optional[int]:
+        """Current version of `key` without loading its payload."""
+        row = self._conn.execute(
+            "SELECT version FROM sessions WHERE store = ? AND id = ?",
+            (self.name, key),
+        ).fetchone()
+        return int(row[0]) if row else None
+
+    def __contains__(self, key: str) -> bool:
+        return self.version_of(key) is not None
+
+    def __len__(self) -> int:
+        row = self._conn.execute(
+            "SELECT COUNT(*) FROM sessions WHERE store = ?", (self.name,)
+        ).fetchone()
+        return int(row[0])
+
+    def values(self) -> Iterator[dict]:
+        cursor = self._conn.execute(
+            "SELECT data FROM sessions WHERE store = ? ORDER BY created_at",
+            (self.name,),
+        )
+        for (data,) in cursor:
+            yield json.loads(data)
+
+    def for_user(self, user_id: str) -> List[dict]:
+        """The user's sessions, newest first (served from the user_id index)."""
+        rows = self._conn.execute(
+            "SELECT data FROM sessions WHERE store = ? AND user_id = ? ORDER BY created_at DESC",
+            (self.name, str(user_id)),
+        ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    # ---- writes ----
+    def touch(self, keys: Iterable[str]) -> None:
+        """Record an access to `keys` (used by the LRU/TTL eviction policies)."""
+        keys = list(keys)
+        if not keys:
+            return
+        now = time.time()
+        self._conn.executemany(
+            "UPDATE sessions SET last_access = ? WHERE store = ? AND id = ?",
+            [(now, self.name, key) for key in keys],
+        )
+
+    def put(self, key: str, value: dict, expected_version: Optional[int] = None) -> int:
+        """Insert or replace the session stored under `key`. Returns its new version."""
+        return self._write(self._conn, key, value, expected_version)
+
+    def _write(
+        self,
+        conn: sqlite3.Connection,
+        key: str,
+        value: dict,
+        expected_version: Optional[int],
+    ) -> int:
+        now = time.time()
+        user_id, status, data = _user_id_of(value), value.get("status"), _dumps(value)
+        if expected_version is None:
+            row = conn.execute(
+                _UPSERT, (self.name, key, user_id, status, data, now, now, now)
+            ).fetchone()
+            return int(row[0])
+        if expected_version == 0:
+            try:
+                conn.execute(_INSERT_NEW, (self.name, key, user_id, status, data, now, now, now))
+            except sqlite3.IntegrityError:
+                raise VersionConflict(self.name, key)
+            return 1
+        row = conn.execute(
+            _CAS_UPDATE, (user_id, status, data, now, now, self.name, key, expected_version)
+        ).fetchone()
+        if row is None:
+            raise VersionConflict(self.name, key)
+        return int(row[0])
+
+    def put_many(
+        self,
+        items: Dict[str, dict],
+        expected_versions: Optional[Dict[str, int]] = None,
+        versions: Optional[Dict[str, int]] = None,
+    ) -> Tuple[Dict[str, int], List[str]]:
+        """
+        Write several sessions in one transaction.
+
+        Returns ({key: new_version}, [keys that hit a VersionConflict]);
+        conflicting keys are skipped without aborting the rest. Keys in
+        `versions` are stored with exactly that version, unchecked.
+        """
+        set_versions = versions or {}
+        written: Dict[str, int] = {}
+        conflicts: List[str] = []
+        if not items:
+            return written, conflicts
+        expected_versions = expected_versions or {}
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for key, value in items.items():
+                if key in set_versions:
+                    now = time.time()
+                    row = conn.execute(_UPSERT_AT_VERSION, (
+                        self.name, key, _user_id_of(value), value.get("status"), _dumps(value),
+                        now, now, int(set_versions[key]), now,
+                    )).fetchone()
+                    written[key] = int(row[0])
+                    continue
+                try:
+                    written[key] = self._write(conn, key, value, expected_versions.get(key))
+                except VersionConflict:
+                    conflicts.append(key)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return written, conflicts
+
+    def update(self, key: str, fn: Callable[[dict], Optional[dict]]) -> Optional[dict]:
+        """
+        Atomically read-modify-write one session.
+
+        `fn` receives the current payload and may mutate it in place or return
+        a replacement. Returns the stored payload, or None if `key` is missing.
+        Exceptions raised by `fn` roll the transaction back. The write lock is
+        held throughout, so this is safe across worker processes.
+        """
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT data, version FROM sessions WHERE store = ? AND id = ?",
+                (self.name, key),
+            ).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return None
+            value = json.loads(row[0])
+            replaced = fn(value)
+            if replaced is not None:
+                value = replaced
+            self._write(conn, key, value, int(row[1]))
+            conn.execute("COMMIT")
+            return value
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def rename(self, old_key: str, new_key: str) -> None:
+        """Move a session to a new key (e.g. when Supabase assigns its own id)."""
+        if old_key == new_key:
+            return
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT data FROM sessions WHERE store = ? AND id = ?",
+                (self.name, old_key),
+            ).fetchone()
+            if row is not None:
+                value = json.loads(row[0])
+                value["id"] = new_key
+                conn.execute(
+                    """
+                    UPDATE OR REPLACE sessions
+                    SET id = ?, data = ?, updated_at = ?, version = version + 1
+                    WHERE store = ? AND id = ?
+                    """,
+                    (new_key, _dumps(value), time.time(), self.name, old_key),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete(self, key: str, expected_version: Optional[int] = None) -> bool:
+        """Remove `key`. With `expected_version`, raise VersionConflict if it changed."""
+        if expected_version is None:
+            cursor = self._conn.execute(
+                "DELETE FROM sessions WHERE store = ? AND id = ?", (self.name, key)
+            )
+            return cursor.rowcount > 0
+        cursor = self._conn.execute(
+            "DELETE FROM sessions WHERE store = ? AND id = ? AND version = ?",
+            (self.name, key, expected_version),
+        )
+        if cursor.rowcount == 0:
+            raise VersionConflict(self.name, key)
+        return True
+
+    # ---- eviction ----
+    def size_bytes(self) -> int:
+        row = self._conn.execute(
+            "SELECT COALESCE(SUM(length(CAST(data AS BLOB))), 0) FROM sessions WHERE store = ?",
+            (self.name,),
+        ).fetchone()
+        return int(row[0])
+
+    def compact(self, policy: "EvictionPolicy", min_interval: float = 0.0) -> List[str]:
+        """
+        Evict sessions according to `policy` and return the evicted ids.
+
+        Order of enforcement: TTL on last access, then the entry cap, then the
+        byte budget — the last two always drop least-recently-used sessions
+        first. With `min_interval`, the run is skipped if any worker already
+        compacted this store within that many seconds.
+        """
+        conn = self._conn
+        now = time.time()
+        evicted: List[str] = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT ran_at FROM compaction_runs WHERE store = ?", (self.name,)
+            ).fetchone()
+            if row is not None and now - float(row[0]) < min_interval:
+                conn.execute("ROLLBACK")
+                return evicted
+
+            if policy.ttl_seconds is not None:
+                evicted += [r[0] for r in conn.execute(
+                    "DELETE FROM sessions WHERE store = ? AND last_access < ? RETURNING id",
+                    (self.name, now - policy.ttl_seconds),
+                ).fetchall()]
+            if policy.max_entries is not None:
+                evicted += [r[0] for r in conn.execute(
+                    """
+                    DELETE FROM sessions WHERE store = ? AND id IN (
+                        SELECT id FROM sessions WHERE store = ?
+                        ORDER BY last_access DESC, id LIMIT -1 OFFSET ?
+                    ) RETURNING id
+                    """,
+                    (self.name, self.name, policy.max_entries),
+                ).fetchall()]
+            if policy.max_bytes is not None:
+                evicted += [r[0] for r in conn.execute(
+                    """
+                    DELETE FROM sessions WHERE store = ? AND id IN (
+                        SELECT id FROM (
+                            SELECT id, SUM(length(CAST(data AS BLOB))) OVER (
+                                ORDER BY last_access DESC, id ROWS UNBOUNDED PRECEDING
+                            ) AS running_bytes
+                            FROM sessions WHERE store = ?
+                        ) WHERE running_bytes > ?
+                    ) RETURNING id
+                    """,
+                    (self.name, self.name, policy.max_bytes),
+                ).fetchall()]
+
+            conn.execute(
+                "INSERT OR REPLACE INTO compaction_runs (store, ran_at) VALUES (?, ?)",
+                (self.name, now),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return evicted
+
+    # ---- migration ----
+    def import_json_file(self, path: Path, keep: Optional[Callable[[dict], bool]] = None) -> int:
+        """
+        One-time import of a legacy `_*_store.json` file into this store.
+
+        Sessions that already exist are left untouched, and the import is
+        recorded so later startups (and other workers) skip the file.
+        Returns the number of sessions imported.
+        """
+        conn = self._conn
+        migration = f"{self.name}:{Path(path).resolve()}"
+        if conn.execute("SELECT 1 FROM migrations WHERE name = ?", (migration,)).fetchone():
+            return 0
+        try:
+            legacy: Dict[str, Any] = json.loads(Path(path).read_text(encoding="utf-8")) if Path(path).exists() else {}
+        except Exception:
+            legacy = {}
+
+        now = time.time()
+        imported = 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Re-check under the write lock: another worker may have just imported it.
+            if conn.execute("SELECT 1 FROM migrations WHERE name = ?", (migration,)).fetchone():
+                conn.execute("ROLLBACK")
+                return 0
+            for key, value in legacy.items() if isinstance(legacy, dict) else ():
+                if not isinstance(value, dict) or (keep and not keep(value)):
+                    continue
+                cursor = conn.execute(
+                    """
+                    INSERT OR IGNORE INTO sessions (store, id, user_id, status, data, created_at, updated_at, last_access)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (self.name, str(key), _user_id_of(value), value.get("status"), _dumps(value), now, now, now),
+                )
+                imported += cursor.rowcount
+            conn.execute(
+                "INSERT INTO migrations (name, applied_at) VALUES (?, ?)",
+                (migration, now),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return imported
+
+
+def _user_id_of(value: dict) -> Optional[str]:
+    user_id = value.get("user_id")
+    return str(user_id) if user_id is not None else None
+
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+_stores: Dict[str, SessionStore] = {}
+_policies: Dict[str, EvictionPolicy] = {}
+
+
+def get_store(
+    name: str,
+    legacy_json: Optional[Path] = None,
+    keep: Optional[Callable[[dict], bool]] = None,
+    policy: Optional[EvictionPolicy] = None,
+) -> SessionStore:
+    """
+    Return the shared `SessionStore` for `name`.
+
+    If `legacy_json` is given, sessions from that pre-SQLite store file are
+    imported the first time the store is opened (filtered by `keep`).
+    `policy` registers the store with the background compactor.
+    """
+    store = _stores.get(name)
+    if store is None:
+        store = SessionStore(name)
+        _stores[name] = store
+        if legacy_json is not None:
+            try:
+                store.import_json_file(legacy_json, keep=keep)
+            except Exception:
+                # Best-effort only — a broken legacy file must not block startup.
+                pass
+    if policy is not None:
+        _policies[name] = policy
+    return store
+
+
+# ---------------------------------------------------------------------------
+# Background compaction
+# ---------------------------------------------------------------------------
+_compaction_stats: Dict[str, dict] = {}
+_compactor: Optional[threading.Thread] = None
+_compactor_stop = threading.Event()
+
+
+def compact_all(min_interval: float = 0.0) -> Dict[str, int]:
+    """Run every registered eviction policy once. Returns evicted counts per store."""
+    evicted_counts: Dict[str, int] = {}
+    for name, policy in list(_policies.items()):
+        started = time.perf_counter()
+        try:
+            evicted = _stores[name].compact(policy, min_interval=min_interval)
+        except Exception:
+            stats = _compaction_stats.setdefault(name, {"runs": 0, "evicted": 0, "errors": 0})
+            stats["errors"] += 1
+            continue
+        if evicted and policy.on_evict is not None:
+            try:
+                policy.on_evict(evicted)
+            except Exception:
+                pass
+        stats = _compaction_stats.setdefault(name, {"runs": 0, "evicted": 0, "errors": 0})
+        stats["runs"] += 1
+        stats["evicted"] += len(evicted)
+        stats["last_run_at"] = time.time()
+        stats["last_run_ms"] = round((time.perf_counter() - started) * 1000.0, 3)
+        evicted_counts[name] = len(evicted)
+
+    if any(evicted_counts.values()):
+        # Deleted pages are reused by later writes; truncating the WAL keeps
+        # the -wal file from holding on to the evicted payloads.
+        try:
+            _stores[next(iter(evicted_counts))]._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except Exception:
+            pass
+    return evicted_counts
+
+
+def _run_compactor(interval: float) -> None:
+    # Other workers run the same loop; `min_interval` makes only one of them
+    # do the work per period.
+    while True:
+        compact_all(min_interval=interval * 0.9)
+        if _compactor_stop.wait(interval):
+            return
+
+
+def start_compactor(interval: float) -> None:
+    """Start the periodic compaction thread (idempotent)."""
+    global _compactor
+    if _compactor is not None and _compactor.is_alive():
+        return
+    _compactor_stop.clear()
+    _compactor = threading.Thread(
+        target=_run_compactor, args=(interval,), name="session-store-compactor", daemon=True
+    )
+    _compactor.start()
+
+
+def stop_compactor() -> None:
+    _compactor_stop.set()
+    if _compactor is not None and _compactor.is_alive():
+        _compactor.join(timeout=5.0)
+
+
+def all_store_stats() -> List[dict]:
+    """Size and eviction counters for every opened store."""
+    out = []
+    for name, store in list(_stores.items()):
+        policy = _policies.get(name)
+        out.append({
+            "store": name,
+            "entries": len(store),
+            "bytes": store.size_bytes(),
+            "policy": None if policy is None else {
+                "ttl_seconds": policy.ttl_seconds,
+                "max_entries": policy.max_entries,
+                "max_bytes": policy.max_bytes,
+            },
+            "compaction": dict(_compaction_stats.get(name, {})),
+        })
+    return out
@@ -0,0 +1,180 @@
+"""
+Speculative Generation
+======================
+Work started right after `/resume/parse`, before the client asks for it.
+
+Nearly every parse is followed by `/interview/questions` or `/quiz/generate`
+with the same `resume_data`. With `SPECULATIVE_GENERATION_ENABLED`, the parse
+endpoint calls `registry.start(resume)`, which runs every registered
+generator in the background (at batch priority, behind interactive LLM
+calls). Results are keyed by (kind, resume hash), where the hash covers the
+resume digest — exactly what the prompts see — so it matches whether or not
+the client sends the `digest` back.
+
+The follow-up endpoint calls `registry.take(kind, resume_data, params)`:
+
+- finished → the result is returned at once;
+- still running → the caller awaits the in-flight task;
+- missing, expired, failed, or started with other parameters (e.g. a
+  different `num_questions`) → None, and the endpoint generates as usual.
+
+A result is handed out once (a second request generates fresh questions).
+Entries expire after `SPECULATIVE_TTL_SECONDS`; beyond
+`SPECULATIVE_MAX_ENTRIES` the oldest are dropped, and dropped entries that
+are still running are cancelled. The registry is per process: with several
+workers a follow-up that lands on another worker simply misses.
+
+Generators are registered by the routers that own the generation code:
+
+    speculative.register("quiz.generate", _speculate_quiz, num_questions=5, difficulty="intermediate")
+
+A generator is called as `generate(resume_data, **params)` and may return
+None to decline (e.g. when the question bank would serve the request).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+from . import resume_digest
+
+Generator = Callable[..., Awaitable[Any]]
+
+# kind -> (generator, params it is run with)
+_generators: Dict[str, Tuple[Generator, Dict[str, Any]]] = {}
+
+
+def register(kind: str, generate: Generator, **params: Any) -> None:
+    """Run `generate(resume_data, **params)` after every parse, as `kind`."""
+    _generators[kind] = (generate, dict(params))
+
+
+def resume_key(resume_data: Optional[dict]) -> str:
+    """Stable hash of what the prompts see of a resume (its digest)."""
+    text = resume_digest.prompt_text(resume_digest.get_digest(resume_data))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass
+class _Entry:
+    task: asyncio.Task
+    params: Dict[str, Any]
+    created_at: float = field(default_factory=time.monotonic)
+
+
+class SpeculativeRegistry:
+    def __init__(self) -> None:
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {
+            "started": 0, "ready": 0, "awaited": 0, "misses": 0, "declined": 0,
+            "errors": 0, "expired": 0, "evicted": 0,
+        }
+
+    def _count(self, field_name: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[field_name] += n
+
+    # ---- housekeeping ----
+    def _drop(self, key: Tuple[str, str], reason: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        if not entry.task.done():
+            entry.task.cancel()
+        self._count(reason)
+
+    def _prune(self) -> None:
+        ttl = settings.SPECULATIVE_TTL_SECONDS
+        now = time.monotonic()
+        for key, entry in list(self._entries.items()):
+            if now - entry.created_at > ttl:
+                self._drop(key, "expired")
+        while len(self._entries) > max(settings.SPECULATIVE_MAX_ENTRIES, 0):
+            self._drop(next(iter(self._entries)), "evicted")
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        # Retrieve the exception so an unclaimed failure is not logged as "never retrieved".
+        if not task.cancelled() and task.exception() is not None:
+            self._count("errors")
+            print(f"Speculative generation failed ({task.get_name()}): {task.exception()}")
+
+    # ---- producer ----
+    def start(self, resume_data: Optional[dict]) -> List[str]:
+        """Start every registered generator for this resume; returns the kinds started."""
+        if not settings.SPECULATIVE_GENERATION_ENABLED or not isinstance(resume_data, dict) or not _generators:
+            return []
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return []
+        resume = resume_key(resume_data)
+        self._prune()
+        started = []
+        for kind, (generate, params) in _generators.items():
+            key = (kind, resume)
+            if key in self._entries:
+                continue  # same resume parsed again: the earlier run still counts
+            task = loop.create_task(generate(resume_data, **params), name=f"speculative:{kind}")
+            task.add_done_callback(self._on_done)
+            self._entries[key] = _Entry(task=task, params=params)
+            started.append(kind)
+        self._count("started", len(started))
+        self._prune()
+        return started
+
+    # ---- consumer ----
+    async def take(self, kind: str, resume_data: Optional[dict], params: Dict[str, Any]) -> Any:
+        """The speculative result for this request, awaiting it if still running; None on a miss."""
+        if not settings.SPECULATIVE_GENERATION_ENABLED or not isinstance(resume_data, dict):
+            return None
+        self._prune()
+        entry = self._entries.pop((kind, resume_key(resume_data)), None)
+        if entry is None or entry.params != params:
+            if entry is not None and not entry.task.done():
+                entry.task.cancel()
+            self._count("misses")
+            return None
+        was_ready = entry.task.done()
+        try:
+            result = await entry.task
+        except asyncio.CancelledError:
+            if entry.task.cancelled():
+                return None
+            raise  # the request itself was cancelled
+        except Exception:
+            return None  # counted in _on_done; the caller generates as usual
+        if result is None:
+            self._count("declined")
+        else:
+            self._count("ready" if was_ready else "awaited")
+        return result
+
+    def close(self) -> None:
+        """Cancel everything still running (application shutdown)."""
+        for entry in self._entries.values():
+            if not entry.task.done():
+                entry.task.cancel()
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        self._prune()
+        with self._lock:
+            counters = dict(self._stats)
+        return {
+            "enabled": settings.SPECULATIVE_GENERATION_ENABLED,
+            "kinds": {kind: params for kind, (_, params) in _generators.items()},
+            **counters,
+            "entries": len(self._entries),
+            "in_flight": sum(1 for e in self._entries.values() if not e.task.done()),
+        }
+
+
+registry = SpeculativeRegistry()
@@ -0,0 +1,204 @@
+"""
+JSON extraction for model output.
+
+Models asked for "ONLY raw JSON" still wrap it in markdown fences, add a
+sentence before or after it, leave trailing commas, use single quotes or
+Python literals, or get cut off at the token limit. `extract_json()`
+recovers the intended object in that order of effort:
+
+1. the text as-is (after stripping a markdown fence);
+2. the outermost `{...}` (or `[...]`) found in the text;
+3. that span after repair: single-quoted strings and `True`/`False`/`None`
+   normalized, trailing commas dropped, and a truncated tail closed (an open
+   string is terminated, a dangling key or partial value is cut back to the
+   last complete element, open brackets are closed).
+
+Anything still unparseable raises `JSONExtractError`.
+"""
+
+import json
+from typing import Any, List, Optional, Tuple
+
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_CLOSERS = {"{": "}", "[": "]"}
+# Cut-back attempts for a truncated tail before giving up.
+_MAX_CUTS = 50
+
+
+class JSONExtractError(ValueError):
+    pass
+
+
+def strip_fences(text: Optional[str]) -> str:
+    raw = (text or "").strip()
+    if raw.startswith("```"):
+        raw = raw[3:]
+        if raw[:4].lower() == "json":
+            raw = raw[4:]
+        raw = raw.strip()
+    if raw.endswith("```"):
+        raw = raw[:-3].strip()
+    return raw
+
+
+def _loads(text: str) -> Any:
+    # strict=False: raw newlines/tabs inside strings are accepted.
+    return json.loads(text, strict=False)
+
+
+def _outermost(text: str) -> Optional[str]:
+    """The outermost object (or array) span; runs to the end of `text` if never closed."""
+    start = text.find("{")
+    if start < 0:
+        start = text.find("[")
+    if start < 0:
+        return None
+    depth = 0
+    quote = None
+    i = start
+    while i < len(text):
+        ch = text[i]
+        if quote:
+            if ch == "\\":
+                i += 2
+                continue
+            if ch == quote:
+                quote = None
+        elif ch in "\"'":
+            quote = ch
+        elif ch in "{[":
+            depth += 1
+        elif ch in "}]":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+        i += 1
+    return text[start:]
+
+
+def _drop_trailing_comma(out: List[str], commas: List[int]) -> None:
+    j = len(out) - 1
+    while j >= 0 and out[j].isspace():
+        j -= 1
+    if j >= 0 and out[j] == ",":
+        del out[j]
+        while commas and commas[-1] >= j:
+            commas.pop()
+
+
+def _normalize(text: str) -> Tuple[List[str], List[int]]:
+    """
+    Re-emit `text` with double-quoted strings, JSON literals and no trailing
+    commas. Returns the output pieces and the piece index of every
+    structural comma (the cut points for a truncated tail).
+    """
+    out: List[str] = []
+    commas: List[int] = []
+    quote = None
+    i, n = 0, len(text)
+    while i < n:
+        ch = text[i]
+        if quote:
+            if ch == "\\" and i + 1 < n:
+                nxt = text[i + 1]
+                out.append("'" if (quote == "'" and nxt == "'") else ch + nxt)
+                i += 2
+                continue
+            if ch == quote:
+                out.append('"')
+                quote = None
+            elif ch == '"':  # inside a single-quoted string
+                out.append('\\"')
+            else:
+                out.append(ch)
+        elif ch in "\"'":
+            quote = ch
+            out.append('"')
+        elif ch in "}]":
+            _drop_trailing_comma(out, commas)
+            out.append(ch)
+        elif ch == ",":
+            commas.append(len(out))
+            out.append(ch)
+        elif ch.isalpha():
+            j = i
+            while j < n and (text[j].isalnum() or text[j] == "_"):
+                j += 1
+            word = text[i:j]
+            out.append(_LITERALS.get(word, word))
+            i = j
+            continue
+        else:
+            out.append(ch)
+        i += 1
+    return out, commas
+
+
+def _close(text: str) -> str:
+    """Terminate an open string and close every open bracket of `text`."""
+    stack: List[str] = []
+    in_string = False
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if in_string:
+            if ch == "\\":
+                i += 2
+                continue
+            if ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append(ch)
+        elif ch in "}]" and stack:
+            stack.pop()
+        i += 1
+    if in_string:
+        if text.endswith("\\"):
+            text = text[:-1]
+        text += '"'
+    text = text.rstrip()
+    if text.endswith(","):
+        text = text[:-1]
+    if text.endswith(":"):
+        text += " null"
+    return text + "".join(_CLOSERS[c] for c in reversed(stack))
+
+
+def repair_json(text: str) -> Any:
+    out, commas = _normalize(text)
+    normalized = "".join(out)
+    try:
+        return _loads(_close(normalized))
+    except json.JSONDecodeError as e:
+        error = e
+    # Truncated mid-element: cut back to the last complete one and close.
+    for cut in reversed(commas[-_MAX_CUTS:]):
+        try:
+            return _loads(_close("".join(out[:cut])))
+        except json.JSONDecodeError:
+            continue
+    raise JSONExtractError(f"unrepairable JSON ({error})")
+
+
+def extract_json_with_method(text: Optional[str]) -> Tuple[Any, str]:
+    """(value, method) where method is "strict", "extracted" or "repaired"."""
+    raw = strip_fences(text)
+    try:
+        return _loads(raw), "strict"
+    except json.JSONDecodeError:
+        pass
+    span = _outermost(raw)
+    if span is None:
+        raise JSONExtractError("no JSON object found in the output")
+    try:
+        return _loads(span), "extracted"
+    except json.JSONDecodeError:
+        pass
+    return repair_json(span), "repaired"
+
+
+def extract_json(text: Optional[str]) -> Any:
+    """Parse model output as JSON, recovering from the usual defects (see module docstring)."""
+    return extract_json_with_method(text)[0]
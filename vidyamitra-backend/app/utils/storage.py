@@ -1,9 +1,30 @@
 import os
 import tempfile
 from pathlib import Path
+from typing import Union
 
 
 def get_writable_temp_path(env_key: str, default_name: str) -> Path:
     """Resolve a writable path from env or the OS temp directory."""
     default_path = Path(tempfile.gettempdir()) / default_name
     return Path(os.getenv(env_key, str(default_path)))
+
+
+def atomic_write_bytes(path: Path, data: Union[bytes, str]) -> None:
+    """
+    Write `data` to `path` via a temp file + os.replace, so concurrent readers
+    (including other worker processes) never observe a partially written file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = data.encode("utf-8") if isinstance(data, str) else data
+    fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(payload)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
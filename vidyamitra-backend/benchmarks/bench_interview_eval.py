@@ -0,0 +1,207 @@
+"""
+Interview Evaluation Benchmark
+==============================
+Compares the two `INTERVIEW_EVAL_MODE`s of the interview report:
+
+    per_question — one completion per answer (5–7 prompts, each repeating the
+                   resume context and the instructions)
+    batched      — one structured completion for all answers, with
+                   per-question fallback for items that fail validation
+
+For each mode the same synthetic interview (N answers with realistic
+transcripts and a resume) is evaluated `--runs` times and the script reports
+wall time per report, completions made, fallbacks, and the prompt /
+completion tokens reported by the API. It also prints how far the batched
+scores drift from the per-question ones.
+
+This makes real completions against the configured endpoint
+(`GROQ_API_KEY`, `LLM_BASE_URL`), so it costs tokens.
+
+Usage (from vidyamitra-backend/):
+
+    python -m benchmarks.bench_interview_eval
+    python -m benchmarks.bench_interview_eval --answers 7 --runs 5 --json results.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Keep the router's session store out of the real one.
+os.environ.setdefault("SESSION_STORE_PATH", str(Path(tempfile.mkdtemp(prefix="vidyamitra_bench_")) / "sessions.db"))
+
+from app.core.config import settings  # noqa: E402
+from app.routers import interview_pipeline as pipeline  # noqa: E402
+from app.services import llm, resume_digest  # noqa: E402
+
+MODES = ("per_question", "batched")
+
+_QUESTIONS = (
+    "Walk me through the architecture of the data pipeline you built at your last internship.",
+    "How would you design an API rate limiter for a multi-tenant service?",
+    "Explain the difference between a process and a thread, with an example from your work.",
+    "Tell me about a time you disagreed with a teammate on a technical decision.",
+    "How do you make sure a database migration is safe to run in production?",
+    "Describe how you would debug a memory leak in a long-running Python service.",
+    "What trade-offs did you consider when choosing React for your portfolio project?",
+)
+
+_FILLERS = ("um", "uh", "like", "you know", "basically")
+_VOCAB = ("so", "we", "used", "a", "queue", "to", "batch", "the", "events", "and", "then", "I",
+          "wrote", "tests", "for", "latency", "because", "the", "service", "was", "slow", "at",
+          "peak", "load", "which", "meant", "caching", "results", "in", "redis", "helped")
+
+
+def _transcript(rng: random.Random, words: int) -> Tuple[str, List[str]]:
+    tokens, fillers = [], []
+    for _ in range(words):
+        if rng.random() < 0.06:
+            filler = rng.choice(_FILLERS)
+            fillers.append(filler)
+            tokens.append(filler)
+        else:
+            tokens.append(rng.choice(_VOCAB))
+    return " ".join(tokens), fillers
+
+
+def build_interview(answers: int, seed: int) -> Tuple[List[dict], Dict[str, dict], dict]:
+    """(per-question analysis, questions by id, resume data) shaped like a real session."""
+    rng = random.Random(seed)
+    questions = {}
+    per_question = []
+    for i in range(answers):
+        qid = f"q{i + 1}"
+        questions[qid] = {"id": qid, "text": _QUESTIONS[i % len(_QUESTIONS)], "category": "technical"}
+        text, fillers = _transcript(rng, rng.randint(90, 160))
+        per_question.append({
+            "question_id": qid,
+            "transcript_excerpt": text,
+            "filler_word_count": len(fillers),
+            "top_fillers": sorted(set(fillers))[:5],
+            "eye_contact_ratio": round(rng.uniform(0.4, 0.95), 2),
+            "answer_start_offset_seconds": i * 75.0,
+            "answer_end_offset_seconds": i * 75.0 + 60.0,
+        })
+    resume_data = {
+        "skills": ["Python", "SQL", "FastAPI", "React", "Docker", "Redis", "Airflow", "AWS"],
+        "projects": [
+            {"name": "Realtime analytics pipeline", "description": "Kafka + Spark streaming into a Postgres warehouse."},
+            {"name": "Portfolio site", "description": "React + FastAPI with CI/CD on GitHub Actions."},
+        ],
+        "experience": [{"title": "Data Engineering Intern", "company": "Acme", "duration": "6 months"}],
+    }
+    return per_question, questions, resume_data
+
+
+def _token_totals() -> Dict[str, int]:
+    totals = {"prompt_tokens": 0, "completion_tokens": 0, "completions": 0}
+    for task, counters in llm.task_stats().items():
+        if task.startswith("interview_pipeline.evaluate_"):
+            totals["prompt_tokens"] += counters["prompt_tokens"]
+            totals["completion_tokens"] += counters["completion_tokens"]
+            totals["completions"] += counters["leaders"]
+    return totals
+
+
+def _fallbacks() -> int:
+    return llm.task_stats().get("interview_pipeline.evaluate_answer", {}).get("leaders", 0)
+
+
+async def run_mode(mode: str, per_question: List[dict], q_by_id: Dict[str, dict], digest: dict,
+                   runs: int) -> Tuple[dict, List[List[dict]]]:
+    settings.INTERVIEW_EVAL_MODE = mode
+    before, fallbacks_before = _token_totals(), _fallbacks()
+    walls: List[float] = []
+    outputs: List[List[dict]] = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        outputs.append(await pipeline._evaluate_answers(per_question, q_by_id, digest))
+        walls.append(time.perf_counter() - started)
+    after = _token_totals()
+
+    spent = {field: after[field] - before[field] for field in after}
+    failed = sum(1 for output in outputs for e in output if e["feedback"] == "Evaluation failed for this answer.")
+    return {
+        "mode": mode,
+        "answers": len(per_question),
+        "runs": runs,
+        "wall_p50_s": round(statistics.median(walls), 3),
+        "wall_max_s": round(max(walls), 3),
+        "completions_per_report": round(spent["completions"] / runs, 2),
+        "fallbacks_per_report": round((_fallbacks() - fallbacks_before) / runs, 2) if mode == "batched" else 0.0,
+        "failed_answers": failed,
+        "prompt_tokens_per_report": round(spent["prompt_tokens"] / runs, 1),
+        "completion_tokens_per_report": round(spent["completion_tokens"] / runs, 1),
+        "total_tokens_per_report": round((spent["prompt_tokens"] + spent["completion_tokens"]) / runs, 1),
+    }, outputs
+
+
+def _score_drift(a: List[List[dict]], b: List[List[dict]]) -> Optional[float]:
+    """Mean absolute difference of per-answer combined scores between two modes."""
+    diffs = [abs(x["score"] - y["score"]) for run_a, run_b in zip(a, b) for x, y in zip(run_a, run_b)]
+    return round(statistics.mean(diffs), 2) if diffs else None
+
+
+async def _main(args: argparse.Namespace) -> List[dict]:
+    per_question, q_by_id, resume_data = build_interview(args.answers, args.seed)
+    digest = resume_digest.build_digest(resume_data)
+    results, outputs = [], {}
+    try:
+        for mode in args.modes:
+            row, outputs[mode] = await run_mode(mode, per_question, q_by_id, digest, args.runs)
+            results.append(row)
+    finally:
+        await llm.aclose()
+    if len(outputs) == 2:
+        drift = _score_drift(outputs["per_question"], outputs["batched"])
+        results.append({"mode": "drift", "mean_abs_score_diff": drift})
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--answers", type=int, default=6, help="answers per interview (the report caps at 7)")
+    parser.add_argument("--runs", type=int, default=3, help="reports evaluated per mode")
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", dest="json_out", help="also write the results to this file")
+    args = parser.parse_args(argv)
+    args.modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = [m for m in args.modes if m not in MODES]
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(unknown)}")
+    if not llm.is_configured():
+        parser.error("GROQ_API_KEY is not set; this benchmark makes real completions.")
+
+    results = asyncio.run(_main(args))
+
+    header = (f"{'mode':<14}{'answers':>8}{'runs':>6}{'p50 s':>9}{'max s':>9}"
+              f"{'calls':>7}{'fallbk':>8}{'prompt tok':>12}{'compl tok':>11}{'total tok':>11}")
+    print(header)
+    print("-" * len(header))
+    for row in results:
+        if row["mode"] == "drift":
+            print(f"\nmean |score difference| per answer, batched vs per_question: {row['mean_abs_score_diff']}")
+            continue
+        print(f"{row['mode']:<14}{row['answers']:>8}{row['runs']:>6}{row['wall_p50_s']:>9.2f}{row['wall_max_s']:>9.2f}"
+              f"{row['completions_per_report']:>7.1f}{row['fallbacks_per_report']:>8.1f}"
+              f"{row['prompt_tokens_per_report']:>12.0f}{row['completion_tokens_per_report']:>11.0f}"
+              f"{row['total_tokens_per_report']:>11.0f}")
+
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
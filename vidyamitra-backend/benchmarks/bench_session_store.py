@@ -0,0 +1,394 @@
+"""
+Session Store Benchmark
+=======================
+Measures the local session stores as they fill up, for the legacy
+whole-file JSON backend (`_load_store` / `_save_store`, as the routers used
+to do it) and the SQLite `SessionStore` (plus the write-behind cache the
+interview pipeline uses).
+
+Every store (quiz, interview, interview_pipeline, roadmap) is pre-filled with
+N realistic sessions spread over N/20 users, then each operation is timed:
+
+    create   — add one new session
+    lookup   — read one session by id
+    update   — read-modify-write one session
+    history  — all sessions of one user
+
+Usage (from vidyamitra-backend/):
+
+    python -m benchmarks.bench_session_store
+    python -m benchmarks.bench_session_store --sizes 1000,10000,100000 --ops 200
+    python -m benchmarks.bench_session_store --stores quiz,roadmap --json results.json
+
+The JSON backend rewrites the whole file on every write, so at large sizes it
+runs proportionally fewer operations (never fewer than `--min-json-ops`).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from app.services.resume_digest import build_digest
+from app.services.session_cache import CachedSessionStore
+from app.services.session_store import SessionStore
+
+STORES = ("quiz", "interview", "interview_pipeline", "roadmap")
+SESSIONS_PER_USER = 20
+
+
+# ---------------------------------------------------------------------------
+# Realistic session payloads
+# ---------------------------------------------------------------------------
+def _text(rng: random.Random, words: int) -> str:
+    vocab = ("data", "pipeline", "latency", "python", "design", "scalable", "team",
+             "cloud", "model", "query", "index", "api", "testing", "deploy", "cache")
+    return " ".join(rng.choice(vocab) for _ in range(words))
+
+
+def _quiz(rng: random.Random, sid: str, user_id: str) -> dict:
+    return {
+        "id": sid,
+        "user_id": user_id,
+        "topic": "Resume Based",
+        "difficulty": "intermediate",
+        "questions": [
+            {
+                "id": str(uuid.uuid4()),
+                "question_text": _text(rng, 18) + "?",
+                "options": [_text(rng, 5) for _ in range(4)],
+                "correct_answer": "A",
+                "explanation": _text(rng, 30),
+            }
+            for _ in range(5)
+        ],
+        "status": "pending",
+        "is_resume_based": True,
+        "skills_tested": ["Python", "SQL", "Docker"],
+    }
+
+
+def _interview(rng: random.Random, sid: str, user_id: str) -> dict:
+    questions = [{"id": i + 1, "question": _text(rng, 20) + "?"} for i in range(5)]
+    return {
+        "id": sid,
+        "user_id": user_id,
+        "target_role": "Data Engineer",
+        "questions": questions,
+        "answers": [{"question_id": q["id"], "answer": _text(rng, 80)} for q in questions],
+        "status": "pending_evaluation",
+    }
+
+
+def _resume_data(rng: random.Random) -> dict:
+    """A parsed resume, as `/resume/parse` returns it (`ParsedResumeOutput`)."""
+    return {
+        "skills": ["Python", "SQL", "Docker", "AWS", "FastAPI", "PostgreSQL", "Airflow", "Kubernetes"],
+        "projects": [
+            {"name": _text(rng, 3).title(), "description": _text(rng, 45),
+             "technologies": ["Python", "Airflow", "PostgreSQL"]}
+            for _ in range(3)
+        ],
+        "experience": [
+            {"title": "Backend Developer", "company": "Tech Corp", "duration": "2021 - 2024",
+             "description": _text(rng, 60)}
+            for _ in range(2)
+        ],
+        "education": [{"degree": "B.Tech Computer Science", "institution": "State University", "year": "2021"}],
+        "summary": _text(rng, 40),
+    }
+
+
+def _interview_pipeline(rng: random.Random, sid: str, user_id: str) -> dict:
+    """An analyzed `/interview/questions` → `/record` → `/analyze` session, as the pipeline router stores it."""
+    resume_data = _resume_data(rng)
+    questions = [
+        {"id": str(uuid.uuid4()), "text": _text(rng, 24) + "?",
+         "category": ("project-based", "technical", "behavioral")[i % 3]}
+        for i in range(6)
+    ]
+    media_dir = f"/tmp/vidyamitra_interview_media/{sid}"
+    return {
+        "id": sid,
+        "user_id": user_id,
+        "resume_data": resume_data,
+        "resume_digest": build_digest(resume_data),
+        "questions": questions,
+        "status": "analyzed",
+        "created_at": "2026-01-01T12:00:00.000000Z",
+        "video_start_time": "2026-01-01T12:01:00.000Z",
+        "answer_windows": [
+            {"question_id": q["id"], "start_offset_seconds": i * 60.0, "end_offset_seconds": i * 60.0 + 55.0}
+            for i, q in enumerate(questions)
+        ],
+        "media": {
+            "video_path": f"{media_dir}/video.webm",
+            "audio_path": f"{media_dir}/audio.webm",
+            "video_filename": "video.webm",
+            "audio_filename": "audio.webm",
+        },
+        "analysis": {
+            "duration_seconds": 360.0,
+            "timeline_summary": {"eye_contact": 9, "question_start": 6, "filler_word": 14, "question_end": 6},
+            "video_start_time": "2026-01-01T12:01:00.000Z",
+            "resume_data_preview": {
+                "skills": resume_data["skills"],
+                "projects": resume_data["projects"][:5],
+                "experience": resume_data["experience"][:5],
+            },
+            "artifacts": {
+                name: {"artifact": name, "path": f"{sid}/artifacts/{name}.json", "bytes": size}
+                for name, size in (("transcript", 3200), ("filler_words", 1100), ("eye_contact_edges", 700),
+                                   ("timeline_sync", 6400), ("per_question", 2900))
+            },
+        },
+    }
+
+
+def _roadmap(rng: random.Random, sid: str, user_id: str) -> dict:
+    return {
+        "id": sid,
+        "user_id": user_id,
+        "goal": "Become a data engineer",
+        "timeline_months": 6,
+        "milestones": [
+            {"title": _text(rng, 4), "description": _text(rng, 40),
+             "skills": ["Python", "Airflow"], "month": m + 1}
+            for m in range(6)
+        ],
+        "recommended_videos": [
+            {"title": _text(rng, 6), "url": f"https://youtube.com/watch?v={uuid.uuid4().hex[:11]}"}
+            for _ in range(5)
+        ],
+        "dashboard_image_url": "https://images.pexels.com/photos/1/landscape.jpg",
+    }
+
+
+_FACTORIES: Dict[str, Callable[[random.Random, str, str], dict]] = {
+    "quiz": _quiz,
+    "interview": _interview,
+    "interview_pipeline": _interview_pipeline,
+    "roadmap": _roadmap,
+}
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+class JsonBackend:
+    """The pre-SQLite pattern: every operation loads (and writes) the whole file."""
+
+    name = "json"
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def _load_store(self) -> Dict[str, dict]:
+        if self.path.exists():
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        return {}
+
+    def _save_store(self, store: Dict[str, dict]) -> None:
+        self.path.write_text(json.dumps(store, ensure_ascii=False), encoding="utf-8")
+
+    def fill(self, sessions: Dict[str, dict]) -> None:
+        self._save_store(sessions)
+
+    def create(self, key: str, value: dict) -> None:
+        store = self._load_store()
+        store[key] = value
+        self._save_store(store)
+
+    def lookup(self, key: str) -> Optional[dict]:
+        return self._load_store().get(key)
+
+    def update(self, key: str, fn: Callable[[dict], None]) -> None:
+        store = self._load_store()
+        fn(store[key])
+        self._save_store(store)
+
+    def history(self, user_id: str) -> List[dict]:
+        return [s for s in self._load_store().values() if s.get("user_id") == user_id]
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteBackend:
+    name = "sqlite"
+
+    def __init__(self, store: str, db_path: Path):
+        self.store = SessionStore(store, db_path=db_path)
+
+    def fill(self, sessions: Dict[str, dict]) -> None:
+        items = list(sessions.items())
+        for i in range(0, len(items), 5000):
+            self.store.put_many(dict(items[i:i + 5000]))
+
+    def create(self, key: str, value: dict) -> None:
+        self.store.put(key, value, expected_version=0)
+
+    def lookup(self, key: str) -> Optional[dict]:
+        return self.store.get(key)
+
+    def update(self, key: str, fn: Callable[[dict], None]) -> None:
+        self.store.update(key, fn)
+
+    def history(self, user_id: str) -> List[dict]:
+        return self.store.for_user(user_id)
+
+    def close(self) -> None:
+        pass
+
+
+class CachedBackend(SqliteBackend):
+    """SQLite behind the write-behind cache (what the interview pipeline runs on)."""
+
+    name = "sqlite+cache"
+
+    def __init__(self, store: str, db_path: Path):
+        super().__init__(store, db_path)
+        self.cache = CachedSessionStore(self.store, flush_interval=0.5)
+
+    def create(self, key: str, value: dict) -> None:
+        self.cache.put(key, value, expected_version=0)
+
+    def lookup(self, key: str) -> Optional[dict]:
+        return self.cache.get(key)
+
+    def update(self, key: str, fn: Callable[[dict], None]) -> None:
+        session, version = self.cache.get_versioned(key)
+        fn(session)
+        self.cache.put(key, session, expected_version=version)
+
+    def history(self, user_id: str) -> List[dict]:
+        self.cache.flush()
+        return self.store.for_user(user_id)
+
+    def close(self) -> None:
+        self.cache.close()
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def _timed(fn: Callable[[], object], runs: int) -> List[float]:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return samples
+
+
+def run_case(store: str, backend_name: str, size: int, ops: int, min_json_ops: int,
+             workdir: Path, seed: int) -> List[dict]:
+    rng = random.Random(seed)
+    factory = _FACTORIES[store]
+    users = [f"user-{i}" for i in range(max(1, size // SESSIONS_PER_USER))]
+    sessions = {}
+    for _ in range(size):
+        sid = str(uuid.uuid4())
+        sessions[sid] = factory(rng, sid, rng.choice(users))
+    keys = list(sessions.keys())
+
+    case_dir = workdir / f"{store}-{backend_name}-{size}"
+    case_dir.mkdir(parents=True)
+    if backend_name == "json":
+        backend = JsonBackend(case_dir / f"_{store}_store.json")
+        runs = max(min_json_ops, min(ops, ops * 1000 // max(size, 1)))
+    elif backend_name == "sqlite":
+        backend = SqliteBackend(store, case_dir / "sessions.db")
+        runs = ops
+    else:
+        backend = CachedBackend(store, case_dir / "sessions.db")
+        runs = ops
+    backend.fill(sessions)
+
+    def create() -> None:
+        sid = str(uuid.uuid4())
+        backend.create(sid, factory(rng, sid, rng.choice(users)))
+
+    def bump(session: dict) -> None:
+        session["status"] = "updated"
+        session["updated_marker"] = time.time()
+
+    timings = {
+        "create": _timed(create, runs),
+        "lookup": _timed(lambda: backend.lookup(rng.choice(keys)), runs),
+        "update": _timed(lambda: backend.update(rng.choice(keys), bump), runs),
+        "history": _timed(lambda: backend.history(rng.choice(users)), runs),
+    }
+    backend.close()
+    shutil.rmtree(case_dir, ignore_errors=True)
+
+    return [
+        {
+            "store": store,
+            "backend": backend_name,
+            "sessions": size,
+            "operation": op,
+            "runs": len(samples),
+            "p50_ms": round(_percentile(samples, 50), 3),
+            "p95_ms": round(_percentile(samples, 95), 3),
+        }
+        for op, samples in timings.items()
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000", help="comma-separated store sizes (e.g. 1000,10000,100000)")
+    parser.add_argument("--stores", default=",".join(STORES), help="comma-separated subset of " + ", ".join(STORES))
+    parser.add_argument("--backends", default="json,sqlite,sqlite+cache")
+    parser.add_argument("--ops", type=int, default=200, help="timed runs per operation")
+    parser.add_argument("--min-json-ops", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", dest="json_out", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    stores = [s.strip() for s in args.stores.split(",") if s.strip()]
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    unknown = [s for s in stores if s not in _FACTORIES]
+    if unknown:
+        parser.error(f"unknown store(s): {', '.join(unknown)}")
+
+    workdir = Path(tempfile.mkdtemp(prefix="vidyamitra_bench_"))
+    results: List[dict] = []
+    header = f"{'store':<20}{'backend':<14}{'sessions':>9}  {'op':<8}{'runs':>6}{'p50 ms':>11}{'p95 ms':>11}"
+    print(header)
+    print("-" * len(header))
+    try:
+        for store in stores:
+            for size in sizes:
+                for backend_name in backends:
+                    for row in run_case(store, backend_name, size, args.ops, args.min_json_ops, workdir, args.seed):
+                        results.append(row)
+                        print(f"{row['store']:<20}{row['backend']:<14}{row['sessions']:>9}  {row['operation']:<8}"
+                              f"{row['runs']:>6}{row['p50_ms']:>11.3f}{row['p95_ms']:>11.3f}")
+                    sys.stdout.flush()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
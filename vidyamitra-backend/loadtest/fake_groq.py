@@ -0,0 +1,392 @@
+"""
+Fake Groq Server
+================
+Local stand-in for the Groq API, for load tests that must not spend tokens:
+
+    POST /openai/v1/chat/completions      (LLM_BASE_URL=http://HOST:PORT/openai/v1)
+    POST /openai/v1/audio/transcriptions  (GROQ_BASE_URL=http://HOST:PORT)
+
+Chat completions answer with canned, schema-valid JSON for the prompt's task
+(recognised by a phrase from each router's prompt, see `_ROUTES`), with a
+`usage` block and Groq-style rate-limit headers. Transcriptions answer with
+a `verbose_json` transcript of `--audio-seconds` of speech, fillers included,
+with word and segment timestamps.
+
+Latency is `--latency-ms` ± `--jitter-ms` per completion (`--transcribe-ms`
+for transcriptions). `--rate-limit-ratio` answers that share of completions
+with a 429 and a `retry-after`, to exercise the gateway's backoff.
+
+    GET  /_fake/stats   — requests per task, 429s sent
+    POST /_fake/reset   — clear the counters
+
+Usage (from vidyamitra-backend/):
+
+    python -m loadtest.fake_groq --port 8091 --latency-ms 800 --jitter-ms 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+@dataclass
+class FakeGroqConfig:
+    latency_ms: float = 600.0
+    jitter_ms: float = 200.0
+    transcribe_ms: float = 1500.0
+    audio_seconds: float = 60.0
+    rate_limit_ratio: float = 0.0
+    seed: Optional[int] = None
+
+
+_FILLERS = ("um", "uh", "like", "you know")
+_VOCAB = ("so", "we", "built", "a", "pipeline", "that", "batched", "events", "and", "I", "wrote",
+          "tests", "for", "the", "api", "because", "latency", "mattered", "at", "peak", "load",
+          "then", "we", "cached", "results", "in", "redis", "which", "helped", "a", "lot")
+
+
+# ---------------------------------------------------------------------------
+# Canned completions
+# ---------------------------------------------------------------------------
+def _question_ids(prompt: str) -> List[str]:
+    ids = re.findall(r'"question_id":\s*"([^"<]+)"', prompt)
+    return list(dict.fromkeys(ids)) or ["q1"]
+
+
+def _count(prompt: str, pattern: str, default: int) -> int:
+    match = re.search(pattern, prompt)
+    return int(match.group(1)) if match else default
+
+
+def _answer_evaluation(rng: random.Random, qid: str) -> dict:
+    return {
+        "question_id": qid,
+        "scores": {
+            "technical": rng.randint(45, 90),
+            "communication": rng.randint(45, 90),
+            "confidence": rng.randint(45, 90),
+        },
+        "feedback": "Clear structure and a concrete example; quantify the impact next time.",
+        "improvements": ["State the result with a number.", "Name the trade-off you considered."],
+        "better_response": "I led the redesign of the ingestion pipeline, cutting p95 latency by 40%.",
+        "ideal_answer": "Situation, task, the design choice and its trade-off, and the measured result.",
+    }
+
+
+def _pipeline_questions(rng: random.Random, prompt: str) -> dict:
+    n = _count(prompt, r"Generate (\d+) interview questions", 6)
+    categories = ("project-based", "technical", "behavioral")
+    return {"questions": [
+        {"text": f"Question {i + 1}: walk me through a decision you made on this project?",
+         "category": categories[i % len(categories)]}
+        for i in range(n)
+    ]}
+
+
+def _pipeline_batch(rng: random.Random, prompt: str) -> dict:
+    return {"evaluations": [_answer_evaluation(rng, qid) for qid in _question_ids(prompt)]}
+
+
+def _pipeline_answer(rng: random.Random, prompt: str) -> dict:
+    return _answer_evaluation(rng, _question_ids(prompt)[0])
+
+
+def _pipeline_summary(rng: random.Random, prompt: str) -> dict:
+    return {
+        "final_verdict": "A solid interview with clear technical depth; tighten the behavioral answers.",
+        "strengths": ["Technical depth", "Structured answers"],
+        "weaknesses": ["Few measurable outcomes"],
+        "improvements": ["Quantify results", "Reduce filler words"],
+        "skill_gap_analysis": [
+            {"skill": "Python", "score": rng.randint(50, 90), "level": "Proficient"},
+            {"skill": "System Design", "score": rng.randint(30, 70), "level": "Needs Improvement"},
+        ],
+    }
+
+
+def _resume_parse(rng: random.Random, prompt: str) -> dict:
+    return {
+        "skills": ["Python", "SQL", "FastAPI", "React", "Docker", "Redis"],
+        "projects": [
+            {"name": "Realtime analytics pipeline", "description": "Kafka and Spark streaming into Postgres.",
+             "technologies": ["Kafka", "Spark", "Postgres"]},
+            {"name": "Portfolio site", "description": "React front end with a FastAPI backend.",
+             "technologies": ["React", "FastAPI"]},
+        ],
+        "experience": [{"title": "Data Engineering Intern", "company": "Acme", "duration": "Jan - Jun 2025",
+                        "description": "Built batch and streaming ETL jobs."}],
+        "education": [{"degree": "B.Tech Computer Science", "institution": "State University", "year": "2025"}],
+        "summary": "Backend-leaning engineer with data pipeline experience.",
+    }
+
+
+def _resume_analysis(rng: random.Random, prompt: str) -> dict:
+    return {
+        "score": rng.randint(55, 90),
+        "strengths": ["Python", "SQL", "Data pipelines"],
+        "target_role_evaluated": "Data Engineer",
+        "suggested_roles": ["Data Engineer", "Backend Engineer", "Analytics Engineer"],
+        "skill_gaps": ["Kubernetes", "dbt"],
+        "categories": [{"subject": "Python", "A": 85, "fullMark": 100}],
+        "missingSkills": [{"name": "Kubernetes", "severity": "medium"}],
+        "courses": [{"title": "Kubernetes Basics", "provider": "Coursera", "url": "https://coursera.org"}],
+    }
+
+
+def _ats_analysis(rng: random.Random, prompt: str) -> dict:
+    return {
+        "atsScore": rng.randint(50, 90),
+        "sectionScores": {"skills": 80, "experience": 70, "education": 75, "formatting": 85},
+        "foundKeywords": ["Python", "SQL"],
+        "missingKeywords": ["Kubernetes"],
+        "recommendations": ["Add measurable outcomes to each role."],
+        "strengths": ["Relevant projects"],
+        "verdict": "Good match with a few keyword gaps.",
+    }
+
+
+def _quiz(rng: random.Random, prompt: str) -> dict:
+    n = _count(prompt, r"exactly (\d+) questions", 5)
+    return {"skills_tested": ["Python"], "questions": [
+        {"question_text": f"Question {i + 1}: which statement about Python generators is true?",
+         "options": ["They are lazy", "They are eager", "They are lists", "They are tuples"],
+         "correct_answer": "They are lazy",
+         "explanation": "Generators produce values on demand."}
+        for i in range(n)
+    ]}
+
+
+def _roadmap(rng: random.Random, prompt: str) -> dict:
+    return {"milestones": [
+        {"title": f"Milestone {i + 1}", "description": "Learn the fundamentals and build a small project.",
+         "duration": f"Weeks {4 * i + 1}-{4 * i + 4}", "status": "current" if i == 0 else "upcoming"}
+        for i in range(5)
+    ]}
+
+
+def _job_match(rng: random.Random, prompt: str) -> dict:
+    return {
+        "match_score_percentage": rng.randint(40, 95),
+        "matching_skills": ["Python", "SQL"],
+        "missing_keywords": ["Kubernetes"],
+        "resume_advice": "Lead with your pipeline project and its measured impact.",
+    }
+
+
+def _interview_start(rng: random.Random, prompt: str) -> dict:
+    return {"questions": [f"Interview question {i + 1}?" for i in range(5)]}
+
+
+def _bank_refill(rng: random.Random, prompt: str) -> dict:
+    n = _count(prompt, r"Generate (\d+) interview questions", 12)
+    mix = prompt.split("Category mix:", 1)[1].splitlines()[0]
+    categories = re.findall(r"project-based|technical|behavioral", mix) or ["technical"]
+    return {
+        "questions": [
+            {"text": f"Banked question {rng.randint(0, 10**9)}: how would you approach this in practice?",
+             "category": categories[i % len(categories)]}
+            for i in range(n)
+        ]
+    }
+
+
+def _evaluate_answer(rng: random.Random, prompt: str) -> dict:
+    return {
+        "question_id": _question_ids(prompt)[0],
+        "scores": {"tone": rng.randint(4, 9), "confidence": rng.randint(4, 9), "accuracy": rng.randint(4, 9)},
+        "feedback": "Good example; add the outcome and what you would do differently.",
+    }
+
+
+def _evaluate_summary(rng: random.Random, prompt: str) -> dict:
+    return {
+        "overall_score_out_of_10": round(rng.uniform(5, 9), 1),
+        "key_strengths": ["Clarity"],
+        "areas_for_improvement": ["Specificity"],
+        "final_verdict": "Promising interview with room to sharpen examples.",
+    }
+
+
+# (phrase in the prompt, task tag, response builder); first match wins.
+_ROUTES: Tuple[Tuple[str, str, Callable[[random.Random, str], dict]], ...] = (
+    ("Evaluate EACH of the candidate's answers", "interview_pipeline.evaluate_batch", _pipeline_batch),
+    ("Evaluate the candidate's answer on 3 axes", "interview_pipeline.evaluate_answer", _pipeline_answer),
+    ("writing an interview summary", "interview_pipeline.summary", _pipeline_summary),
+    ("Category mix:", "question_bank.refill", _bank_refill),
+    ("VidyaMitra's interview designer", "interview_pipeline.questions", _pipeline_questions),
+    ("Extract structured information from the following resume", "resume.parse", _resume_parse),
+    ("sectionScores", "resume.analyze_text", _ats_analysis),
+    ("suggested_roles", "resume.upload", _resume_analysis),
+    ("multiple-choice quiz", "quiz.generate", _quiz),
+    ("career roadmap", "roadmap.generate", _roadmap),
+    ("Applicant Tracking System", "jobs.match", _job_match),
+    ("evaluating a single job interview answer", "evaluate.answer", _evaluate_answer),
+    ("final dashboard summary", "evaluate.summary", _evaluate_summary),
+    ("Generate exactly 5 interview questions", "interview.start", _interview_start),
+)
+
+
+def canned_completion(prompt: str, rng: random.Random) -> Tuple[str, dict]:
+    """(task tag, response object) for a user prompt; unknown prompts get `{}`."""
+    for phrase, task, build in _ROUTES:
+        if phrase in prompt:
+            return task, build(rng, prompt)
+    return "unknown", {}
+
+
+def fake_transcript(rng: random.Random, seconds: float) -> dict:
+    """Groq `verbose_json` transcription of `seconds` of speech (~2.5 words/s)."""
+    words: List[dict] = []
+    t = 0.4
+    while t < seconds - 0.5:
+        text = rng.choice(_FILLERS) if rng.random() < 0.07 else rng.choice(_VOCAB)
+        length = 0.18 + 0.04 * len(text.split()[0])
+        words.append({"word": text, "start": round(t, 2), "end": round(t + length, 2)})
+        t += length + rng.uniform(0.05, 0.35)
+    segments = []
+    for i in range(0, len(words), 25):
+        chunk = words[i:i + 25]
+        segments.append({
+            "id": len(segments),
+            "start": chunk[0]["start"],
+            "end": chunk[-1]["end"],
+            "text": " ".join(w["word"] for w in chunk),
+        })
+    return {
+        "task": "transcribe",
+        "language": "en",
+        "duration": round(seconds, 2),
+        "text": " ".join(w["word"] for w in words),
+        "words": words,
+        "segments": segments,
+    }
+
+
+# ---------------------------------------------------------------------------
+# App
+# ---------------------------------------------------------------------------
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def create_app(config: Optional[FakeGroqConfig] = None) -> FastAPI:
+    config = config or FakeGroqConfig()
+    rng = random.Random(config.seed)
+    stats: Dict[str, Dict[str, int]] = {}
+
+    def count(task: str, field: str) -> None:
+        stats.setdefault(task, {"requests": 0, "rate_limited": 0})[field] += 1
+
+    async def delay(base_ms: float) -> None:
+        ms = max(0.0, base_ms + rng.uniform(-config.jitter_ms, config.jitter_ms))
+        await asyncio.sleep(ms / 1000.0)
+
+    app = FastAPI(title="Fake Groq")
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages") or []
+        prompt = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+        task, payload = canned_completion(prompt, rng)
+        count(task, "requests")
+
+        if config.rate_limit_ratio and rng.random() < config.rate_limit_ratio:
+            count(task, "rate_limited")
+            await asyncio.sleep(0.02)
+            return JSONResponse(
+                status_code=429,
+                content={"error": {"message": "Rate limit reached (fake)", "type": "tokens", "code": "rate_limit_exceeded"}},
+                headers={"retry-after": "1", "x-ratelimit-remaining-requests": "0"},
+            )
+
+        await delay(config.latency_ms)
+        content = json.dumps(payload)
+        prompt_tokens = sum(_tokens(m.get("content") or "") for m in messages)
+        completion_tokens = _tokens(content)
+        return JSONResponse(
+            content={
+                "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model") or "fake",
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            },
+            headers={
+                "x-ratelimit-limit-requests": "14400",
+                "x-ratelimit-remaining-requests": "14000",
+                "x-ratelimit-reset-requests": "6s",
+            },
+        )
+
+    @app.post("/openai/v1/audio/transcriptions")
+    async def transcriptions(request: Request):
+        await request.body()  # consume the upload like the real endpoint
+        count("audio.transcription", "requests")
+        await delay(config.transcribe_ms)
+        return fake_transcript(rng, config.audio_seconds)
+
+    @app.get("/_fake/stats")
+    def get_stats() -> dict:
+        return {"tasks": stats}
+
+    @app.post("/_fake/reset")
+    def reset() -> dict:
+        stats.clear()
+        return {"status": "success"}
+
+    @app.get("/")
+    def root() -> dict:
+        return {"name": "fake-groq", "status": "ok"}
+
+    return app
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8091)
+    parser.add_argument("--latency-ms", type=float, default=FakeGroqConfig.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=FakeGroqConfig.jitter_ms)
+    parser.add_argument("--transcribe-ms", type=float, default=FakeGroqConfig.transcribe_ms)
+    parser.add_argument("--audio-seconds", type=float, default=FakeGroqConfig.audio_seconds)
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0, help="share of completions answered with a 429")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    config = FakeGroqConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        transcribe_ms=args.transcribe_ms,
+        audio_seconds=args.audio_seconds,
+        rate_limit_ratio=args.rate_limit_ratio,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
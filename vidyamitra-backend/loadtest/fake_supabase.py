@@ -0,0 +1,320 @@
+"""
+Fake Supabase Server
+====================
+In-memory stand-in for the PostgREST API behind `SUPABASE_URL`, covering
+what the routers do through supabase-py:
+
+    GET    /rest/v1/{table}   select (column list), filters, order, limit/offset
+    POST   /rest/v1/{table}   insert, or upsert with `Prefer: resolution=merge-duplicates`
+    PATCH  /rest/v1/{table}   update the rows matching the filters
+    DELETE /rest/v1/{table}   delete the rows matching the filters
+
+Filters are PostgREST query parameters (`user_id=eq.u1`, `score=gte.50`,
+`id=in.(a,b)`, `is.null`), including `or=(...)` / `and(...)` trees with
+double-quoted values; `order=created_at.desc,id.desc`. Inserted rows get an
+`id` (uuid) and `created_at` when missing. Any table name is accepted; the
+routers use `resume_evaluations`, `quizzes`, `interview_sessions`,
+`saved_jobs`, `roadmaps` and `training_plans`. Auth endpoints are not
+emulated.
+
+`--latency-ms` adds a fixed delay per request, to mimic a remote database.
+
+    GET  /_fake/stats   — rows per table, requests per method
+    POST /_fake/reset   — drop every table
+
+Usage (from vidyamitra-backend/):
+
+    python -m loadtest.fake_supabase --port 8092 --latency-ms 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+# Query parameters that are not column filters.
+_RESERVED = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+
+def _text(value: Any) -> str:
+    """A stored value as PostgREST compares it in a filter."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _matches(row: dict, column: str, expr: str) -> bool:
+    negate = expr.startswith("not.")
+    if negate:
+        expr = expr[4:]
+    op, _, arg = expr.partition(".")
+    if len(arg) >= 2 and arg[0] == arg[-1] == '"':
+        arg = arg[1:-1]
+    value = row.get(column)
+    if op == "eq":
+        result = _text(value) == arg
+    elif op == "neq":
+        result = _text(value) != arg
+    elif op == "is":
+        result = _text(value) == arg.lower()
+    elif op == "in":
+        options = [o.strip().strip('"') for o in arg.strip("()").split(",")]
+        result = _text(value) in options
+    elif op in ("gt", "gte", "lt", "lte"):
+        left, right = _number(value), _number(arg)
+        if left is None or right is None:
+            left, right = _text(value), arg
+        result = {
+            "gt": left > right,
+            "gte": left >= right,
+            "lt": left < right,
+            "lte": left <= right,
+        }[op]
+    else:
+        result = True  # unsupported operator: do not filter
+    return not result if negate else result
+
+
+def _split_terms(text: str) -> List[str]:
+    """Split a logic tree's body on the commas outside parentheses and quotes."""
+    terms, depth, quoted, start = [], 0, False, 0
+    for i, ch in enumerate(text):
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and ch == ",":
+            terms.append(text[start:i])
+            start = i + 1
+    terms.append(text[start:])
+    return [t.strip() for t in terms if t.strip()]
+
+
+def _matches_term(row: dict, term: str) -> bool:
+    """One term of a logic tree: `column.op.value`, `and(...)`, `or(...)` (optionally `not.`)."""
+    negate = term.startswith("not.")
+    body = term[4:] if negate else term
+    for logic in ("and", "or"):
+        if body.startswith(f"{logic}("):
+            return _matches_logic(row, logic, body[len(logic):]) != negate
+    column, _, expr = term.partition(".")
+    return _matches(row, column, expr)
+
+
+def _matches_logic(row: dict, logic: str, body: str) -> bool:
+    results = [_matches_term(row, t) for t in _split_terms(body.strip()[1:-1])]
+    return any(results) if logic == "or" else all(results)
+
+
+def _matches_param(row: dict, key: str, expr: str) -> bool:
+    negate = key.startswith("not.")
+    logic = key[4:] if negate else key
+    if logic in ("and", "or"):
+        return _matches_logic(row, logic, expr) != negate
+    return _matches(row, key, expr)
+
+
+def _filters(request: Request) -> List[Tuple[str, str]]:
+    return [(k, v) for k, v in request.query_params.multi_items() if k not in _RESERVED]
+
+
+def _project(row: dict, select: Optional[str]) -> dict:
+    if not select or select.strip() == "*":
+        return row
+    columns = [c.strip() for c in select.split(",") if c.strip()]
+    return {c: row.get(c) for c in columns}
+
+
+def _ordered(rows: List[dict], order: Optional[str]) -> List[dict]:
+    if not order:
+        return rows
+    for term in reversed(order.split(",")):
+        parts = term.split(".")
+        column, desc = parts[0], "desc" in parts[1:]
+        present = [r for r in rows if r.get(column) is not None]
+        missing = [r for r in rows if r.get(column) is None]
+        present.sort(key=lambda r: (_number(r[column]) is None, _number(r[column]) or 0, _text(r[column])),
+                     reverse=desc)
+        # PostgREST default: nulls last ascending, first descending.
+        rows = missing + present if desc else present + missing
+    return rows
+
+
+class Tables:
+    """Thread-safe in-memory tables (table -> list of rows)."""
+
+    def __init__(self) -> None:
+        self.rows: Dict[str, List[dict]] = {}
+        self.requests: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def count(self, method: str) -> None:
+        self.requests[method] = self.requests.get(method, 0) + 1
+
+    @staticmethod
+    def _stamp(row: dict) -> dict:
+        row = dict(row)
+        row.setdefault("id", str(uuid.uuid4()))
+        row.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+        return row
+
+    def select(self, table: str, filters: List[Tuple[str, str]]) -> List[dict]:
+        with self.lock:
+            return [copy.deepcopy(r) for r in self.rows.get(table, []) if all(_matches_param(r, c, e) for c, e in filters)]
+
+    def insert(self, table: str, rows: List[dict], upsert_on: Optional[List[str]]) -> List[dict]:
+        written = []
+        with self.lock:
+            stored = self.rows.setdefault(table, [])
+            for row in rows:
+                existing = None
+                if upsert_on and all(c in row for c in upsert_on):
+                    existing = next(
+                        (r for r in stored if all(_text(r.get(c)) == _text(row[c]) for c in upsert_on)), None
+                    )
+                if existing is not None:
+                    existing.update(row)
+                    written.append(copy.deepcopy(existing))
+                else:
+                    new_row = self._stamp(row)
+                    stored.append(new_row)
+                    written.append(copy.deepcopy(new_row))
+        return written
+
+    def update(self, table: str, filters: List[Tuple[str, str]], patch: dict) -> List[dict]:
+        with self.lock:
+            changed = []
+            for row in self.rows.get(table, []):
+                if all(_matches_param(row, c, e) for c, e in filters):
+                    row.update(patch)
+                    changed.append(copy.deepcopy(row))
+            return changed
+
+    def delete(self, table: str, filters: List[Tuple[str, str]]) -> List[dict]:
+        with self.lock:
+            kept, removed = [], []
+            for row in self.rows.get(table, []):
+                (removed if all(_matches_param(row, c, e) for c, e in filters) else kept).append(row)
+            self.rows[table] = kept
+            return removed
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "tables": {table: len(rows) for table, rows in sorted(self.rows.items())},
+                "requests": dict(self.requests),
+            }
+
+    def reset(self) -> None:
+        with self.lock:
+            self.rows.clear()
+            self.requests.clear()
+
+
+def create_app(latency_ms: float = 0.0, tables: Optional[Tables] = None) -> FastAPI:
+    tables = tables or Tables()
+    app = FastAPI(title="Fake Supabase")
+
+    def respond(request: Request, rows: List[dict], status_code: int = 200) -> Response:
+        prefer = request.headers.get("prefer", "")
+        if request.method != "GET" and "return=representation" not in prefer:
+            return Response(status_code=204)
+        rows = [_project(r, request.query_params.get("select")) for r in rows]
+        headers = {"content-range": f"0-{max(len(rows) - 1, 0)}/{len(rows) if 'count=' in prefer else '*'}"}
+        if "vnd.pgrst.object" in request.headers.get("accept", ""):
+            if len(rows) != 1:
+                return JSONResponse(
+                    status_code=406,
+                    content={"code": "PGRST116", "message": "JSON object requested, multiple (or no) rows returned",
+                             "details": f"The result contains {len(rows)} rows", "hint": None},
+                )
+            return JSONResponse(status_code=status_code, content=rows[0], headers=headers)
+        return JSONResponse(status_code=status_code, content=rows, headers=headers)
+
+    async def delay() -> None:
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000.0)
+
+    @app.get("/rest/v1/{table}")
+    async def select_rows(table: str, request: Request) -> Response:
+        tables.count("GET")
+        await delay()
+        rows = _ordered(tables.select(table, _filters(request)), request.query_params.get("order"))
+        offset = int(request.query_params.get("offset") or 0)
+        limit = request.query_params.get("limit")
+        rows = rows[offset:offset + int(limit)] if limit else rows[offset:]
+        return respond(request, rows)
+
+    @app.post("/rest/v1/{table}")
+    async def insert_rows(table: str, request: Request) -> Response:
+        tables.count("POST")
+        await delay()
+        body = await request.json()
+        rows = body if isinstance(body, list) else [body]
+        upsert_on = None
+        if "resolution=merge-duplicates" in request.headers.get("prefer", ""):
+            upsert_on = [c.strip() for c in (request.query_params.get("on_conflict") or "id").split(",")]
+        return respond(request, tables.insert(table, rows, upsert_on), status_code=201)
+
+    @app.patch("/rest/v1/{table}")
+    async def update_rows(table: str, request: Request) -> Response:
+        tables.count("PATCH")
+        await delay()
+        patch = await request.json()
+        return respond(request, tables.update(table, _filters(request), patch if isinstance(patch, dict) else {}))
+
+    @app.delete("/rest/v1/{table}")
+    async def delete_rows(table: str, request: Request) -> Response:
+        tables.count("DELETE")
+        await delay()
+        return respond(request, tables.delete(table, _filters(request)))
+
+    @app.get("/_fake/stats")
+    def get_stats() -> dict:
+        return tables.stats()
+
+    @app.post("/_fake/reset")
+    def reset() -> dict:
+        tables.reset()
+        return {"status": "success"}
+
+    @app.get("/")
+    def root() -> dict:
+        return {"name": "fake-supabase", "status": "ok"}
+
+    return app
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8092)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added delay per request")
+    args = parser.parse_args(argv)
+    uvicorn.run(create_app(args.latency_ms), host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
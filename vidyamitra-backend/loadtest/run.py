@@ -0,0 +1,466 @@
+"""
+End-to-End Load Test
+====================
+Drives the full interview flow against the API at a fixed concurrency and
+reports latency percentiles and throughput per step:
+
+    parse     — POST /resume/parse       (a generated .txt resume)
+    questions — POST /interview/questions
+    record    — POST /interview/record   (video + audio upload)
+    analyze   — POST /interview/analyze  (transcription, eye contact, timeline)
+    report    — POST /interview/report   (or /interview/report/stream)
+
+By default nothing external is touched: the script starts the fake Groq
+server (`loadtest.fake_groq`), the fake Supabase server
+(`loadtest.fake_supabase`) and the API itself (`uvicorn main:app`) with its
+LLM, Groq and Supabase endpoints pointed at the fakes and its session store,
+media and LLM cache in a temp dir. With `--api-url` it drives an API that is
+already running instead (configure that server yourself).
+
+Each flow uses a different resume unless `--same-resume` is given, so the
+resume parse cache only helps when asked to. With `--background`, analyze
+and (JSON) report run as background jobs: the step time covers the 202, the
+job's event stream and its result.
+
+Usage (from vidyamitra-backend/):
+
+    python -m loadtest.run --flows 50 --concurrency 10
+    python -m loadtest.run --flows 200 --concurrency 40 --llm-latency-ms 1200 --workers 2
+    python -m loadtest.run --env INTERVIEW_EVAL_MODE=batched --report stream --json results.json
+    python -m loadtest.run --background --env JOB_WORKERS=4
+    python -m loadtest.run --api-url http://127.0.0.1:8000 --flows 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+STEPS = ("parse", "questions", "record", "analyze", "report")
+
+_BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+_SKILLS = ("Python", "SQL", "FastAPI", "React", "Docker", "Redis", "Kafka", "AWS", "Go", "Postgres",
+           "Airflow", "Kubernetes", "TypeScript", "Spark", "Terraform")
+
+
+# ---------------------------------------------------------------------------
+# Test data
+# ---------------------------------------------------------------------------
+def resume_text(rng: random.Random) -> str:
+    name = f"Candidate {uuid.UUID(int=rng.getrandbits(128)).hex[:8]}"
+    skills = ", ".join(rng.sample(_SKILLS, 6))
+    return (
+        f"{name}\nSoftware Engineer\n\nSkills: {skills}\n\n"
+        "Experience\nData Engineering Intern, Acme (Jan - Jun 2025): built batch and streaming ETL jobs, "
+        "cut pipeline latency by 40%.\n\n"
+        "Projects\nRealtime analytics pipeline: Kafka and Spark streaming into Postgres.\n"
+        "Portfolio site: React front end with a FastAPI backend and CI/CD.\n\n"
+        "Education\nB.Tech Computer Science, State University, 2025\n"
+    )
+
+
+def make_video(path: Path, seconds: float, fps: int = 3) -> Optional[Path]:
+    """A small blank mp4 the API's OpenCV pipeline can decode; None without OpenCV."""
+    try:
+        import cv2
+        import numpy as np
+    except Exception:
+        return None
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, (160, 120))
+    if not writer.isOpened():
+        return None
+    frame = np.full((120, 160, 3), 96, dtype=np.uint8)
+    for _ in range(int(seconds * fps)):
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def answer_windows(questions: List[dict], seconds: float) -> List[dict]:
+    span = seconds / max(1, len(questions))
+    return [
+        {
+            "question_id": q["id"],
+            "start_offset_seconds": round(i * span, 2),
+            "end_offset_seconds": round((i + 1) * span - 0.5, 2),
+        }
+        for i, q in enumerate(questions)
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Local stack (fakes + API)
+# ---------------------------------------------------------------------------
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _fake_service_key() -> str:
+    """JWT-shaped key; the fake Supabase server never checks it."""
+    def part(data: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+    return f"{part({'alg': 'HS256', 'typ': 'JWT'})}.{part({'role': 'service_role', 'iss': 'loadtest'})}.bG9hZHRlc3Q"
+
+
+def _wait_ready(url: str, proc: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{url}: process exited with code {proc.returncode}")
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url}: not ready after {timeout:.0f}s")
+
+
+class LocalStack:
+    """Fake Groq, fake Supabase and the API as subprocesses, torn down on exit."""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.workdir = Path(tempfile.mkdtemp(prefix="vidyamitra_loadtest_"))
+        self.procs: List[subprocess.Popen] = []
+        self.groq_url = f"http://127.0.0.1:{_free_port()}"
+        self.supabase_url = f"http://127.0.0.1:{_free_port()}"
+        self.api_url = f"http://127.0.0.1:{_free_port()}"
+
+    def _spawn(self, argv: List[str], env: Optional[Dict[str, str]] = None) -> subprocess.Popen:
+        log = open(self.workdir / f"proc{len(self.procs)}.log", "wb")
+        proc = subprocess.Popen([sys.executable, *argv], cwd=str(_BACKEND_DIR), env=env,
+                                stdout=log, stderr=subprocess.STDOUT)
+        self.procs.append(proc)
+        return proc
+
+    def __enter__(self) -> "LocalStack":
+        a = self.args
+        try:
+            groq = self._spawn([
+                "-m", "loadtest.fake_groq", "--port", self.groq_url.rsplit(":", 1)[1],
+                "--latency-ms", str(a.llm_latency_ms), "--jitter-ms", str(a.llm_jitter_ms),
+                "--transcribe-ms", str(a.transcribe_ms), "--audio-seconds", str(a.audio_seconds),
+                "--rate-limit-ratio", str(a.rate_limit_ratio), "--seed", str(a.seed),
+            ])
+            supa = self._spawn([
+                "-m", "loadtest.fake_supabase", "--port", self.supabase_url.rsplit(":", 1)[1],
+                "--latency-ms", str(a.db_latency_ms),
+            ])
+            _wait_ready(self.groq_url + "/", groq)
+            _wait_ready(self.supabase_url + "/", supa)
+
+            env = {
+                **os.environ,
+                "GROQ_API_KEY": "loadtest-key",
+                "GROQ_BASE_URL": self.groq_url,
+                "LLM_BASE_URL": self.groq_url + "/openai/v1",
+                "SUPABASE_URL": self.supabase_url,
+                "SUPABASE_SERVICE_ROLE_KEY": _fake_service_key(),
+                "SESSION_STORE_PATH": str(self.workdir / "sessions.db"),
+                "LLM_CACHE_PATH": str(self.workdir / "llm_cache.db"),
+                "QUESTION_BANK_PATH": str(self.workdir / "question_bank.db"),
+                "JOB_QUEUE_PATH": str(self.workdir / "jobs.db"),
+                "PROGRESS_ROLLUP_PATH": str(self.workdir / "progress.db"),
+                "INTERVIEW_MEDIA_PATH": str(self.workdir / "media"),
+                "INTERVIEW_STORE_PATH": str(self.workdir / "interview_sessions.json"),
+                "INTERVIEW_PIPELINE_STORE_PATH": str(self.workdir / "interview_pipeline_sessions.json"),
+                "WEB_CONCURRENCY": str(a.workers),
+            }
+            for pair in a.env:
+                key, _, value = pair.partition("=")
+                env[key.strip()] = value
+            api = self._spawn([
+                "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", self.api_url.rsplit(":", 1)[1],
+                "--workers", str(a.workers), "--log-level", "warning",
+            ], env=env)
+            _wait_ready(self.api_url + "/", api)
+        except BaseException:
+            self.__exit__()
+            raise
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        for proc in reversed(self.procs):
+            if proc.poll() is None:
+                proc.terminate()
+        for proc in self.procs:
+            try:
+                proc.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        if self.args.keep_logs:
+            print(f"logs: {self.workdir}")
+        else:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+# ---------------------------------------------------------------------------
+# Flow
+# ---------------------------------------------------------------------------
+class Results:
+    def __init__(self) -> None:
+        self.samples: Dict[str, List[float]] = {step: [] for step in (*STEPS, "flow")}
+        self.errors: Dict[str, Dict[str, int]] = {step: {} for step in (*STEPS, "flow")}
+
+    def ok(self, step: str, ms: float) -> None:
+        self.samples[step].append(ms)
+
+    def error(self, step: str, kind: str) -> None:
+        self.errors[step][kind] = self.errors[step].get(kind, 0) + 1
+
+
+class StepFailed(Exception):
+    def __init__(self, step: str, kind: str):
+        super().__init__(f"{step}: {kind}")
+        self.step = step
+        self.kind = kind
+
+
+async def _timed(results: Results, step: str, call) -> httpx.Response:
+    started = time.perf_counter()
+    try:
+        response = await call
+    except httpx.HTTPError as e:
+        results.error(step, type(e).__name__)
+        raise StepFailed(step, type(e).__name__) from e
+    ms = (time.perf_counter() - started) * 1000.0
+    if response.status_code >= 400:
+        results.error(step, str(response.status_code))
+        raise StepFailed(step, str(response.status_code))
+    results.ok(step, ms)
+    return response
+
+
+async def _stream_report(client: httpx.AsyncClient, data: dict) -> httpx.Response:
+    async with client.stream("POST", "/interview/report/stream", data=data) as response:
+        body = await response.aread()
+    if response.status_code < 400 and b"event: report" not in body:
+        return httpx.Response(599, request=response.request)
+    return response
+
+
+async def _background_job(client: httpx.AsyncClient, path: str, data: dict) -> httpx.Response:
+    """Queue `path` as a background job and wait for it on its event stream."""
+    response = await client.post(path, data={**data, "background": "true"})
+    if response.status_code != 202:
+        return response if response.status_code >= 400 else httpx.Response(598, request=response.request)
+    async with client.stream("GET", response.json()["events_url"], params={"user_id": data["user_id"]}) as events:
+        body = await events.aread()
+    if events.status_code >= 400:
+        return events
+    last_event = [line for line in body.decode("utf-8").splitlines() if line.startswith("event:")][-1:]
+    if last_event != ["event: result"]:
+        return httpx.Response(599, request=events.request)
+    return events
+
+
+async def run_flow(client: httpx.AsyncClient, results: Results, args: argparse.Namespace,
+                   rng: random.Random, media: Tuple[bytes, bytes, str], resume: Optional[str]) -> None:
+    video_bytes, audio_bytes, video_name = media
+    user_id = f"loadtest-{uuid.UUID(int=rng.getrandbits(128))}"
+    started = time.perf_counter()
+    try:
+        text = resume or resume_text(rng)
+        r = await _timed(results, "parse", client.post(
+            "/resume/parse", files={"file": ("resume.txt", text.encode("utf-8"), "text/plain")}))
+        resume_data = r.json()
+
+        r = await _timed(results, "questions", client.post("/interview/questions", json={
+            "user_id": user_id, "resume_data": resume_data, "num_questions": args.questions}))
+        session_id = r.json()["session_id"]
+        windows = answer_windows(r.json()["questions"], args.audio_seconds)
+
+        await _timed(results, "record", client.post("/interview/record", data={
+            "session_id": session_id,
+            "user_id": user_id,
+            "video_start_time": "2026-01-01T10:00:00Z",
+            "answer_windows": json.dumps(windows),
+        }, files={
+            "video": (video_name, video_bytes, "video/mp4"),
+            "audio": ("audio.webm", audio_bytes, "audio/webm"),
+        }))
+
+        form = {"session_id": session_id, "user_id": user_id}
+        if args.background:
+            await _timed(results, "analyze", _background_job(client, "/interview/analyze", form))
+        else:
+            await _timed(results, "analyze", client.post("/interview/analyze", data=form))
+        if args.report == "stream":
+            await _timed(results, "report", _stream_report(client, form))
+        elif args.background:
+            await _timed(results, "report", _background_job(client, "/interview/report", form))
+        else:
+            await _timed(results, "report", client.post("/interview/report", data=form))
+    except StepFailed as e:
+        results.error("flow", e.step)
+        return
+    results.ok("flow", (time.perf_counter() - started) * 1000.0)
+
+
+async def drive(api_url: str, args: argparse.Namespace, media: Tuple[bytes, bytes, str]) -> Tuple[Results, float]:
+    results = Results()
+    rng = random.Random(args.seed)
+    shared_resume = resume_text(rng) if args.same_resume else None
+    remaining = iter(range(args.flows))
+
+    async def worker(index: int, client: httpx.AsyncClient) -> None:
+        if args.ramp_seconds:
+            await asyncio.sleep(args.ramp_seconds * index / args.concurrency)
+        worker_rng = random.Random(f"{args.seed}-{index}")
+        for _ in remaining:
+            await run_flow(client, results, args, worker_rng, media, shared_resume)
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=api_url, timeout=args.timeout, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i, client) for i in range(args.concurrency)))
+        wall = time.perf_counter() - started
+    return results, wall
+
+
+# ---------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(results: Results, wall: float, args: argparse.Namespace) -> List[dict]:
+    rows = []
+    for step in (*STEPS, "flow"):
+        samples = results.samples[step]
+        errors = sum(results.errors[step].values())
+        row = {
+            "step": step,
+            "ok": len(samples),
+            "errors": errors,
+            "error_kinds": results.errors[step],
+            "per_s": round(len(samples) / wall, 2) if wall else 0.0,
+        }
+        if samples:
+            row.update({
+                "p50_ms": round(_percentile(samples, 50), 1),
+                "p95_ms": round(_percentile(samples, 95), 1),
+                "p99_ms": round(_percentile(samples, 99), 1),
+                "max_ms": round(max(samples), 1),
+            })
+        rows.append(row)
+    requests = sum(len(results.samples[s]) + sum(results.errors[s].values()) for s in STEPS)
+    rows.append({
+        "step": "total",
+        "flows": args.flows,
+        "concurrency": args.concurrency,
+        "wall_s": round(wall, 2),
+        "requests": requests,
+        "requests_per_s": round(requests / wall, 2) if wall else 0.0,
+    })
+    return rows
+
+
+def print_rows(rows: List[dict]) -> None:
+    header = f"{'step':<11}{'ok':>6}{'errors':>8}{'per s':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        if row["step"] == "total":
+            print(f"\n{row['flows']} flows at concurrency {row['concurrency']} in {row['wall_s']:.1f}s: "
+                  f"{row['requests']} requests, {row['requests_per_s']:.2f} req/s")
+            continue
+        if "p50_ms" in row:
+            timing = f"{row['p50_ms']:>10.0f}{row['p95_ms']:>10.0f}{row['p99_ms']:>10.0f}{row['max_ms']:>10.0f}"
+        else:
+            timing = f"{'-':>10}{'-':>10}{'-':>10}{'-':>10}"
+        print(f"{row['step']:<11}{row['ok']:>6}{row['errors']:>8}{row['per_s']:>8.2f}{timing}")
+        if row["error_kinds"]:
+            print(f"{'':<11}errors: {', '.join(f'{k} x{n}' for k, n in sorted(row['error_kinds'].items()))}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--flows", type=int, default=20, help="interview flows to run in total")
+    parser.add_argument("--concurrency", type=int, default=5, help="flows in flight at once")
+    parser.add_argument("--ramp-seconds", type=float, default=0.0, help="stagger worker start over this long")
+    parser.add_argument("--questions", type=int, default=6, help="questions per interview (5-7)")
+    parser.add_argument("--report", choices=("json", "stream"), default="json")
+    parser.add_argument("--background", action="store_true", help="run analyze/report as background jobs")
+    parser.add_argument("--same-resume", action="store_true", help="reuse one resume (exercises the parse cache)")
+    parser.add_argument("--timeout", type=float, default=300.0, help="per-request client timeout (s)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", dest="json_out", help="also write the results to this file")
+    parser.add_argument("--api-url", help="drive this running API instead of starting a local stack")
+    local = parser.add_argument_group("local stack (ignored with --api-url)")
+    local.add_argument("--workers", type=int, default=1, help="uvicorn workers for the API")
+    local.add_argument("--llm-latency-ms", type=float, default=600.0)
+    local.add_argument("--llm-jitter-ms", type=float, default=200.0)
+    local.add_argument("--transcribe-ms", type=float, default=1500.0)
+    local.add_argument("--audio-seconds", type=float, default=60.0, help="length of the fake recording")
+    local.add_argument("--rate-limit-ratio", type=float, default=0.0, help="share of completions answered with a 429")
+    local.add_argument("--db-latency-ms", type=float, default=10.0)
+    local.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra API environment")
+    local.add_argument("--keep-logs", action="store_true", help="keep the temp dir with the server logs")
+    args = parser.parse_args(argv)
+    if args.flows < 1 or args.concurrency < 1:
+        parser.error("--flows and --concurrency must be at least 1")
+    if not 5 <= args.questions <= 7:
+        parser.error("--questions must be between 5 and 7")
+
+    mediadir = Path(tempfile.mkdtemp(prefix="vidyamitra_loadtest_media_"))
+    try:
+        video = make_video(mediadir / "video.mp4", args.audio_seconds)
+        if video is None:
+            print("OpenCV unavailable: uploading placeholder video bytes (eye contact analysis may fail).")
+            media = (os.urandom(64 * 1024), os.urandom(32 * 1024), "video.webm")
+        else:
+            media = (video.read_bytes(), os.urandom(32 * 1024), "video.mp4")
+
+        if args.api_url:
+            results, wall = asyncio.run(drive(args.api_url.rstrip("/"), args, media))
+            fake_stats = None
+        else:
+            with LocalStack(args) as stack:
+                results, wall = asyncio.run(drive(stack.api_url, args, media))
+                fake_stats = {
+                    "groq": httpx.get(stack.groq_url + "/_fake/stats").json(),
+                    "supabase": httpx.get(stack.supabase_url + "/_fake/stats").json(),
+                }
+    finally:
+        shutil.rmtree(mediadir, ignore_errors=True)
+
+    rows = summarize(results, wall, args)
+    print_rows(rows)
+    if fake_stats:
+        calls = ", ".join(f"{task} {c['requests']}" for task, c in sorted(fake_stats["groq"]["tasks"].items()))
+        tables = ", ".join(f"{table} {n}" for table, n in fake_stats["supabase"]["tables"].items())
+        print(f"fake Groq requests: {calls}")
+        print(f"fake Supabase rows: {tables or '-'}")
+
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps({"results": rows, "fakes": fake_stats}, indent=2),
+                                       encoding="utf-8")
+    return 0 if not sum(results.errors["flow"].values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())